@@ -37,6 +37,16 @@ def handle_llm_command(args):
         sys.argv.extend(["--answer-model", args.answer_model])
     if args.config:
         sys.argv.extend(["--config", args.config])
+    if args.question_concurrency != 1:  # Only add if different from default
+        sys.argv.extend(["--question-concurrency", str(args.question_concurrency)])
+    if args.paper_workers != 1:  # Only add if different from default
+        sys.argv.extend(["--paper-workers", str(args.paper_workers)])
+    if args.no_cache:
+        sys.argv.append("--no-cache")
+    if args.incremental:
+        sys.argv.append("--incremental")
+    if args.metrics_file:
+        sys.argv.extend(["--metrics-file", args.metrics_file])
     sys.exit(pipeline.main() if hasattr(pipeline, "main") else pipeline.__main__())
 
 
@@ -65,6 +75,26 @@ def handle_process_pdfs_command(args):
         sys.argv.extend(["--filter-chunk-type"] + args.filter_chunk_type)
     if args.pages != 1:
         sys.argv.extend(["--pages", str(args.pages)])
+    if args.in_memory_split:
+        sys.argv.append("--in-memory-split")
+    if args.split_backend != "pypdf2":
+        sys.argv.extend(["--split-backend", args.split_backend])
+    if args.workers != 1:
+        sys.argv.extend(["--workers", str(args.workers)])
+    if args.upload_concurrency != 1:
+        sys.argv.extend(["--upload-concurrency", str(args.upload_concurrency)])
+    if args.retry_failed:
+        sys.argv.append("--retry-failed")
+    if args.page_dedup != "bytes":
+        sys.argv.extend(["--page-dedup", args.page_dedup])
+    if args.compact_json:
+        sys.argv.append("--compact-json")
+    if args.dedup_mode != "exact":
+        sys.argv.extend(["--dedup-mode", args.dedup_mode])
+    if args.dedup_threshold is not None:
+        sys.argv.extend(["--dedup-threshold", str(args.dedup_threshold)])
+    if args.stats:
+        sys.argv.append("--stats")
     sys.exit(process_module.main())
 
 
@@ -85,6 +115,8 @@ def handle_prep_benchmark_command(args):
         sys.argv.extend(["--questions-yml", args.questions_yml])
     if args.output:
         sys.argv.extend(["--output", args.output])
+    if args.format:
+        sys.argv.extend(["--format", args.format])
     sys.exit(prep_module.main())
 
 
@@ -103,14 +135,26 @@ def handle_benchmark_command(args):
         sys.argv.extend(["--batch-size", str(args.batch_size)])
     if args.max_retries != 5:  # Only add if different from default
         sys.argv.extend(["--max-retries", str(args.max_retries)])
+    if args.async_eval:
+        sys.argv.append("--async-eval")
+    if args.concurrency != 8:  # Only add if different from default
+        sys.argv.extend(["--concurrency", str(args.concurrency)])
+    if args.rate_limit is not None:
+        sys.argv.extend(["--rate-limit", str(args.rate_limit)])
     if args.model != "gpt-4o":  # Only add if different from default
         sys.argv.extend(["--model", args.model])
     if args.max_context_length != 200000:  # Only add if different from default
         sys.argv.extend(["--max-context-length", str(args.max_context_length)])
     if args.use_retrieval_only:
         sys.argv.append("--use-retrieval-only")
+    if args.context_token_budget is not None:
+        sys.argv.extend(["--context-token-budget", str(args.context_token_budget)])
     if args.list_questions:
         sys.argv.append("--list-questions")
+    if args.output_prefix:
+        sys.argv.extend(["--output-prefix", args.output_prefix])
+    if args.no_eval_cache:
+        sys.argv.append("--no-eval-cache")
     sys.exit(benchmark_module.main())
 
 
@@ -222,7 +266,35 @@ def main():
         type=str,
         choices=["fast", "balanced", "quality"],
         default=None,
-        help="Use predefined configuration: " "'fast', 'balanced', or 'quality'",
+        help="Use predefined configuration: 'fast', 'balanced', or 'quality'",
+    )
+    llm_parser.add_argument(
+        "--question-concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of questions answered concurrently per paper (default: 1, serial)",
+    )
+    llm_parser.add_argument(
+        "--paper-workers",
+        type=int,
+        default=1,
+        help="Number of papers processed concurrently, sharing one API rate limiter (default: 1)",
+    )
+    llm_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the on-disk LLM response cache",
+    )
+    llm_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rerun questions whose questions.yml definition, models or merged_v2.json changed since the last run",
+    )
+    llm_parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=None,
+        help="JSONL file for per-call LLM usage metrics (default: logs/llm_usage_<timestamp>.jsonl)",
     )
 
     # --- metabee process-pdfs ------------------------------------------------
@@ -285,6 +357,69 @@ def main():
         default=1,
         help="Number of pages per split: 1 for single-page (default), 2 for overlapping 2-page",
     )
+    process_parser.add_argument(
+        "--in-memory-split",
+        action="store_true",
+        help="Split PDFs in memory during API processing instead of writing split PDFs to pages/",
+    )
+    process_parser.add_argument(
+        "--split-backend",
+        type=str,
+        choices=["pypdf2", "pymupdf"],
+        default="pypdf2",
+        help="PDF library used for splitting (default: pypdf2)",
+    )
+    process_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to split PDFs and to merge and deduplicate papers in parallel (default: 1)",
+    )
+    process_parser.add_argument(
+        "--upload-concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of concurrent Vision API uploads, with rate limiting and retries (default: 1, serial)",
+    )
+    process_parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="In the API step, only retry pages recorded as failed or interrupted in the job manifest",
+    )
+    process_parser.add_argument(
+        "--page-dedup",
+        type=str,
+        choices=["off", "bytes", "pixels"],
+        default="bytes",
+        help="Reuse stored API responses of identical pages: bytes (identical split PDF, default), "
+        "pixels (identical rendered pages) or off",
+    )
+    process_parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="Write merged_v2.json without indentation (smaller and faster to write and load)",
+    )
+    process_parser.add_argument(
+        "--dedup-mode",
+        type=str,
+        choices=["exact", "near", "overlap"],
+        default="exact",
+        help="Duplicate detection in the deduplication step: exact (identical text, default; overlap for 2-page "
+        "splits), near (MinHash/LSH Jaccard similarity, catches copies differing by whitespace, hyphenation or a "
+        "sentence) or overlap (identical text or overlapping grounding boxes on the same page)",
+    )
+    process_parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="Jaccard similarity threshold of --dedup-mode near (default: 0.8) or box IoU threshold of "
+        "--dedup-mode overlap (default: 0.7)",
+    )
+    process_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print throughput, latency and failure statistics of the latest Vision API run, then exit",
+    )
 
     # --- metabee review ------------------------------------------------------
     review_parser = subparsers.add_parser("review", help="Launch GUI for reviewing and annotating LLM output")  # NOQA E501
@@ -308,7 +443,15 @@ def main():
         "--output",
         type=str,
         default=None,
-        help="Output file path (default: data/benchmark_data_gui.json)",
+        help="Output directory, or JSON file for the legacy format (default: data/benchmark_data_gui)",
+    )
+    prep_benchmark_parser.add_argument(
+        "--format",
+        type=str,
+        choices=["jsonl", "json"],
+        default=None,
+        help="Output format: jsonl (chunk table + test cases referencing chunk ids, read lazily) or json "
+        "(legacy single file) (default: json for a .json output path, jsonl otherwise)",
     )
 
     # --- metabee benchmark ---------------------------------------------------
@@ -324,7 +467,7 @@ def main():
         "-i",
         type=str,
         default=None,
-        help="Input benchmark data file (default: auto-detect from config)",
+        help="Input benchmark data directory or legacy JSON file (default: auto-detect from config)",
     )
     benchmark_parser.add_argument(
         "--limit",
@@ -344,7 +487,24 @@ def main():
         "-r",
         type=int,
         default=5,
-        help="Maximum retries per batch (default: 5)",
+        help="Maximum retries per batch, or per (test case, metric) with --async-eval (default: 5)",
+    )
+    benchmark_parser.add_argument(
+        "--async-eval",
+        action="store_true",
+        help="Measure the metrics of many test cases concurrently instead of evaluating one batch at a time",
+    )
+    benchmark_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Metric measurements running at once with --async-eval (default: 8)",
+    )
+    benchmark_parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="Maximum metric measurements started per minute with --async-eval (default: no limit)",
     )
     benchmark_parser.add_argument(
         "--model",
@@ -365,11 +525,31 @@ def main():
         action="store_true",
         help="Use only retrieval_context instead of full context to reduce token usage",
     )
+    benchmark_parser.add_argument(
+        "--context-token-budget",
+        type=int,
+        default=None,
+        help="Maximum context tokens per test case (model tokenizer): retrieval chunks are packed first, "
+        "then their neighbouring chunks (default: no budget)",
+    )
     benchmark_parser.add_argument(
         "--list-questions",
         action="store_true",
         help="List all available question keys in the benchmark data and exit",
     )
+    benchmark_parser.add_argument(
+        "--output-prefix",
+        type=str,
+        default=None,
+        help="Results file path without extension; a bare name is placed in deepeval_results/. Re-using the prefix "
+        "of an interrupted run resumes it (default: combined_results_<question>_<timestamp>)",
+    )
+    benchmark_parser.add_argument(
+        "--no-eval-cache",
+        action="store_true",
+        help="Re-score every test case instead of re-using the metric results of unchanged test cases "
+        "(<data dir>/cache/evaluation_cache.sqlite)",
+    )
 
     # --- metabee edge-cases --------------------------------------------------
     edge_cases_parser = subparsers.add_parser(
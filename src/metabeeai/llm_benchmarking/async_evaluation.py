@@ -0,0 +1,246 @@
+"""
+Concurrent DeepEval metric runner.
+
+``deepeval.evaluate()`` scores one batch of test cases at a time, and a failure
+anywhere in the batch re-runs the whole batch. ``AsyncMetricRunner`` schedules
+every (test case, metric) pair on its own with the metric's ``a_measure``:
+
+- at most ``concurrency`` measurements run at once, and new ones start at no more
+  than ``rate_per_minute`` (a token bucket, as used for the LLM pipeline's API calls)
+- every pair gets a fresh metric instance from its factory, because metrics keep
+  their score and reason as attributes and cannot be shared by concurrent measurements
+- every pair is retried on its own with the LLM pipeline's ``RetryPolicy``, for transient
+  errors only (see ``retry.is_retryable``); a pair that still fails, or fails with a
+  deterministic error such as a missing test case parameter, is recorded with its error
+  without affecting any other pair
+- a test case's result is reported as soon as all of its metrics are done
+- with an ``EvaluationCache``, pairs measured by an earlier run are not measured again
+
+Results have the same structure as those of the batch mode in deepeval_benchmarking.py.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Number of metric measurements running at the same time
+DEFAULT_CONCURRENCY = 8
+
+MetricFactory = Callable[[], Any]
+
+
+def metric_name(metric: Any) -> str:
+    """Return the display name of a DeepEval metric (or metric data) object."""
+    return getattr(metric, "__name__", None) or getattr(metric, "name", None) or metric.__class__.__name__
+
+
+def metric_to_dict(metric: Any, evaluation_model: str) -> Dict[str, Any]:
+    """Convert a measured metric (or DeepEval metric data) to a results entry."""
+    error = getattr(metric, "error", None)
+    return {
+        "name": metric_name(metric),
+        "score": getattr(metric, "score", None),
+        "threshold": getattr(metric, "threshold", None),
+        "success": getattr(metric, "success", None),
+        "reason": getattr(metric, "reason", None),
+        "strict_mode": getattr(metric, "strict_mode", None),
+        "evaluation_model": evaluation_model,
+        "error": str(error) if error else None,
+        "evaluation_cost": getattr(metric, "evaluation_cost", None),
+    }
+
+
+def make_result(index: int, test_case: Any, metrics_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the results entry of a test case (or a deepeval TestResult) from its metric entries."""
+    # TestResult objects carry the test case's metadata as ``metadata``
+    metadata = getattr(test_case, "additional_metadata", None) or getattr(test_case, "metadata", None) or {}
+    return {
+        "test_case_index": index,
+        "name": getattr(test_case, "name", None) or f"case_{index}",
+        "paper_id": metadata.get("paper_id"),
+        "question_key": metadata.get("question_key"),
+        "input": test_case.input,
+        "actual_output": test_case.actual_output,
+        "expected_output": test_case.expected_output,
+        "success": bool(metrics_data) and all(entry["success"] for entry in metrics_data),
+        "additional_metadata": metadata,
+        "metrics_data": metrics_data,
+    }
+
+
+def make_batch_results(
+    test_cases: Sequence[Any],
+    indices: Sequence[int],
+    test_results: Sequence[Any],
+    evaluation_model: str,
+    cache: Optional[Any] = None,
+    metrics: Sequence[Any] = (),
+) -> List[Tuple[Any, Dict[str, Any]]]:
+    """
+    Build the results of a batch evaluated by ``deepeval.evaluate()``.
+
+    ``evaluate()`` returns its test results in completion order when it runs asynchronously,
+    so each one is matched with the test case it was evaluated from by name (test case
+    names are unique), or by its index within the batch.
+
+    Args:
+        test_cases: Test cases of the batch, in the order passed to ``evaluate()``
+        indices: ``test_case_index`` of each test case
+        test_results: Test results returned by ``evaluate()``
+        evaluation_model: Name of the judge model, recorded in the results
+        cache: ``EvaluationCache`` storing the metric results under their own test case (optional)
+        metrics: Metrics passed to ``evaluate()``, for the cache keys
+
+    Returns:
+        List[Tuple[Any, Dict[str, Any]]]: (test case, result) pairs ordered by test case index.
+    """
+    positions = {getattr(test_case, "name", None): position for position, test_case in enumerate(test_cases)}
+    pairs = []
+    for test_result in test_results:
+        position = positions.get(getattr(test_result, "name", None), getattr(test_result, "index", None))
+        if position is None or not 0 <= position < len(test_cases):
+            logger.warning(f"Ignoring test result {getattr(test_result, 'name', None)!r} not matching any test case")
+            continue
+        test_case = test_cases[position]
+        measured = getattr(test_result, "metrics_data", None) or []
+        metrics_data = [metric_to_dict(metric, evaluation_model) for metric in measured]
+        pairs.append((test_case, make_result(indices[position], test_case, metrics_data)))
+        if cache is not None:
+            cache.set_all(test_case, metrics, metrics_data)
+    pairs.sort(key=lambda pair: pair[1]["test_case_index"])
+    return pairs
+
+
+class AsyncMetricRunner:
+    """
+    Measure DeepEval metrics for many test cases concurrently.
+
+    Args:
+        metric_factories: Callables that each return a new metric instance
+        evaluation_model: Name of the judge model, recorded in the results
+        concurrency: Maximum number of measurements running at once
+        rate_per_minute: Maximum number of measurements started per minute (None for no limit)
+        max_retries: Retries of a failed (test case, metric) measurement
+        cache: ``EvaluationCache`` consulted before and updated after each measurement (optional)
+    """
+
+    def __init__(
+        self,
+        metric_factories: Sequence[MetricFactory],
+        evaluation_model: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate_per_minute: Optional[float] = None,
+        max_retries: int = 5,
+        cache: Optional[Any] = None,
+    ):
+        from metabeeai.metabeeai_llm.retry import RetryPolicy, is_retryable
+
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.metric_factories = list(metric_factories)
+        # Unmeasured instances, for the names and the cache keys of the metrics
+        self.metrics = [factory() for factory in self.metric_factories]
+        self.metric_names = [metric_name(metric) for metric in self.metrics]
+        self.evaluation_model = evaluation_model
+        self.concurrency = concurrency
+        self.rate_per_minute = rate_per_minute
+        self.retry_policy = RetryPolicy(max_retries=max_retries, retryable=is_retryable)
+        self.cache = cache
+        self._semaphore = None
+        self._bucket = None
+
+    async def measure(self, test_case: Any, factory: MetricFactory, prototype: Any) -> Dict[str, Any]:
+        """Measure one metric for one test case, retrying this pair only."""
+        name = metric_name(prototype)
+        if self.cache is not None:
+            entry = self.cache.get(test_case, prototype)
+            if entry is not None:
+                return entry
+
+        async def attempt():
+            metric = factory()
+            async with self._semaphore:
+                if self._bucket is not None:
+                    await self._bucket.acquire(1)
+                await metric.a_measure(test_case, _show_indicator=False)
+            return metric
+
+        try:
+            metric = await self.retry_policy.run(attempt, description=f"{name} for {getattr(test_case, 'name', 'test case')}")
+        except Exception as e:
+            entry = metric_to_dict(prototype, self.evaluation_model)
+            entry.update({"name": name, "score": None, "success": False, "reason": None, "error": f"{type(e).__name__}: {e}"})
+            return entry
+        entry = metric_to_dict(metric, self.evaluation_model)
+        if self.cache is not None:
+            self.cache.set(test_case, prototype, entry)
+        return entry
+
+    async def evaluate_case(self, index: int, test_case: Any) -> Dict[str, Any]:
+        """Measure every metric of a test case concurrently."""
+        entries = await asyncio.gather(
+            *(self.measure(test_case, factory, metric) for factory, metric in zip(self.metric_factories, self.metrics))
+        )
+        return make_result(index, test_case, list(entries))
+
+    async def run(
+        self,
+        test_cases: Sequence[Any],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate all test cases.
+
+        Args:
+            test_cases: DeepEval test cases
+            on_result: Called with each test case's result as soon as it is complete
+            indices: ``test_case_index`` of each test case (defaults to its position)
+
+        Returns:
+            List[Dict[str, Any]]: Results ordered by test case index.
+        """
+        from metabeeai.metabeeai_llm.rate_limiter import TokenBucket
+
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        # A bucket as large as the concurrency spreads the first measurements out instead of a burst
+        self._bucket = TokenBucket(self.rate_per_minute, capacity=self.concurrency) if self.rate_per_minute else None
+        indices = list(indices) if indices is not None else list(range(len(test_cases)))
+        tasks = [asyncio.ensure_future(self.evaluate_case(index, case)) for index, case in zip(indices, test_cases)]
+        results = []
+        try:
+            for future in asyncio.as_completed(tasks):
+                result = await future
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        finally:
+            for task in tasks:
+                task.cancel()
+        results.sort(key=lambda result: result["test_case_index"])
+        return results
+
+
+def evaluate_concurrently(
+    test_cases: Sequence[Any],
+    metric_factories: Sequence[MetricFactory],
+    evaluation_model: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_per_minute: Optional[float] = None,
+    max_retries: int = 5,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    indices: Optional[Sequence[int]] = None,
+    cache: Optional[Any] = None,
+) -> List[Dict[str, Any]]:
+    """Run ``AsyncMetricRunner`` over ``test_cases`` from synchronous code and return the results."""
+    runner = AsyncMetricRunner(
+        metric_factories,
+        evaluation_model,
+        concurrency=concurrency,
+        rate_per_minute=rate_per_minute,
+        max_retries=max_retries,
+        cache=cache,
+    )
+    return asyncio.run(runner.run(test_cases, on_result=on_result, indices=indices))
@@ -0,0 +1,272 @@
+"""
+On-disk formats of the benchmark dataset written by prep_benchmark_data.py.
+
+The normalized format is a directory holding a chunk table and test cases that
+reference chunks by id, so every chunk text is stored exactly once:
+
+- ``chunks.jsonl``: one ``{"paper_id", "chunk_id", "text"}`` line per chunk, grouped by paper
+- ``test_cases.jsonl``: one test case per line; ``chunk_ids`` are the LLM's retrieval context
+- ``manifest.json``: format version, counts and, for each paper, the byte range of its
+  chunks in ``chunks.jsonl``
+
+Prep writes one paper at a time and the evaluation reads a paper's chunks only when
+one of its test cases needs them (seeking to the byte range in the manifest), so
+neither keeps the whole corpus in memory.
+
+The legacy single-file format (``{"papers": {...}, "test_cases": [...]}`` with the
+paper context and retrieval context stored as text) is still read and written
+through the same interface.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+BENCHMARK_FORMAT = "metabeeai-benchmark"
+FORMAT_VERSION = 1
+DATA_FORMATS = ["jsonl", "json"]
+
+MANIFEST_FILENAME = "manifest.json"
+CHUNKS_FILENAME = "chunks.jsonl"
+TEST_CASES_FILENAME = "test_cases.jsonl"
+
+DEFAULT_BENCHMARK_NAME = "benchmark_data_gui"
+
+# Number of papers whose chunks are kept in memory while test cases are loaded
+DEFAULT_PAPER_CACHE_SIZE = 8
+
+
+def infer_data_format(path: str) -> str:
+    """Return "json" for a ``.json`` path (legacy single file) and "jsonl" (normalized directory) otherwise."""
+    return "json" if path.lower().endswith(".json") else "jsonl"
+
+
+def get_default_benchmark_path(data_dir: str) -> str:
+    """
+    Get the default benchmark dataset path in ``data_dir``.
+
+    The normalized directory is preferred; a legacy ``benchmark_data_gui.json`` is used
+    when only that exists.
+    """
+    path = os.path.join(data_dir, DEFAULT_BENCHMARK_NAME)
+    legacy_path = f"{path}.json"
+    if not os.path.isdir(path) and os.path.exists(legacy_path):
+        return legacy_path
+    return path
+
+
+def select_chunks(chunk_map: Dict[str, str], chunk_ids: Optional[List[str]]) -> List[str]:
+    """Return the texts of ``chunk_ids`` found in ``chunk_map``, in the order of ``chunk_ids``."""
+    return [chunk_map[chunk_id] for chunk_id in chunk_ids or [] if chunk_id in chunk_map]
+
+
+class BenchmarkWriter:
+    """
+    Write the normalized benchmark format one paper at a time.
+
+    Call ``add_paper`` with a paper's chunks before adding its test cases, then
+    ``close`` (or use the writer as a context manager) to write the manifest.
+
+    Args:
+        directory: Output directory (created if missing)
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.papers: Dict[str, Dict[str, int]] = {}
+        self.num_test_cases = 0
+        self._chunks = open(os.path.join(directory, CHUNKS_FILENAME), "wb")
+        self._test_cases = open(os.path.join(directory, TEST_CASES_FILENAME), "w", encoding="utf-8")
+
+    def add_paper(self, paper_id: str, chunk_map: Dict[str, str]):
+        """Store the chunks (chunk_id -> text) of a paper."""
+        offset = self._chunks.tell()
+        for chunk_id, text in chunk_map.items():
+            line = json.dumps({"paper_id": paper_id, "chunk_id": chunk_id, "text": text}, ensure_ascii=False)
+            self._chunks.write(line.encode("utf-8") + b"\n")
+        self.papers[paper_id] = {"offset": offset, "length": self._chunks.tell() - offset, "chunks": len(chunk_map)}
+
+    def add_test_case(self, entry: Dict[str, Any]):
+        """Store a test case; its retrieval context is kept as ``chunk_ids`` only."""
+        entry = {key: value for key, value in entry.items() if key not in ("retrieval_context", "context")}
+        self._test_cases.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.num_test_cases += 1
+
+    def close(self):
+        """Finish the chunk and test case files and write the manifest."""
+        self._chunks.close()
+        self._test_cases.close()
+        manifest = {
+            "format": BENCHMARK_FORMAT,
+            "version": FORMAT_VERSION,
+            "num_papers": len(self.papers),
+            "num_test_cases": self.num_test_cases,
+            "papers": self.papers,
+        }
+        manifest_path = os.path.join(self.directory, MANIFEST_FILENAME)
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LegacyBenchmarkWriter:
+    """
+    Write the legacy single-file format (``{"papers": {...}, "test_cases": [...]}``).
+
+    Same interface as ``BenchmarkWriter``; everything is kept in memory until ``close``.
+
+    Args:
+        path: Output JSON file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.papers: Dict[str, Dict[str, Any]] = {}
+        self.test_cases: List[Dict[str, Any]] = []
+
+    @property
+    def num_test_cases(self) -> int:
+        return len(self.test_cases)
+
+    def add_paper(self, paper_id: str, chunk_map: Dict[str, str]):
+        self.papers[paper_id] = {"context": list(chunk_map.values()), "chunk_map": chunk_map}
+
+    def add_test_case(self, entry: Dict[str, Any]):
+        entry = dict(entry)
+        if "retrieval_context" not in entry:
+            chunk_map = self.papers.get(entry.get("paper_id"), {}).get("chunk_map", {})
+            entry["retrieval_context"] = select_chunks(chunk_map, entry.get("chunk_ids"))
+        self.test_cases.append(entry)
+
+    def close(self):
+        with open(self.path, "w") as f:
+            json.dump({"papers": self.papers, "test_cases": self.test_cases}, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_benchmark_writer(path: str, data_format: Optional[str] = None):
+    """Return a ``BenchmarkWriter`` (jsonl) or ``LegacyBenchmarkWriter`` (json) for ``path``."""
+    data_format = data_format or infer_data_format(path)
+    if data_format not in DATA_FORMATS:
+        raise ValueError(f"Unknown benchmark data format '{data_format}', expected one of {DATA_FORMATS}")
+    if data_format == "json":
+        return LegacyBenchmarkWriter(path)
+    return BenchmarkWriter(path)
+
+
+class BenchmarkData:
+    """
+    Lazy reader of the normalized benchmark format.
+
+    Test cases are streamed from ``test_cases.jsonl``; a paper's chunks are read from
+    its byte range of ``chunks.jsonl`` on first use and the most recently used papers
+    are kept in memory.
+
+    Args:
+        directory: Directory written by ``BenchmarkWriter``
+        cache_size: Number of papers whose chunks are kept in memory
+    """
+
+    def __init__(self, directory: str, cache_size: int = DEFAULT_PAPER_CACHE_SIZE):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_FILENAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != BENCHMARK_FORMAT:
+            raise ValueError(f"{directory} does not contain a {BENCHMARK_FORMAT} manifest")
+        if manifest.get("version", 0) > FORMAT_VERSION:
+            raise ValueError(f"Benchmark format version {manifest['version']} is newer than supported ({FORMAT_VERSION})")
+        self.papers: Dict[str, Dict[str, int]] = manifest.get("papers", {})
+        self.num_test_cases: int = manifest.get("num_test_cases", 0)
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+
+    def iter_test_cases(self) -> Iterator[Dict[str, Any]]:
+        with open(os.path.join(self.directory, TEST_CASES_FILENAME), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def chunk_map(self, paper_id: str) -> Dict[str, str]:
+        """Return chunk_id -> text for a paper (empty if the paper is unknown)."""
+        if paper_id in self._cache:
+            self._cache.move_to_end(paper_id)
+            return self._cache[paper_id]
+        entry = self.papers.get(paper_id)
+        if entry is None:
+            return {}
+        with open(os.path.join(self.directory, CHUNKS_FILENAME), "rb") as f:
+            f.seek(entry["offset"])
+            block = f.read(entry["length"])
+        chunk_map = {}
+        for line in block.splitlines():
+            chunk = json.loads(line)
+            chunk_map[chunk["chunk_id"]] = chunk["text"]
+        self._cache[paper_id] = chunk_map
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return chunk_map
+
+    def context(self, paper_id: str) -> List[str]:
+        """Return the full context (all chunk texts) of a paper."""
+        return list(self.chunk_map(paper_id).values())
+
+    def retrieval_context(self, entry: Dict[str, Any]) -> List[str]:
+        """Return the texts of a test case's ``chunk_ids``."""
+        return select_chunks(self.chunk_map(entry.get("paper_id")), entry.get("chunk_ids"))
+
+
+class LegacyBenchmarkData:
+    """
+    Reader of the legacy single-file format with the same interface as ``BenchmarkData``.
+
+    Args:
+        path: JSON file written by the legacy format
+    """
+
+    def __init__(self, path: str):
+        with open(path, "r") as f:
+            raw_data = json.load(f)
+        if not isinstance(raw_data, dict) or "test_cases" not in raw_data:
+            raise ValueError(
+                "Invalid format: Expected dict with 'papers' and 'test_cases' keys.\n"
+                "This script only works with output from prep_benchmark_data.py"
+            )
+        self.papers: Dict[str, Dict[str, Any]] = raw_data.get("papers", {})
+        self._test_cases: List[Dict[str, Any]] = raw_data.get("test_cases", [])
+        self.num_test_cases = len(self._test_cases)
+
+    def iter_test_cases(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._test_cases)
+
+    def chunk_map(self, paper_id: str) -> Dict[str, str]:
+        return self.papers.get(paper_id, {}).get("chunk_map", {})
+
+    def context(self, paper_id: str) -> List[str]:
+        return self.papers.get(paper_id, {}).get("context", [])
+
+    def retrieval_context(self, entry: Dict[str, Any]) -> List[str]:
+        if "retrieval_context" in entry:
+            return entry["retrieval_context"]
+        return select_chunks(self.chunk_map(entry.get("paper_id")), entry.get("chunk_ids"))
+
+
+def open_benchmark_data(path: str, cache_size: int = DEFAULT_PAPER_CACHE_SIZE):
+    """Open a benchmark dataset, detecting the normalized directory or the legacy JSON file."""
+    if os.path.isdir(path):
+        return BenchmarkData(path, cache_size=cache_size)
+    if os.path.basename(path) == MANIFEST_FILENAME:
+        return BenchmarkData(os.path.dirname(path) or ".", cache_size=cache_size)
+    return LegacyBenchmarkData(path)
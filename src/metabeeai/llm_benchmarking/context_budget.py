@@ -0,0 +1,126 @@
+"""
+Token-aware packing of benchmark test case contexts.
+
+Without a budget, a test case carries the whole paper as its context (and as its
+retrieval context when it has no chunk_ids), so long papers make every metric
+measurement slow and expensive. ``ContextBudget`` packs the chunks of a paper into
+a fixed number of tokens, counted with the evaluation model's tokenizer:
+
+1. the retrieval chunks of the test case, in the order of its ``chunk_ids``
+2. then the other chunks, nearest to a retrieval chunk in paper order first
+
+A chunk that does not fit in the remaining budget is left out and smaller chunks
+are still tried. Every metric measurement of the test case sees at most the
+budget in context tokens, and the tokens left out are reported per test case.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+# Rough fallback when the model's tokenizer is not available
+CHARS_PER_TOKEN = 4
+
+
+def make_token_counter(model: str) -> Callable[[str], int]:
+    """
+    Return a function counting the tokens of a text with the tokenizer of ``model``.
+
+    Uses litellm's ``token_counter`` (tiktoken for OpenAI models) like the LLM
+    pipeline's rate limiter, and ~4 characters per token when it is unavailable.
+    """
+    try:
+        from litellm import token_counter
+    except ImportError:
+        token_counter = None
+
+    def count(text: str) -> int:
+        if token_counter is not None:
+            try:
+                return int(token_counter(model=model, text=text))
+            except Exception:
+                pass
+        return len(text) // CHARS_PER_TOKEN
+
+    return count
+
+
+class ContextBudget:
+    """
+    Pack paper chunks into at most ``max_tokens`` tokens.
+
+    Token counts are kept for the chunks of the last paper packed, as the test cases
+    of a paper follow each other in the benchmark data.
+
+    Args:
+        model: Evaluation model whose tokenizer counts the tokens
+        max_tokens: Maximum number of context tokens per test case
+        token_counter: Function counting the tokens of a text (defaults to the model's tokenizer)
+    """
+
+    def __init__(self, model: str, max_tokens: int, token_counter: Optional[Callable[[str], int]] = None):
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        self.model = model
+        self.max_tokens = max_tokens
+        self.count = token_counter or make_token_counter(model)
+        self._paper_id = None
+        self._counts = {}
+
+    def _tokens(self, paper_id: Any, chunk_id: str, text: str) -> int:
+        if paper_id != self._paper_id:
+            self._paper_id = paper_id
+            self._counts = {}
+        if chunk_id not in self._counts:
+            self._counts[chunk_id] = self.count(text)
+        return self._counts[chunk_id]
+
+    def pack(self, paper_id: Any, chunk_map: Dict[str, str], chunk_ids: Optional[List[str]]) -> Dict[str, Any]:
+        """
+        Pack the chunks of a paper for one test case.
+
+        Args:
+            paper_id: Paper of the test case
+            chunk_map: chunk_id -> text of the paper, in paper order
+            chunk_ids: Retrieval chunk ids of the test case, most relevant first
+
+        Returns:
+            Dict[str, Any]: ``context`` (packed chunks in paper order), ``retrieval_context``
+            (packed retrieval chunks in ``chunk_ids`` order), ``tokens`` (tokens of the packed
+            context), ``trimmed_tokens`` (tokens of the paper left out), and ``retrieval_tokens``
+            and ``retrieval_trimmed_tokens`` (tokens of the retrieval chunks packed and left out).
+        """
+        tokens = {chunk_id: self._tokens(paper_id, chunk_id, text) for chunk_id, text in chunk_map.items()}
+        positions = {chunk_id: position for position, chunk_id in enumerate(chunk_map)}
+        retrieval_ids = list(dict.fromkeys(chunk_id for chunk_id in chunk_ids or [] if chunk_id in chunk_map))
+        retrieval_set = set(retrieval_ids)
+
+        selected = set()
+        used = 0
+
+        def take(chunk_id):
+            nonlocal used
+            if used + tokens[chunk_id] <= self.max_tokens:
+                selected.add(chunk_id)
+                used += tokens[chunk_id]
+
+        for chunk_id in retrieval_ids:
+            take(chunk_id)
+
+        # Neighbours of the retrieval chunks, nearest first (from the start of the paper without any)
+        anchors = [positions[chunk_id] for chunk_id in retrieval_ids] or [-1]
+        neighbours = sorted(
+            (chunk_id for chunk_id in chunk_map if chunk_id not in retrieval_set),
+            key=lambda chunk_id: (min(abs(positions[chunk_id] - anchor) for anchor in anchors), positions[chunk_id]),
+        )
+        for chunk_id in neighbours:
+            if used >= self.max_tokens:
+                break
+            take(chunk_id)
+
+        return {
+            "context": [text for chunk_id, text in chunk_map.items() if chunk_id in selected],
+            "retrieval_context": [chunk_map[chunk_id] for chunk_id in retrieval_ids if chunk_id in selected],
+            "tokens": used,
+            "trimmed_tokens": sum(tokens.values()) - used,
+            "retrieval_tokens": sum(tokens[chunk_id] for chunk_id in retrieval_ids if chunk_id in selected),
+            "retrieval_trimmed_tokens": sum(tokens[chunk_id] for chunk_id in retrieval_ids if chunk_id not in selected),
+        }
@@ -1,20 +1,29 @@
 """
 DeepEval benchmarking script that evaluates LLM outputs against GUI reviewer answers.
 
-Reads from benchmark_data_gui.json (output from prep_benchmark_data.py)
-and compares LLM-generated answers (actual_output) with reviewer answers (expected_output)
+Reads the benchmark dataset written by prep_benchmark_data.py (the normalized
+benchmark_data_gui directory or a legacy benchmark_data_gui.json) and compares
+LLM-generated answers (actual_output) with reviewer answers (expected_output)
 from the GUI interface.
 """
 
 import argparse
 import datetime
-import json
 import os
 import sys
 
 from dotenv import load_dotenv
 
 from metabeeai.config import get_data_dir
+from metabeeai.llm_benchmarking.async_evaluation import (
+    DEFAULT_CONCURRENCY,
+    evaluate_concurrently,
+    make_batch_results,
+)
+from metabeeai.llm_benchmarking.benchmark_data import get_default_benchmark_path, open_benchmark_data
+from metabeeai.llm_benchmarking.context_budget import ContextBudget
+from metabeeai.llm_benchmarking.evaluation_cache import EvaluationCache, get_evaluation_cache_path
+from metabeeai.llm_benchmarking.results_writer import ResultsWriter
 
 # Add parent directory to path to access config
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -22,6 +31,40 @@ parent_dir = os.path.dirname(script_dir)
 sys.path.insert(0, parent_dir)
 
 
+def build_metric_factories(evaluation_model):
+    """
+    Return factories of the evaluation metrics: 3 standard metrics followed by 2 G-Eval metrics.
+
+    Each call of a factory returns a new metric instance, so that concurrent
+    measurements do not share the score and reason stored on a metric.
+    """
+    from deepeval.metrics import ContextualPrecisionMetric, ContextualRecallMetric, FaithfulnessMetric, GEval
+    from deepeval.test_case import LLMTestCaseParams
+
+    def geval(name, criteria):
+        return GEval(
+            name=name,
+            criteria=criteria,
+            evaluation_params=[LLMTestCaseParams.ACTUAL_OUTPUT, LLMTestCaseParams.EXPECTED_OUTPUT],
+            model=evaluation_model,
+            strict_mode=False,
+        )
+
+    return [
+        lambda: FaithfulnessMetric(model=evaluation_model),
+        lambda: ContextualPrecisionMetric(model=evaluation_model),
+        lambda: ContextualRecallMetric(model=evaluation_model),
+        lambda: geval(
+            "Completeness",
+            "Completeness - assess if output covers all the key points mentioned in the expected output.",
+        ),
+        lambda: geval(
+            "Accuracy",
+            "Accuracy - evaluate if output contains accurate information that aligns with the expected output.",
+        ),
+    ]
+
+
 def main():
     """Main entry point for the deepeval benchmarking script."""
     # Load environment variables from .env file
@@ -37,13 +80,40 @@ def main():
         " Must match a question_key from the benchmark data.",
     )
     parser.add_argument(
-        "--input", "-i", type=str, default=None, help="Input benchmark data file (default: auto-detect from config)"
+        "--input",
+        "-i",
+        type=str,
+        default=None,
+        help="Input benchmark data directory or legacy JSON file (default: auto-detect from config)",
     )
     parser.add_argument("--limit", "-l", type=int, help="Maximum number of test cases to process (optional)")
     parser.add_argument(
         "--batch-size", "-b", type=int, default=25, help="Number of test cases to process per batch (default: 25)"
     )
-    parser.add_argument("--max-retries", "-r", type=int, default=5, help="Maximum retries per batch (default: 5)")
+    parser.add_argument(
+        "--max-retries",
+        "-r",
+        type=int,
+        default=5,
+        help="Maximum retries per batch, or per (test case, metric) with --async-eval (default: 5)",
+    )
+    parser.add_argument(
+        "--async-eval",
+        action="store_true",
+        help="Measure the metrics of many test cases concurrently instead of evaluating one batch at a time",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Metric measurements running at once with --async-eval (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="Maximum metric measurements started per minute with --async-eval (default: no limit)",
+    )
     parser.add_argument(
         "--model",
         "-m",
@@ -63,47 +133,43 @@ def main():
         action="store_true",
         help="Use only retrieval_context instead of full context to reduce token usage",
     )
+    parser.add_argument(
+        "--context-token-budget",
+        type=int,
+        default=None,
+        help="Maximum context tokens per test case (model tokenizer): retrieval chunks are packed first, "
+        "then their neighbouring chunks (default: no budget)",
+    )
     parser.add_argument(
         "--list-questions", action="store_true", help="List all available question keys in the benchmark data and exit"
     )
+    parser.add_argument(
+        "--output-prefix",
+        type=str,
+        default=None,
+        help="Results file path without extension; a bare name is placed in deepeval_results/. Re-using the prefix "
+        "of an interrupted run resumes it (default: combined_results_<question>_<timestamp>)",
+    )
+    parser.add_argument(
+        "--no-eval-cache",
+        action="store_true",
+        help="Re-score every test case instead of re-using the metric results of unchanged test cases "
+        "(<data dir>/cache/evaluation_cache.sqlite)",
+    )
 
     args = parser.parse_args()
 
     # Set default input path if not provided (use same logic as prep_benchmark_data.py)
     if args.input is None:
-        args.input = os.path.join(get_data_dir(), "benchmark_data_gui.json")
+        args.input = get_default_benchmark_path(get_data_dir())
 
     # Load benchmark dataset first (needed for --list-questions)
     # This is done before API key check so we can list questions without API key
+    # Only the test cases are loaded here; paper contexts are read when test cases are built
     print(f"Loading benchmark data from: {args.input}")
-    with open(args.input, "r") as f:
-        raw_data = json.load(f)
-
-    # Expected format: {papers: {...}, test_cases: [...]}
-    if not isinstance(raw_data, dict) or "test_cases" not in raw_data:
-        raise ValueError(
-            "Invalid format: Expected dict with 'papers' and 'test_cases' keys.\n"
-            "This script only works with output from prep_benchmark_data.py"
-        )
-
-    papers_data = raw_data.get("papers", {})
-    test_cases_data = raw_data.get("test_cases", [])
-    print(f"Loaded {len(papers_data)} papers, {len(test_cases_data)} test cases")
-
-    # Expand test cases with context from papers_data
-    data = []
-    for entry in test_cases_data:
-        # Create a copy to avoid modifying the original
-        entry_copy = entry.copy()
-        paper_id = entry_copy.get("paper_id")
-        if paper_id and paper_id in papers_data:
-            # Add context from papers_data
-            entry_copy["context"] = papers_data[paper_id].get("context", [])
-        else:
-            # Error if paper not found
-            print(f"[WARNING] No context found for paper_id '{paper_id}', using empty context")
-            entry_copy["context"] = []
-        data.append(entry_copy)
+    benchmark_data = open_benchmark_data(args.input)
+    data = list(benchmark_data.iter_test_cases())
+    print(f"Loaded {len(benchmark_data.papers)} papers, {len(data)} test cases")
 
     # Extract available question keys from the data
     available_question_keys = sorted(set(entry.get("question_key") for entry in data if entry.get("question_key")))
@@ -145,9 +211,8 @@ def main():
 
     from deepeval import evaluate
     from deepeval.dataset import EvaluationDataset
-    from deepeval.metrics import ContextualPrecisionMetric, ContextualRecallMetric, FaithfulnessMetric, GEval
     from deepeval.models import GPTModel
-    from deepeval.test_case import LLMTestCase, LLMTestCaseParams
+    from deepeval.test_case import LLMTestCase
 
     print(f"Available question keys in dataset: {', '.join(available_question_keys) if available_question_keys else 'None'}")
 
@@ -173,31 +238,67 @@ def main():
     # Create the dataset
     dataset = EvaluationDataset()
 
+    # Contexts are packed into the token budget of each metric measurement, if one is set
+    context_budget = ContextBudget(args.model, args.context_token_budget) if args.context_token_budget else None
+    trimmed_count = 0
+    trimmed_total = 0
+
     # Add test cases to the dataset
     skipped_count = 0
+    long_context_count = 0
     for i, entry in enumerate(filtered_data):
         if i % 10 == 0:  # Progress indicator
             print(f"Processing test case {i+1}/{len(filtered_data)}")
 
+        # Paper context is shared between the test cases of a paper, not copied into each
+        paper_id = entry.get("paper_id")
+        context = benchmark_data.context(paper_id)
+        if not context:
+            print(f"[WARNING] No context found for paper_id '{paper_id}', using empty context")
+
         # Check for required fields and skip if missing
-        required_fields = ["input", "actual_output", "expected_output", "context"]
+        required_fields = ["input", "actual_output", "expected_output"]
         missing_fields = [field for field in required_fields if not entry.get(field)]
+        if not context:
+            missing_fields.append("context")
 
         if missing_fields:
             print(f"[WARNING] Skipping test case {i+1}: Missing fields {missing_fields}")
             skipped_count += 1
             continue
 
+        if len(str(context)) > 100000:
+            long_context_count += 1
+
         # Get retrieval_context, use context as fallback if missing
-        retrieval_context = entry.get("retrieval_context")
+        retrieval_context = benchmark_data.retrieval_context(entry)
+        budget_metadata = {}
+        if context_budget is not None:
+            # Retrieval chunks first, then their neighbours, up to the token budget
+            packed = context_budget.pack(paper_id, benchmark_data.chunk_map(paper_id), entry.get("chunk_ids"))
+            if not packed["context"]:
+                print(f"[WARNING] Skipping test case {i+1}: No chunk fits in {args.context_token_budget:,} tokens")
+                skipped_count += 1
+                continue
+            context = packed["context"]
+            retrieval_context = packed["retrieval_context"]
+            if args.use_retrieval_only and retrieval_context:
+                kept_tokens, trimmed_tokens = packed["retrieval_tokens"], packed["retrieval_trimmed_tokens"]
+            else:
+                kept_tokens, trimmed_tokens = packed["tokens"], packed["trimmed_tokens"]
+            budget_metadata = {"context_tokens": kept_tokens, "context_tokens_trimmed": trimmed_tokens}
+            if trimmed_tokens:
+                trimmed_count += 1
+                trimmed_total += trimmed_tokens
+                print(f"Test case {i+1}: trimmed {trimmed_tokens:,} context tokens (kept {kept_tokens:,})")
         if not retrieval_context:
-            retrieval_context = entry["context"]  # Use context as fallback
+            retrieval_context = context  # Use context as fallback
 
         # Optionally use only retrieval context to reduce token usage
         if args.use_retrieval_only:
             context_to_use = retrieval_context
         else:
-            context_to_use = entry["context"]
+            context_to_use = context
 
         # Check context length to avoid token limit issues
         context_length = len(str(context_to_use))
@@ -224,6 +325,7 @@ def main():
                     "question_key": entry.get("question_key"),
                     "chunk_ids": entry.get("chunk_ids", []),
                     "user_rating": entry.get("user_rating"),  # Include user_rating if available
+                    **budget_metadata,
                 },
             )
 
@@ -245,8 +347,13 @@ def main():
     print("Dataset created successfully!")
     print(f"Dataset contains {len(dataset.test_cases)} test cases")
 
+    if context_budget is not None:
+        print(
+            f"Context token budget: {args.context_token_budget:,} tokens, "
+            f"{trimmed_count} test cases trimmed by {trimmed_total:,} tokens in total"
+        )
+
     # Warn about long contexts
-    long_context_count = sum(1 for entry in filtered_data if len(str(entry.get("context", ""))) > 100000)
     if long_context_count > 0:
         print(f"[WARNING] {long_context_count} test cases have very long context (>100K chars)")
         print("RECOMMENDED: Use --batch-size 10-15 or --use-retrieval-only for best stability")
@@ -261,30 +368,10 @@ def main():
     evaluation_model = GPTModel(model=args.model)
 
     # Define ALL metrics: Standard + G-Eval
-    standard_metrics = [
-        FaithfulnessMetric(model=evaluation_model),
-        ContextualPrecisionMetric(model=evaluation_model),
-        ContextualRecallMetric(model=evaluation_model),
-    ]
-
-    geval_metrics = [
-        GEval(
-            name="Completeness",
-            criteria="Completeness - assess if output covers all the key points mentioned in the expected output.",
-            evaluation_params=[LLMTestCaseParams.ACTUAL_OUTPUT, LLMTestCaseParams.EXPECTED_OUTPUT],
-            model=evaluation_model,
-            strict_mode=False,
-        ),
-        GEval(
-            name="Accuracy",
-            criteria="Accuracy - evaluate if output contains accurate information that aligns with the expected output.",
-            evaluation_params=[LLMTestCaseParams.ACTUAL_OUTPUT, LLMTestCaseParams.EXPECTED_OUTPUT],
-            model=evaluation_model,
-            strict_mode=False,
-        ),
-    ]
-
-    metrics = standard_metrics + geval_metrics
+    metric_factories = build_metric_factories(evaluation_model)
+    metrics = [factory() for factory in metric_factories]
+    standard_metrics = metrics[:3]
+    geval_metrics = metrics[3:]
 
     print(f"\nUsing {args.model} for evaluation")
 
@@ -340,44 +427,42 @@ def main():
     results_dir = os.path.join(input_dir, "deepeval_results")
     os.makedirs(results_dir, exist_ok=True)
 
-    # Generate unique filenames
-    results_file = f"{results_dir}/combined_results_{question_type}_{timestamp}.json"
-    results_jsonl_file = f"{results_dir}/combined_results_{question_type}_{timestamp}.jsonl"
-
-    print(f"\nOutput files will be saved in: {results_dir}/")
-    print(f"File prefix: combined_results_{question_type}_{timestamp}")
-
-    # Function to save results incrementally (without context fields)
-    def save_results_incrementally(results_list, filename, jsonl_filename):
-        """Save results incrementally without context/retrieval_context fields"""
-        try:
-            # Remove context fields from results before saving
-            cleaned_results = []
-            for result in results_list:
-                cleaned_result = result.copy()
-                # Remove context fields to save space
-                cleaned_result.pop("context", None)
-                cleaned_result.pop("retrieval_context", None)
-                cleaned_results.append(cleaned_result)
-
-            # Save as JSON
-            with open(filename, "w") as f:
-                json.dump(cleaned_results, f, indent=2)
-
-            # Save as JSONL
-            with open(jsonl_filename, "w") as f:
-                for result in cleaned_results:
-                    f.write(json.dumps(result) + "\n")
-
-            print(f"Incremental save: {len(cleaned_results)} results saved to {filename}")
-            return True
-        except Exception as e:
-            print(f"[WARNING] Incremental save failed: {e}")
-            return False
+    # Generate unique filenames (or reuse those of the run being resumed)
+    output_prefix = args.output_prefix or f"combined_results_{question_type}_{timestamp}"
+    if not os.path.dirname(output_prefix):
+        output_prefix = os.path.join(results_dir, output_prefix)
+    results_writer = ResultsWriter(output_prefix)
+    results_file = results_writer.json_path
+    results_jsonl_file = results_writer.jsonl_path
+
+    print(f"\nOutput files will be saved in: {os.path.dirname(output_prefix)}/")
+    print(f"File prefix: {os.path.basename(output_prefix)}")
+
+    # Skip the test cases already recorded by an earlier run with the same prefix
+    completed = results_writer.completed_keys()
+    pending_indices = [
+        i
+        for i, test_case in enumerate(dataset.test_cases)
+        if (test_case.additional_metadata.get("paper_id"), test_case.additional_metadata.get("question_key")) not in completed
+    ]
+    pending_cases = [dataset.test_cases[i] for i in pending_indices]
+    if completed:
+        print(f"Resuming: {len(dataset.test_cases) - len(pending_cases)} test cases already recorded in {results_jsonl_file}")
+
+    # Test cases unchanged since an earlier run go straight to the results file with their cached scores
+    evaluation_cache = None
+    if not args.no_eval_cache:
+        evaluation_cache = EvaluationCache(get_evaluation_cache_path(), args.model)
+        cached_results, pending_cases, pending_indices = evaluation_cache.split_cached(
+            pending_cases, pending_indices, metrics
+        )
+        for result in cached_results:
+            results_writer.append(result)
+        print(f"Evaluation cache: {len(cached_results)} test cases unchanged, {len(pending_cases)} to evaluate")
 
     # Function to process test cases in batches
-    def process_test_cases_in_batches(test_cases, batch_size=25, max_retries=5):
-        """Process test cases in batches and save incrementally with retry limits"""
+    def process_test_cases_in_batches(test_cases, indices, batch_size=25, max_retries=5):
+        """Process test cases in batches and append each batch's results with retry limits"""
         total_cases = len(test_cases)
         processed_results = []
 
@@ -406,49 +491,23 @@ def main():
                     # The evaluate() function returns an EvaluationResult with test_results attribute
                     test_results = getattr(eval_output, "test_results", batch_cases)
 
-                    # Extract results from test cases
-                    for idx, test_case in enumerate(test_results):
-                        result_dict = {
-                            "test_case_index": batch_start + idx,
-                            "name": test_case.name if hasattr(test_case, "name") else f"case_{batch_start + idx}",
-                            "paper_id": test_case.additional_metadata.get("paper_id"),
-                            "question_key": test_case.additional_metadata.get("question_key"),
-                            "input": test_case.input,
-                            "actual_output": test_case.actual_output,
-                            "expected_output": test_case.expected_output,
-                            "success": False,  # Will be updated based on metrics
-                            "additional_metadata": test_case.additional_metadata,
-                            "metrics_data": [],
-                        }
-
-                        # Extract metric results from test_case.metrics_data
-                        if hasattr(test_case, "metrics_data") and test_case.metrics_data:
-                            all_passed = True
-                            for metric in test_case.metrics_data:
-                                # Build metric data entry matching the expected format
-                                metric_entry = {
-                                    "name": getattr(metric, "__name__", None)
-                                    or getattr(metric, "name", metric.__class__.__name__),
-                                    "score": getattr(metric, "score", None),
-                                    "threshold": getattr(metric, "threshold", None),
-                                    "success": getattr(metric, "success", None),
-                                    "reason": getattr(metric, "reason", None),
-                                    "strict_mode": getattr(metric, "strict_mode", None),
-                                    "evaluation_model": args.model,
-                                    "error": str(getattr(metric, "error", None)) if getattr(metric, "error", None) else None,
-                                    "evaluation_cost": getattr(metric, "evaluation_cost", None),
-                                }
-                                result_dict["metrics_data"].append(metric_entry)
-
-                                if not metric_entry["success"]:
-                                    all_passed = False
-
-                            result_dict["success"] = all_passed
-
-                        processed_results.append(result_dict)
-
-                    # Save incrementally after each batch
-                    save_results_incrementally(processed_results, results_file, results_jsonl_file)
+                    # Match each test result (metric results are in its metrics_data) with its test case
+                    # and store its metric results in the evaluation cache under that test case
+                    batch_pairs = make_batch_results(
+                        batch_cases,
+                        indices[batch_start:batch_end],
+                        test_results,
+                        args.model,
+                        cache=evaluation_cache,
+                        metrics=metrics,
+                    )
+                    batch_results = [result for _, result in batch_pairs]
+
+                    # Append the batch's results once
+                    for result in batch_results:
+                        results_writer.append(result)
+                    processed_results.extend(batch_results)
+                    print(f"Saved: {results_writer.appended} results appended to {results_jsonl_file}")
 
                     batch_success = True
                     print(f"[OK] Batch {batch_start//batch_size + 1} completed successfully")
@@ -463,17 +522,62 @@ def main():
 
         return processed_results
 
-    # Process all test cases in batches
-    print("\n" + "=" * 60)
-    print("Starting batch processing...")
-    print("=" * 60)
+    # Function to measure all (test case, metric) pairs concurrently
+    def process_test_cases_concurrently(test_cases, indices, max_retries=5):
+        """Measure metrics concurrently, retrying each (test case, metric) pair on its own"""
+        processed_results = []
 
-    final_results = process_test_cases_in_batches(dataset.test_cases, batch_size=args.batch_size, max_retries=args.max_retries)
+        print(f"\nMeasuring {len(metric_factories)} metrics for {len(test_cases)} test cases concurrently")
+        rate_limit = f"{args.rate_limit:g} measurements/min" if args.rate_limit else "no rate limit"
+        print(f"Concurrency: {args.concurrency}, {rate_limit}, max retries per measurement: {max_retries}")
+
+        def record(result):
+            # Each result is appended once, as soon as its metrics are done
+            results_writer.append(result)
+            processed_results.append(result)
+            failed = [entry["name"] for entry in result["metrics_data"] if entry["error"]]
+            cached = sum(1 for entry in result["metrics_data"] if entry.get("cached"))
+            status = f" ({', '.join(failed)} failed)" if failed else ""
+            if cached:
+                status += f" ({cached} cached)"
+            print(f"[OK] {len(processed_results)}/{len(test_cases)} {result['name']}{status}")
+
+        return evaluate_concurrently(
+            test_cases,
+            metric_factories,
+            args.model,
+            concurrency=args.concurrency,
+            rate_per_minute=args.rate_limit,
+            max_retries=max_retries,
+            on_result=record,
+            indices=indices,
+            cache=evaluation_cache,
+        )
 
-    # Final save
-    print("\n" + "=" * 60)
-    print("Saving final results...")
-    save_results_incrementally(final_results, results_file, results_jsonl_file)
+    try:
+        if args.async_eval:
+            print("\n" + "=" * 60)
+            print("Starting concurrent evaluation...")
+            print("=" * 60)
+
+            process_test_cases_concurrently(pending_cases, pending_indices, max_retries=args.max_retries)
+        else:
+            # Process all test cases in batches
+            print("\n" + "=" * 60)
+            print("Starting batch processing...")
+            print("=" * 60)
+
+            process_test_cases_in_batches(
+                pending_cases, pending_indices, batch_size=args.batch_size, max_retries=args.max_retries
+            )
+    finally:
+        # Write the consolidated JSON once, also when the run is interrupted
+        print("\n" + "=" * 60)
+        print("Saving final results...")
+        final_results = results_writer.consolidate()
+        if evaluation_cache is not None:
+            cache_stats = evaluation_cache.stats()
+            evaluation_cache.close()
 
     # Print summary statistics
     print("\n" + "=" * 60)
@@ -482,6 +586,11 @@ def main():
     print(f"Total test cases processed: {len(final_results)}")
     print(f"Results saved to: {results_file}")
     print(f"JSONL format: {results_jsonl_file}")
+    if evaluation_cache is not None:
+        print(
+            f"Evaluation cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+            f"{cache_stats['entries']} entries ({evaluation_cache.path})"
+        )
 
     # Calculate average scores
     if final_results:
@@ -0,0 +1,149 @@
+"""
+Persistent cache of DeepEval metric results.
+
+Scoring a test case means one or more judge model calls per metric, and most test
+cases are unchanged between two ``metabeeai benchmark`` runs. Each metric result is
+stored in a SQLite database under ``<METABEEAI_DATA_DIR>/cache`` (the same store as
+the LLM pipeline's response cache), keyed by a SHA-256 hash of everything that
+determines the score:
+
+- the test case's input, actual_output, expected_output, context and retrieval_context
+- the metric's name, threshold, strict mode and G-Eval criteria/evaluation steps
+- the evaluation model
+
+A test case whose metrics are all cached is written straight to the results file;
+re-running after adding a few newly reviewed papers only pays for the new test cases.
+Measurements that failed are never cached.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from metabeeai.llm_benchmarking.async_evaluation import make_result, metric_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVALUATION_CACHE_FILENAME = "evaluation_cache.sqlite"
+DEFAULT_MAX_SIZE_MB = 256
+
+
+def make_evaluation_key(test_case: Any, metric: Any, evaluation_model: str) -> str:
+    """
+    Build the cache key of one metric measured on one test case.
+
+    Args:
+        test_case: DeepEval test case
+        metric: Metric instance (only its configuration is used, not its score)
+        evaluation_model: Name of the judge model
+
+    Returns:
+        str: Hex SHA-256 digest identifying the measurement.
+    """
+    payload = {
+        "input": getattr(test_case, "input", None),
+        "actual_output": getattr(test_case, "actual_output", None),
+        "expected_output": getattr(test_case, "expected_output", None),
+        "context": getattr(test_case, "context", None),
+        "retrieval_context": getattr(test_case, "retrieval_context", None),
+        "metric": metric_name(metric),
+        "threshold": getattr(metric, "threshold", None),
+        "strict_mode": getattr(metric, "strict_mode", None),
+        "criteria": getattr(metric, "criteria", None),
+        "evaluation_steps": getattr(metric, "evaluation_steps", None),
+        "evaluation_model": evaluation_model,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def get_evaluation_cache_path() -> str:
+    """Get the path of the evaluation cache database inside the data directory."""
+    from metabeeai.metabeeai_llm.llm_cache import get_cache_path
+
+    return get_cache_path(DEFAULT_EVALUATION_CACHE_FILENAME)
+
+
+class EvaluationCache:
+    """
+    Metric results entries stored by ``make_evaluation_key``.
+
+    Entries returned by the cache are marked with ``"cached": True``.
+
+    Args:
+        path: Path of the SQLite database file (created if missing)
+        evaluation_model: Name of the judge model
+        max_size_mb: Maximum total size of the stored entries before eviction
+    """
+
+    def __init__(self, path: str, evaluation_model: str, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        from metabeeai.metabeeai_llm.llm_cache import LLMCache
+
+        self.path = path
+        self.evaluation_model = evaluation_model
+        self.store = LLMCache(path, max_size_mb=max_size_mb)
+
+    def get(self, test_case: Any, metric: Any) -> Optional[Dict[str, Any]]:
+        """Return the cached results entry of ``metric`` on ``test_case``, or None on a miss."""
+        value = self.store.get(make_evaluation_key(test_case, metric, self.evaluation_model))
+        if value is None:
+            return None
+        try:
+            entry = json.loads(value)
+        except ValueError:
+            logger.warning(f"Ignoring unreadable evaluation cache entry in {self.path}")
+            return None
+        entry["cached"] = True
+        return entry
+
+    def set(self, test_case: Any, metric: Any, entry: Dict[str, Any]):
+        """Store a results entry, unless its measurement failed."""
+        if entry.get("error") or entry.get("score") is None:
+            return
+        value = json.dumps({key: value for key, value in entry.items() if key != "cached"})
+        self.store.set(make_evaluation_key(test_case, metric, self.evaluation_model), value)
+
+    def set_all(self, test_case: Any, metrics: Sequence[Any], entries: Sequence[Dict[str, Any]]):
+        """Store the results entries of a test case, matching them to ``metrics`` by name."""
+        metrics_by_name = {metric_name(metric): metric for metric in metrics}
+        for entry in entries:
+            metric = metrics_by_name.get(entry.get("name"))
+            if metric is not None:
+                self.set(test_case, metric, entry)
+
+    def split_cached(
+        self, test_cases: Sequence[Any], indices: Sequence[int], metrics: Sequence[Any]
+    ) -> Tuple[List[Dict[str, Any]], List[Any], List[int]]:
+        """
+        Separate the test cases whose metrics are all cached from those still to evaluate.
+
+        Args:
+            test_cases: DeepEval test cases
+            indices: ``test_case_index`` of each test case
+            metrics: Metric instances measured on every test case
+
+        Returns:
+            Tuple: Results of the fully cached test cases, then the remaining test cases and their indices.
+        """
+        cached_results, pending_cases, pending_indices = [], [], []
+        for index, test_case in zip(indices, test_cases):
+            entries = []
+            for metric in metrics:
+                entry = self.get(test_case, metric)
+                if entry is None:
+                    break
+                entries.append(entry)
+            if len(entries) == len(metrics):
+                cached_results.append(make_result(index, test_case, entries))
+            else:
+                pending_cases.append(test_case)
+                pending_indices.append(index)
+        return cached_results, pending_cases, pending_indices
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size of the cache."""
+        return self.store.stats()
+
+    def close(self):
+        self.store.close()
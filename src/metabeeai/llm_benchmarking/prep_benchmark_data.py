@@ -12,6 +12,13 @@ import sys
 import yaml
 
 from metabeeai.config import get_data_dir, get_papers_dir
+from metabeeai.llm_benchmarking.benchmark_data import (
+    DATA_FORMATS,
+    DEFAULT_BENCHMARK_NAME,
+    infer_data_format,
+    open_benchmark_writer,
+    select_chunks,
+)
 
 # Add parent directory to path to access config
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -62,15 +69,7 @@ def get_text_chunks(merged_data):
 
 def get_retrieval_context(chunk_map, chunk_ids):
     """Get the text for specific chunk IDs (retrieval context)."""
-    if not chunk_ids:
-        return []
-
-    retrieval_texts = []
-    for chunk_id in chunk_ids:
-        if chunk_id in chunk_map:
-            retrieval_texts.append(chunk_map[chunk_id])
-
-    return retrieval_texts
+    return select_chunks(chunk_map, chunk_ids)
 
 
 def extract_question_name(question_path):
@@ -154,16 +153,22 @@ def extract_user_rating(extended_data, question_key):
     return None
 
 
-def prepare_benchmark_data(papers_dir, questions_yml_path, output_path):
+def prepare_benchmark_data(papers_dir, questions_yml_path, output_path, data_format=None):
     """
     Prepare benchmarking data by extracting questions, answers, and context.
     Uses answers_extended.json for reviewer answers.
 
+    Papers are written one at a time, so with the normalized format memory use does
+    not grow with the number of papers.
+
     Args:
         papers_dir: Path to the directory containing paper folders
         questions_yml_path: Path to questions.yml file
-        output_path: Path to save the output JSON file
+        output_path: Output directory (normalized "jsonl" format) or JSON file ("json" format)
+        data_format: "jsonl" or "json" (default: "json" for a .json output path, "jsonl" otherwise)
     """
+    data_format = data_format or infer_data_format(output_path)
+
     # Load questions from yml
     questions = load_questions_from_yml(questions_yml_path)
 
@@ -172,9 +177,9 @@ def prepare_benchmark_data(papers_dir, questions_yml_path, output_path):
     print(f"Found {len(questions)} questions: {list(questions.keys())}")
     print("=" * 60)
 
-    # New structure: papers dict and test_cases list
-    papers_data = {}  # paper_id -> {context: [...], chunk_map: {...}}
-    test_cases = []  # List of test case entries
+    # Chunks are stored once per paper; test cases reference them by chunk id
+    writer = open_benchmark_writer(output_path, data_format)
+    question_counts = {}
     papers_processed = 0
     papers_skipped = 0
 
@@ -218,7 +223,6 @@ def prepare_benchmark_data(papers_dir, questions_yml_path, output_path):
 
         # Get all text chunks
         chunk_map = get_text_chunks(merged_data)
-        all_context = list(chunk_map.values())
 
         print(f"  Found {len(chunk_map)} text chunks")
 
@@ -245,22 +249,22 @@ def prepare_benchmark_data(papers_dir, questions_yml_path, output_path):
             retrieval_context = get_retrieval_context(chunk_map, llm_chunk_ids)
 
             # Store paper context once (first time we encounter this paper)
-            if paper_id not in papers_data:
-                papers_data[paper_id] = {"context": all_context, "chunk_map": chunk_map}
+            if not paper_has_questions:
+                writer.add_paper(paper_id, chunk_map)
 
-            # Create test case entry (without full context - it's stored in papers_data)
+            # Create test case entry (the context is stored with the paper, chunk_ids reference it)
             entry = {
                 "paper_id": paper_id,
                 "question_key": question_key,
                 "input": question_text,
                 "actual_output": llm_answer,
                 "expected_output": reviewer_answer,
-                "retrieval_context": retrieval_context,
                 "chunk_ids": llm_chunk_ids,
                 "user_rating": user_rating,
             }
 
-            test_cases.append(entry)
+            writer.add_test_case(entry)
+            question_counts[question_key] = question_counts.get(question_key, 0) + 1
             paper_has_questions = True
             rating_str = f", Rating: {user_rating}" if user_rating is not None else ""
             print(
@@ -272,28 +276,19 @@ def prepare_benchmark_data(papers_dir, questions_yml_path, output_path):
         if paper_has_questions:
             papers_processed += 1
 
-    # Save to JSON file with new structure
-    output_data = {"papers": papers_data, "test_cases": test_cases}
-
-    with open(output_path, "w") as f:
-        json.dump(output_data, f, indent=2)
+    writer.close()
 
     # Summary
     print("\n" + "=" * 60)
     print("BENCHMARK DATA PREPARATION COMPLETED!")
     print(f"[OK] Papers processed: {papers_processed}")
     print(f"[SKIP] Papers skipped: {papers_skipped}")
-    print(f"Total benchmark entries: {len(test_cases)}")
-    print(f"Papers with context: {len(papers_data)}")
-    print(f"Output saved to: {output_path}")
+    print(f"Total benchmark entries: {writer.num_test_cases}")
+    print(f"Papers with context: {len(writer.papers)}")
+    print(f"Output saved to: {output_path} ({data_format} format)")
 
     # Print statistics by question type
     print("\nEntries by question type:")
-    question_counts = {}
-    for entry in test_cases:
-        q_key = entry["question_key"]
-        question_counts[q_key] = question_counts.get(q_key, 0) + 1
-
     for q_key, count in sorted(question_counts.items()):
         print(f"  - {q_key}: {count} entries")
 
@@ -314,7 +309,20 @@ def main():
     parser.add_argument(
         "--questions-yml", type=str, default=None, help="Path to questions.yml file (default: ../metabeeai_llm/questions.yml)"
     )
-    parser.add_argument("--output", type=str, default=None, help="Output file path (default: data/benchmark_data_gui.json)")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Output directory, or JSON file for the legacy format (default: data/benchmark_data_gui)",
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=DATA_FORMATS,
+        default=None,
+        help="Output format: jsonl (chunk table + test cases referencing chunk ids, read lazily) or json "
+        "(legacy single file) (default: json for a .json output path, jsonl otherwise)",
+    )
 
     args = parser.parse_args()
 
@@ -326,10 +334,11 @@ def main():
         args.questions_yml = os.path.join(parent_dir, "metabeeai_llm", "questions.yml")
 
     if args.output is None:
-        args.output = os.path.join(get_data_dir(), "benchmark_data_gui.json")
+        suffix = ".json" if args.format == "json" else ""
+        args.output = os.path.join(get_data_dir(), f"{DEFAULT_BENCHMARK_NAME}{suffix}")
 
     # Run the preparation
-    prepare_benchmark_data(args.papers_dir, args.questions_yml, args.output)
+    prepare_benchmark_data(args.papers_dir, args.questions_yml, args.output, data_format=args.format)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+"""
+Append-only writer of DeepEval benchmarking results.
+
+Each completed test case result is appended once to ``<prefix>.jsonl`` and flushed,
+so the cost of saving grows linearly with the number of test cases and an
+interrupted run loses at most the results still in flight. ``consolidate`` writes
+the ``<prefix>.json`` list read by plot_metrics_comparison.py and edge_cases.py once,
+at the end of the run.
+
+A run started with the prefix of an earlier run resumes it: the test cases already
+recorded in ``<prefix>.jsonl`` are reported by ``completed_keys`` and skipped, except
+those with a failed metric measurement, which are evaluated again.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+# Fields left out of saved results to save space
+EXCLUDED_FIELDS = ("context", "retrieval_context")
+
+ResultKey = Tuple[Optional[str], Optional[str]]
+
+
+def result_key(result: Dict[str, Any]) -> ResultKey:
+    """
+    Identify the test case of a result by (paper_id, question_key).
+
+    Unlike the test case index and name, this does not change when papers are added
+    to the benchmark data between runs. A result without either is identified by its
+    name (or index) instead, so that such results cannot collide.
+    """
+    metadata = result.get("additional_metadata") or {}
+    paper_id = result.get("paper_id") or metadata.get("paper_id")
+    question_key = result.get("question_key") or metadata.get("question_key")
+    if paper_id is None and question_key is None:
+        return None, result.get("name") or f"case_{result.get('test_case_index')}"
+    return paper_id, question_key
+
+
+def has_failed_metric(result: Dict[str, Any]) -> bool:
+    """Return True if a metric measurement of the result failed."""
+    return any(entry.get("error") for entry in result.get("metrics_data") or [])
+
+
+class ResultsWriter:
+    """
+    Append results to ``<prefix>.jsonl`` and consolidate them into ``<prefix>.json``.
+
+    Args:
+        prefix: Output path without extension
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.json_path = f"{prefix}.json"
+        self.jsonl_path = f"{prefix}.jsonl"
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.appended = 0
+        self._file = None
+
+    def iter_recorded(self) -> Iterator[Dict[str, Any]]:
+        """Yield the results recorded in the JSONL file (a line cut off by an interrupted run is skipped)."""
+        if not os.path.exists(self.jsonl_path):
+            return
+        with open(self.jsonl_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def completed_keys(self) -> Set[ResultKey]:
+        """Return the keys of the test cases already recorded, unless a metric failed in their latest result."""
+        failed = {}
+        for result in self.iter_recorded():
+            failed[result_key(result)] = has_failed_metric(result)
+        return {key for key, key_failed in failed.items() if not key_failed}
+
+    def append(self, result: Dict[str, Any]):
+        """Write one result (without its context fields) and flush it to disk."""
+        if self._file is None:
+            self._file = open(self.jsonl_path, "a", encoding="utf-8")
+            # Start on a new line if an interrupted run left a partial line behind
+            if self._file.tell() > 0:
+                with open(self.jsonl_path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._file.write("\n")
+        line = json.dumps({key: value for key, value in result.items() if key not in EXCLUDED_FIELDS})
+        self._file.write(line + "\n")
+        self._file.flush()
+        self.appended += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def consolidate(self) -> List[Dict[str, Any]]:
+        """
+        Write every recorded result to the JSON file, once.
+
+        A test case recorded more than once keeps its latest result.
+
+        Returns:
+            List[Dict[str, Any]]: The consolidated results, ordered by test case index.
+        """
+        self.close()
+        results = {}
+        for result in self.iter_recorded():
+            results[result_key(result)] = result
+        consolidated = sorted(results.values(), key=lambda result: result.get("test_case_index", 0))
+        with open(f"{self.json_path}.tmp", "w") as f:
+            json.dump(consolidated, f, indent=2)
+        os.replace(f"{self.json_path}.tmp", self.json_path)
+        return consolidated
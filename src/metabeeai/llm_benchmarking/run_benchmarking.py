@@ -23,6 +23,7 @@ from datetime import datetime
 from pathlib import Path
 
 from metabeeai.config import get_data_dir
+from metabeeai.llm_benchmarking.benchmark_data import DATA_FORMATS, get_default_benchmark_path
 
 # Add parent directory to path to access config
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -59,6 +60,8 @@ def build_prep_args(args):
         cmd.extend(["--questions-yml", args.prep_questions_yml])
     if args.prep_output:
         cmd.extend(["--output", args.prep_output])
+    if args.prep_format:
+        cmd.extend(["--format", args.prep_format])
     return cmd
 
 
@@ -75,14 +78,26 @@ def build_deepeval_args(args):
         cmd.extend(["--batch-size", str(args.batch_size)])
     if args.max_retries:
         cmd.extend(["--max-retries", str(args.max_retries)])
+    if args.async_eval:
+        cmd.append("--async-eval")
+    if args.concurrency:
+        cmd.extend(["--concurrency", str(args.concurrency)])
+    if args.rate_limit:
+        cmd.extend(["--rate-limit", str(args.rate_limit)])
     if args.model:
         cmd.extend(["--model", args.model])
     if args.max_context_length:
         cmd.extend(["--max-context-length", str(args.max_context_length)])
     if args.use_retrieval_only:
         cmd.append("--use-retrieval-only")
+    if args.context_token_budget:
+        cmd.extend(["--context-token-budget", str(args.context_token_budget)])
     if args.list_questions:
         cmd.append("--list-questions")
+    if args.output_prefix:
+        cmd.extend(["--output-prefix", args.output_prefix])
+    if args.no_eval_cache:
+        cmd.append("--no-eval-cache")
     return cmd
 
 
@@ -202,12 +217,14 @@ Examples:
 
     parser.add_argument("--prep-questions-yml", type=str, default=None, help="[prep] Path to questions.yml file")
 
-    parser.add_argument("--prep-output", type=str, default=None, help="[prep] Output file path for benchmark data")
+    parser.add_argument("--prep-output", type=str, default=None, help="[prep] Output path for benchmark data")
+
+    parser.add_argument("--prep-format", type=str, default=None, choices=DATA_FORMATS, help="[prep] Benchmark data format")
 
     # deepeval_benchmarking.py arguments
     parser.add_argument("--question", "-q", type=str, default=None, help="[eval] Question key to filter by")
 
-    parser.add_argument("--input", "-i", type=str, default=None, help="[eval] Input benchmark data file")
+    parser.add_argument("--input", "-i", type=str, default=None, help="[eval] Input benchmark data directory or JSON file")
 
     parser.add_argument("--limit", "-l", type=int, default=None, help="[eval] Maximum number of test cases to process")
 
@@ -215,6 +232,12 @@ Examples:
 
     parser.add_argument("--max-retries", "-r", type=int, default=None, help="[eval] Maximum retries per batch")
 
+    parser.add_argument("--async-eval", action="store_true", help="[eval] Measure metrics of many test cases concurrently")
+
+    parser.add_argument("--concurrency", type=int, default=None, help="[eval] Metric measurements running at once")
+
+    parser.add_argument("--rate-limit", type=float, default=None, help="[eval] Maximum metric measurements started per minute")
+
     parser.add_argument("--model", "-m", type=str, default=None, help="[eval] OpenAI model to use for evaluation")
 
     parser.add_argument("--max-context-length", type=int, default=None, help="[eval] Maximum context length in characters")
@@ -223,8 +246,14 @@ Examples:
         "--use-retrieval-only", action="store_true", help="[eval] Use only retrieval_context instead of full context"
     )
 
+    parser.add_argument("--context-token-budget", type=int, default=None, help="[eval] Maximum context tokens per test case")
+
     parser.add_argument("--list-questions", action="store_true", help="[eval] List all available question keys and exit")
 
+    parser.add_argument("--output-prefix", type=str, default=None, help="[eval] Results file prefix (re-use to resume a run)")
+
+    parser.add_argument("--no-eval-cache", action="store_true", help="[eval] Re-score unchanged test cases too")
+
     # plot_metrics_comparison.py arguments
     parser.add_argument("--plot-results-dir", type=str, default=None, help="[plot] Directory containing evaluation results")
 
@@ -268,7 +297,7 @@ Examples:
 
     data_dir = get_data_dir()
     print("\nOutput locations:")
-    print(f"  - Benchmark data: {os.path.join(data_dir, 'benchmark_data_gui.json')}")
+    print(f"  - Benchmark data: {get_default_benchmark_path(data_dir)}")
     print(f"  - Evaluation results: {os.path.join(data_dir, 'deepeval_results')}/")
     print(f"  - Plots: {os.path.join(data_dir, 'deepeval_results', 'plots')}/")
     print(f"  - Edge cases: {os.path.join(data_dir, 'edge_cases')}/")
@@ -0,0 +1,91 @@
+"""
+Local lexical pre-ranking of text chunks with Okapi BM25.
+
+``get_top_relevant_chunks`` puts every candidate chunk into a single prompt, so its
+cost grows with the length of the paper. A BM25 index over the chunk texts is built
+once per paper (see ``PaperContext.bm25``) and used to keep only the top-K chunks
+for a question before the LLM is asked to pick the most relevant ones.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+# Common English words that carry no signal for ranking
+STOPWORDS = frozenset(
+    """
+    a about above after again against all also an and any are as at be because been before being below between both
+    but by can could did do does doing down during each few for from further had has have having he her here hers
+    him his how i if in into is it its itself just me more most my no nor not of off on once only or other our ours
+    out over own same she should so some such than that the their theirs them then there these they this those
+    through to too under until up very was we were what when where which while who whom why will with would you
+    your etc
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case ``text`` and split it into word tokens, dropping stopwords and single characters."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Inverted index over a list of documents scored with Okapi BM25.
+
+    Args:
+        documents: Texts to index; results refer to documents by their position in this list
+        k1: Term frequency saturation parameter
+        b: Document length normalisation parameter
+    """
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_lengths = []
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+
+        for doc_id, text in enumerate(documents):
+            tokens = tokenize(text)
+            self.doc_lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                self.postings[term][doc_id] = frequency
+
+        self.num_docs = len(self.doc_lengths)
+        self.avg_doc_length = (sum(self.doc_lengths) / self.num_docs) if self.num_docs else 0.0
+        # Lucene/ATIRE idf log(1 + (N - df + 0.5) / (df + 0.5)), which stays positive for terms present in most documents
+        self.idf = {
+            term: math.log(1 + (self.num_docs - len(docs) + 0.5) / (len(docs) + 0.5)) for term, docs in self.postings.items()
+        }
+
+    def __len__(self):
+        return self.num_docs
+
+    def scores(self, query: str) -> List[float]:
+        """Return the BM25 score of every document for ``query``."""
+        scores = [0.0] * self.num_docs
+        if not self.num_docs or not self.avg_doc_length:
+            return scores
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def top_k(self, query: str, k: int) -> List[int]:
+        """
+        Return the positions of the ``k`` highest-scoring documents for ``query``.
+
+        Ties (including documents that match no query term) are broken by document
+        order, so the result is deterministic.
+        """
+        scores = self.scores(query)
+        ranked = sorted(range(self.num_docs), key=lambda doc_id: (-scores[doc_id], doc_id))
+        return ranked[:k]
@@ -1,22 +1,27 @@
 import asyncio
+import hashlib
 import json
 import logging
 import os
 import time
 from pprint import pprint
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import yaml
-from litellm import acompletion
+from litellm import ModelResponse, acompletion
 from pydantic import BaseModel
 from tqdm import tqdm  # progress bar for loops
 
+from metabeeai.metabeeai_llm.bm25 import BM25Index
+from metabeeai.metabeeai_llm.llm_cache import get_llm_cache, make_cache_key
+from metabeeai.metabeeai_llm.rate_limiter import get_rate_limiter
+from metabeeai.metabeeai_llm.retry import MalformedOutputError, call_with_retry, current_attempt
+from metabeeai.metabeeai_llm.usage import get_usage_tracker, usage_scope
+
 # Configure logging for debugging and error tracking.
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-RETRY = 100
-
 # Model configuration for hybrid approach
 try:
     # Try relative import first (when used as module)
@@ -29,6 +34,8 @@ try:
     DEFAULT_ANSWER_BATCH_SIZE = config["parallel"]["answer_batch_size"]
     MAX_CONCURRENT_REQUESTS = config["parallel"]["max_concurrent_requests"]
     BATCH_DELAY = config["parallel"]["batch_delay"]
+    PRERANK_TOP_K = config["prerank"]["default_top_k"] if config["prerank"]["enabled"] else None
+    ANSWER_STRATEGY = config["performance"].get("answer_strategy", "per_chunk")
 except ImportError:
     try:
         # Try direct import (when running script directly)
@@ -41,6 +48,8 @@ except ImportError:
         DEFAULT_ANSWER_BATCH_SIZE = config["parallel"]["answer_batch_size"]
         MAX_CONCURRENT_REQUESTS = config["parallel"]["max_concurrent_requests"]
         BATCH_DELAY = config["parallel"]["batch_delay"]
+        PRERANK_TOP_K = config["prerank"]["default_top_k"] if config["prerank"]["enabled"] else None
+        ANSWER_STRATEGY = config["performance"].get("answer_strategy", "per_chunk")
     except ImportError:
         # Fallback configuration if pipeline_config.py is not available
         RELEVANCE_MODEL = "openai/gpt-4o-mini"  # Fast model for relevance scoring
@@ -49,6 +58,8 @@ except ImportError:
         DEFAULT_ANSWER_BATCH_SIZE = 5  # Default batch size for answer generation
         MAX_CONCURRENT_REQUESTS = 25  # Maximum concurrent API requests to avoid rate limiting
         BATCH_DELAY = 0.1  # Default delay between batches
+        PRERANK_TOP_K = 40  # Chunks kept by BM25 pre-ranking before LLM chunk selection
+        ANSWER_STRATEGY = "per_chunk"  # One answer call per selected chunk ("batched": one call per question)
 
 
 def load_questions_config():
@@ -100,6 +111,9 @@ class _ConfigProxy:
     def __contains__(self, key):
         return key in get_questions_config()
 
+    def items(self):
+        return get_questions_config().items()
+
 
 QUESTIONS_CONFIG = _ConfigProxy()
 
@@ -138,6 +152,32 @@ class AnswerWithChunkId(BaseModel):
     chunk_ids: List[str]
 
 
+class ChunkAnswer(BaseModel):
+    """
+    Model for representing the answer extracted from one text chunk.
+
+    Attributes:
+        chunk_id (str): ID of the chunk the answer was extracted from.
+        reason (str): Explanation or reasoning behind the answer.
+        answer (str): The answer found in this chunk (empty if the chunk does not contain it).
+    """
+
+    chunk_id: str
+    reason: str
+    answer: str
+
+
+class ChunkAnswerList(BaseModel):
+    """
+    Model for representing per-chunk answers returned by a single batched call.
+
+    Attributes:
+        answers (List[ChunkAnswer]): One answer per text chunk.
+    """
+
+    answers: List[ChunkAnswer]
+
+
 class AnswerList(BaseModel):
     """
     Model for representing a list of answers.
@@ -168,6 +208,101 @@ def load_json_file(path: str) -> Dict[str, Any]:
         return json.load(f)
 
 
+# Chunks containing any of these terms are headers or publication metadata and are
+# never worth sending to the relevance model.
+SKIP_TERMS = [
+    "crossmark",
+    "logo",
+    "journal:",
+    "year:",
+    "doi:",
+    "authors:",
+    "accepted:",
+    "published online:",
+    "© the author",
+]
+
+
+def filter_skip_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Remove chunks that are clearly not relevant (headers, metadata, logos, etc.).
+
+    Args:
+        chunks (List[Dict[str, Any]]): List of text chunks.
+
+    Returns:
+        List[Dict[str, Any]]: Chunks that contain none of the SKIP_TERMS.
+    """
+    filtered_chunks = []
+    for chunk in chunks:
+        text = chunk.get("text", "").lower()
+        if any(skip_term in text for skip_term in SKIP_TERMS):
+            continue
+        filtered_chunks.append(chunk)
+    return filtered_chunks
+
+
+class PaperContext:
+    """
+    Parsed text chunks of a single paper, loaded once and shared by every question.
+
+    Building the context parses merged_v2.json a single time and applies the SKIP_TERMS
+    filter once, so asking many questions about the same paper no longer re-reads and
+    re-parses the file per question.
+
+    Attributes:
+        json_path (str): Path the chunks were loaded from (None if built in memory).
+        chunks (List[Dict[str, Any]]): All chunks of the paper, in document order.
+        filtered_chunks (List[Dict[str, Any]]): Chunks that pass the SKIP_TERMS filter.
+        content_hash (str): SHA-256 of the raw JSON file (None if built in memory).
+        bm25 (BM25Index): Lexical index over ``filtered_chunks``, built on first use.
+    """
+
+    def __init__(self, chunks: List[Dict[str, Any]], json_path: str = None, content_hash: str = None):
+        self.json_path = json_path
+        self.content_hash = content_hash
+        self.chunks = chunks
+        self.filtered_chunks = filter_skip_chunks(chunks)
+        self._bm25 = None
+
+    @classmethod
+    def from_json_file(cls, path: str) -> "PaperContext":
+        """Load the chunks of a merged JSON file."""
+        with open(path, "rb") as f:
+            raw = f.read()
+        json_obj = json.loads(raw)
+        chunks = json_obj.get("data", {}).get("chunks", [])
+        return cls(chunks, json_path=path, content_hash=hashlib.sha256(raw).hexdigest())
+
+    @classmethod
+    def ensure(cls, paper: Union[str, "PaperContext"]) -> "PaperContext":
+        """Return ``paper`` unchanged if it is already a PaperContext, otherwise load it from the given path."""
+        if isinstance(paper, cls):
+            return paper
+        return cls.from_json_file(paper)
+
+    @property
+    def bm25(self) -> BM25Index:
+        if self._bm25 is None:
+            self._bm25 = BM25Index([chunk.get("text", "") for chunk in self.filtered_chunks])
+        return self._bm25
+
+    def prerank(self, query: str, top_k: Optional[int]) -> List[Dict[str, Any]]:
+        """
+        Keep the ``top_k`` filtered chunks that best match ``query`` lexically.
+
+        The kept chunks are returned in document order. All filtered chunks are returned
+        when ``top_k`` is None/0 or the paper has no more than ``top_k`` of them.
+        """
+        if not top_k or len(self.filtered_chunks) <= top_k:
+            return self.filtered_chunks
+        keep = sorted(self.bm25.top_k(query, top_k))
+        return [self.filtered_chunks[i] for i in keep]
+
+    def __len__(self):
+        return len(self.chunks)
+
+
 def get_question_config(question_text: str) -> dict:
     """
     Get configuration for a specific question type based on the question text.
@@ -188,6 +323,8 @@ def get_question_config(question_text: str) -> dict:
             # Extract configuration from YAML
             config = {
                 "max_chunks": question_config.get("max_chunks", 5),
+                "prerank_top_k": question_config.get("prerank_top_k", PRERANK_TOP_K),
+                "answer_strategy": question_config.get("answer_strategy", ANSWER_STRATEGY),
                 "description": question_config.get("description", "Default configuration"),
                 "no_info_response": question_config.get("no_info_response", "Information not found in the provided text."),
             }
@@ -198,6 +335,8 @@ def get_question_config(question_text: str) -> dict:
     logger.info("No question type match found, using default configuration")
     return {
         "max_chunks": 5,
+        "prerank_top_k": PRERANK_TOP_K,
+        "answer_strategy": ANSWER_STRATEGY,
         "description": "Default configuration for general questions",
         "no_info_response": "Information not found in the provided text.",
     }
@@ -216,6 +355,8 @@ def get_default_config(question_type: str) -> dict:
     # Return generic defaults
     return {
         "max_chunks": 5,
+        "prerank_top_k": PRERANK_TOP_K,
+        "answer_strategy": ANSWER_STRATEGY,
         "description": "Default configuration for general questions",
         "no_info_response": "Information not found in the provided text.",
     }
@@ -248,6 +389,7 @@ def get_question_metadata(question_text: str) -> dict:
                 "example_output": question_config.get("example_output", []),
                 "bad_example_output": question_config.get("bad_example_output", []),
                 "max_chunks": question_config.get("max_chunks", 5),
+                "prerank_top_k": question_config.get("prerank_top_k", PRERANK_TOP_K),
                 "no_info_response": question_config.get("no_info_response", "Information not found in the provided text."),
                 "description": question_config.get("description", "Default configuration"),
             }
@@ -258,6 +400,18 @@ def get_question_metadata(question_text: str) -> dict:
     return {}
 
 
+def build_prerank_query(question_text: str) -> str:
+    """
+    Build the lexical query used for BM25 pre-ranking of a question.
+
+    The question is expanded with its instructions and example outputs from questions.yml,
+    which name the kind of terms (species, doses, methods, ...) a relevant chunk contains.
+    """
+    metadata = get_question_metadata(question_text)
+    parts = [question_text, *metadata.get("instructions", []), *metadata.get("example_output", [])]
+    return " ".join(str(part) for part in parts)
+
+
 def should_use_no_info_response(question: str, chunks: List[Dict[str, Any]], final_answer: str) -> bool:
     """
     Determine if the no_info_response should be used instead of the current answer.
@@ -375,6 +529,79 @@ def assess_answer_quality(question: str, chunks: List[Dict[str, Any]], final_ans
 # --------------------------------------------------------------------------
 
 
+async def _acompletion(model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+    """
+    Call litellm's acompletion through the response cache and the shared rate limiter.
+
+    Every LLM request in this module goes through here so that concurrent questions
+    and papers share one requests/min and tokens/min budget per model, identical
+    requests (same model, messages, response_format and parameters) are answered from
+    the on-disk cache instead of the API, and tokens, cost and latency of every call are
+    recorded by the usage tracker.
+    """
+    tracker = get_usage_tracker()
+    cache = get_llm_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = make_cache_key(model, messages, **kwargs)
+        cached_content = cache.get(cache_key)
+        if cached_content is not None:
+            response = ModelResponse(
+                model=model,
+                choices=[{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": cached_content}}],
+            )
+            tracker.record(model, response, attempt=current_attempt(), cached=True)
+            return response
+
+    limiter = get_rate_limiter()
+    estimated_tokens = await limiter.acquire(model, messages)
+    start_time = time.monotonic()
+    try:
+        response = await acompletion(model=model, messages=messages, **kwargs)
+    except Exception as e:
+        tracker.record(model, latency=time.monotonic() - start_time, attempt=current_attempt(), error=e)
+        # A failed call did not use its token reservation; retries must not pay for it twice
+        limiter.release(model, estimated_tokens)
+        raise
+    tracker.record(model, response, latency=time.monotonic() - start_time, attempt=current_attempt())
+    limiter.record_usage(model, estimated_tokens, getattr(response, "usage", None))
+
+    if cache_key is not None:
+        try:
+            content = response.choices[0].message.content
+            if content is not None:
+                # Never cache malformed structured output, or retries would keep getting it back
+                if kwargs.get("response_format") is not None:
+                    json.loads(content)
+                cache.set(cache_key, content)
+        except (AttributeError, IndexError, TypeError, json.JSONDecodeError) as e:
+            logger.debug(f"Not caching response from {model}: {e}")
+    return response
+
+
+async def _structured_completion(
+    model: str, messages: List[Dict[str, Any]], response_format: type, description: str, stage: str
+) -> Dict[str, Any]:
+    """
+    Request a structured response and parse it, retrying per RETRY_CONFIG.
+
+    Unparseable output is retried like a transient API error; fatal errors (e.g.
+    authentication, context window exceeded) are raised immediately. Calls are
+    accounted to the given pipeline ``stage`` in the usage metrics.
+    """
+
+    async def attempt():
+        response = await _acompletion(model=model, messages=messages, response_format=response_format, temperature=0)
+        # Parse the JSON string from the API response.
+        try:
+            return json.loads(response.choices[0].message.content)
+        except (AttributeError, IndexError, TypeError, json.JSONDecodeError) as e:
+            raise MalformedOutputError(f"Unparseable structured output from {model}: {e}") from e
+
+    with usage_scope(stage=stage):
+        return await call_with_retry(attempt, description=description)
+
+
 async def format_to_list(question, text, model: str = "openai/gpt-4o-mini") -> Dict[str, Any]:
     """
     Retrieve an answer for the given question using the provided text chunk.
@@ -407,42 +634,26 @@ Return the entities in a list format.
     messages = [{"content": prompt, "role": "user"}]
 
     result = None
-    for i in range(RETRY):
-        try:
-            # Call the API asynchronously expecting a response conforming to the Answer model.
-            response = await acompletion(model=model, messages=messages, response_format=AnswerList, temperature=0)
-            # Parse the JSON string from the API response.
-            result = json.loads(response.choices[0].message.content)
-            logger.info("Answer restructured", result)
-            break
-        except Exception as e:
-            logger.error("Error obtaining answer restructuring", e)
-            time.sleep(1)
-            continue
+    try:
+        # Call the API asynchronously expecting a response conforming to the AnswerList model.
+        result = await _structured_completion(model, messages, AnswerList, "Answer restructuring", "format_list")
+        logger.info("Answer restructured: %s", result)
+    except Exception as e:
+        logger.error("Error obtaining answer restructuring: %s", e)
     return result
 
 
-async def get_answer(question: str, chunk: Dict[str, Any], model: str = ANSWER_MODEL) -> Dict[str, Any]:
+def build_question_prompt_parts(question: str, question_metadata: Dict[str, Any]) -> List[str]:
     """
-    Retrieve an answer for the given question using the provided text chunk.
-
-    This function constructs a prompt by embedding the question with text chunk,
-    instructions, examples, and bad examples to guide the LLM response quality.
+    Build the prompt sections shared by the answer and reflection stages.
 
     Args:
-        question (str): The question to test relevance against.
-        chunk (Dict[str, Any]): Dictionary containing the text to be evaluated.
-        model (str, optional): Model identifier for the API call. Defaults to ANSWER_MODEL.
+        question (str): The question being asked.
+        question_metadata (Dict[str, Any]): Metadata about the question from the YAML config.
 
     Returns:
-        Dict[str, Any]: Updated chunk with an added 'answer' field containing the response.
+        List[str]: The question, instructions, output format, good and bad examples sections.
     """
-    text: str = chunk.get("text", "")
-
-    # Get question metadata to access instructions, examples, and bad examples
-    question_metadata = get_question_metadata(question)
-
-    # Build enhanced prompt with examples
     prompt_parts = [f"<Question>\n{question}\n</Question>"]
 
     # Add instructions if available
@@ -464,6 +675,32 @@ async def get_answer(question: str, chunk: Dict[str, Any], model: str = ANSWER_M
         bad_examples_text = "\n".join([f"❌ Avoid: {example}" for example in question_metadata["bad_example_output"]])
         prompt_parts.append(f"<Bad Examples - AVOID THESE>\n{bad_examples_text}\n</Bad Examples>")
 
+    return prompt_parts
+
+
+async def get_answer(question: str, chunk: Dict[str, Any], model: str = ANSWER_MODEL) -> Dict[str, Any]:
+    """
+    Retrieve an answer for the given question using the provided text chunk.
+
+    This function constructs a prompt by embedding the question with text chunk,
+    instructions, examples, and bad examples to guide the LLM response quality.
+
+    Args:
+        question (str): The question to test relevance against.
+        chunk (Dict[str, Any]): Dictionary containing the text to be evaluated.
+        model (str, optional): Model identifier for the API call. Defaults to ANSWER_MODEL.
+
+    Returns:
+        Dict[str, Any]: Updated chunk with an added 'answer' field containing the response.
+    """
+    text: str = chunk.get("text", "")
+
+    # Get question metadata to access instructions, examples, and bad examples
+    question_metadata = get_question_metadata(question)
+
+    # Build enhanced prompt with examples
+    prompt_parts = build_question_prompt_parts(question, question_metadata)
+
     # Add the text chunk
     prompt_parts.append(f"<Text>\n{text}\n</Text>")
 
@@ -483,28 +720,89 @@ async def get_answer(question: str, chunk: Dict[str, Any], model: str = ANSWER_M
 
     messages = [{"content": prompt, "role": "user"}]
 
-    for i in range(RETRY):
-        try:
-            # Call the API asynchronously expecting a response conforming to the Answer model.
-            response = await acompletion(model=model, messages=messages, response_format=Answer, temperature=0)
-            # Parse the JSON string from the API response.
-            chunk["answer"] = json.loads(response.choices[0].message.content)
-            logger.info("Answer obtained for chunk %s: %s", chunk.get("chunk_id"), chunk["answer"])
-            break
-        except Exception as e:
-            logger.error("Error obtaining answer for chunk %s: %s", chunk.get("chunk_id"), e)
-            chunk["answer"] = None  # In case of error, mark answer as None.
-            time.sleep(1)
-            continue
+    try:
+        # Call the API asynchronously expecting a response conforming to the Answer model.
+        chunk["answer"] = await _structured_completion(
+            model, messages, Answer, f"Answer for chunk {chunk.get('chunk_id')}", "answer"
+        )
+        logger.info("Answer obtained for chunk %s: %s", chunk.get("chunk_id"), chunk["answer"])
+    except Exception as e:
+        logger.error("Error obtaining answer for chunk %s: %s", chunk.get("chunk_id"), e)
+        chunk["answer"] = None  # In case of error, mark answer as None.
     return chunk
 
 
+async def get_batched_answers(
+    question: str, chunks: List[Dict[str, Any]], model: str = ANSWER_MODEL
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve an answer from every text chunk with a single structured LLM call.
+
+    This is the "batched" answer strategy: instead of one get_answer call per chunk,
+    all chunks are placed in one prompt and the model returns a ChunkAnswerList with
+    one answer per chunk_id. Each chunk gets the same 'answer' field as get_answer adds.
+
+    Args:
+        question (str): The question to be answered.
+        chunks (List[Dict[str, Any]]): List of text chunks that passed the relevance filter.
+        model (str, optional): Model identifier for the API call. Defaults to ANSWER_MODEL.
+
+    Returns:
+        List[Dict[str, Any]]: The chunks updated with answers.
+    """
+    if not chunks:
+        return []
+
+    question_metadata = get_question_metadata(question)
+    prompt_parts = build_question_prompt_parts(question, question_metadata)
+
+    chunk_ids = [str(chunk.get("chunk_id", f"chunk_{i}")) for i, chunk in enumerate(chunks)]
+    formatted_chunks = "\n".join(
+        f"<Text chunk_id:{chunk_id}>\n{chunk.get('text', '')}\n</Text chunk_id:{chunk_id}>"
+        for chunk_id, chunk in zip(chunk_ids, chunks)
+    )
+    prompt_parts.append(f"<Text Chunks>\n{formatted_chunks}\n</Text Chunks>")
+
+    prompt_parts.append("""
+<Important Guidelines>
+- Answer the question separately for EACH text chunk, using only that chunk's text
+- Return exactly one entry per chunk, with its chunk_id copied exactly
+- Provide ONLY the specific information requested
+- Use the exact format specified in Output Format
+- Follow the Good Examples pattern
+- AVOID the Bad Examples patterns (no explanations, no context, no repetition)
+- Be concise and direct
+- If a chunk doesn't contain the requested information, return an empty answer for it
+</Important Guidelines>
+""")
+
+    prompt = "\n".join(prompt_parts).strip()
+
+    messages = [{"content": prompt, "role": "user"}]
+
+    answers_by_id = {}
+    try:
+        result = await _structured_completion(model, messages, ChunkAnswerList, "Batched answers", "answer")
+        answers_by_id = {
+            str(item["chunk_id"]): {"reason": item.get("reason", ""), "answer": item.get("answer", "")}
+            for item in result.get("answers", [])
+        }
+        logger.info("Batched answers obtained for %d of %d chunks", len(answers_by_id), len(chunks))
+    except Exception as e:
+        logger.error("Error obtaining batched answers: %s", e)
+
+    for chunk_id, chunk in zip(chunk_ids, chunks):
+        chunk["answer"] = answers_by_id.get(chunk_id, {"reason": "No answer returned for this chunk", "answer": ""})
+    return chunks
+
+
 async def get_top_relevant_chunks(
     chunks: List[Dict[str, Any]],
     question: str,
     question_metadata: Dict[str, Any],
     max_chunks: int = 5,
     model: str = RELEVANCE_MODEL,
+    prefiltered: bool = False,
 ) -> List[Dict[str, Any]]:
     """
     Get the top most relevant chunks for a question using a single LLM call.
@@ -515,32 +813,14 @@ async def get_top_relevant_chunks(
         question_metadata: Metadata about the question from YAML config
         max_chunks: Maximum number of chunks to return
         model: The LLM model to use for chunk selection
+        prefiltered: Set to True if SKIP_TERMS filtering was already applied to ``chunks``
 
     Returns:
         List of the most relevant chunks
     """
     try:
-        # Filter out obviously irrelevant chunks first
-        filtered_chunks = []
-        for chunk in chunks:
-            text = chunk.get("text", "").lower()
-            # Skip chunks that are clearly not relevant (headers, metadata, etc.)
-            if any(
-                skip_term in text
-                for skip_term in [
-                    "crossmark",
-                    "logo",
-                    "journal:",
-                    "year:",
-                    "doi:",
-                    "authors:",
-                    "accepted:",
-                    "published online:",
-                    "© the author",
-                ]
-            ):
-                continue
-            filtered_chunks.append(chunk)
+        # Filter out obviously irrelevant chunks first (unless the caller already did, e.g. via PaperContext)
+        filtered_chunks = chunks if prefiltered else filter_skip_chunks(chunks)
 
         if not filtered_chunks:
             return []
@@ -609,7 +889,10 @@ async def get_top_relevant_chunks(
             {"role": "user", "content": prompt},
         ]
 
-        response = await acompletion(model=model, messages=messages, temperature=0)
+        with usage_scope(stage="relevance"):
+            response = await call_with_retry(
+                lambda: _acompletion(model=model, messages=messages, temperature=0), description="Chunk selection"
+            )
 
         if response and hasattr(response, "choices") and response.choices:
             result = response.choices[0].message.content
@@ -653,7 +936,12 @@ async def get_top_relevant_chunks(
 
 
 async def filter_all_chunks(
-    question: str, chunks: List[Dict[str, Any]], max_chunks: int = 5, batch_size: int = None, model: str = None
+    question: str,
+    chunks: List[Dict[str, Any]],
+    max_chunks: int = 5,
+    batch_size: int = None,
+    model: str = None,
+    prefiltered: bool = False,
 ) -> List[Dict[str, Any]]:
     """
     Get the top most relevant chunks for a question using a single LLM call.
@@ -664,6 +952,7 @@ async def filter_all_chunks(
         max_chunks (int): Maximum number of chunks to return.
         batch_size (int): Not used in simplified approach, kept for compatibility.
         model (str): Model to use for chunk selection (default: RELEVANCE_MODEL).
+        prefiltered (bool): Set to True if SKIP_TERMS filtering was already applied to ``chunks``.
 
     Returns:
         List[Dict[str, Any]]: List of top relevant chunks.
@@ -679,7 +968,12 @@ async def filter_all_chunks(
     # Use the new simplified approach
     selected_model = model if model else RELEVANCE_MODEL
     relevant_chunks = await get_top_relevant_chunks(
-        chunks=chunks, question=question, question_metadata=question_metadata, max_chunks=max_chunks, model=selected_model
+        chunks=chunks,
+        question=question,
+        question_metadata=question_metadata,
+        max_chunks=max_chunks,
+        model=selected_model,
+        prefiltered=prefiltered,
     )
 
     logger.info(f"Selected {len(relevant_chunks)} relevant chunks")
@@ -767,26 +1061,7 @@ async def reflect_answers(question: str, chunks: List[Dict[str, Any]], model: st
     )
 
     # Build enhanced reflection prompt with examples and guidelines
-    prompt_parts = [f"<Question>\n{question}\n</Question>"]
-
-    # Add instructions if available
-    if question_metadata.get("instructions"):
-        instructions_text = "\n".join([f"- {instruction}" for instruction in question_metadata["instructions"]])
-        prompt_parts.append(f"<Instructions>\n{instructions_text}\n</Instructions>")
-
-    # Add output format if available
-    if question_metadata.get("output_format"):
-        prompt_parts.append(f"<Output Format>\n{question_metadata['output_format']}\n</Output Format>")
-
-    # Add good examples if available
-    if question_metadata.get("example_output"):
-        examples_text = "\n".join([f"✅ Good: {example}" for example in question_metadata["example_output"]])
-        prompt_parts.append(f"<Good Examples>\n{examples_text}\n</Good Examples>")
-
-    # Add bad examples if available
-    if question_metadata.get("bad_example_output"):
-        bad_examples_text = "\n".join([f"❌ Avoid: {example}" for example in question_metadata["bad_example_output"]])
-        prompt_parts.append(f"<Bad Examples - AVOID THESE>\n{bad_examples_text}\n</Bad Examples>")
+    prompt_parts = build_question_prompt_parts(question, question_metadata)
 
     # Add the formatted chunks
     prompt_parts.append(f"<Text Chunks and Answers>\n{formatted_chunks}\n</Text Chunks and Answers>")
@@ -809,15 +1084,12 @@ async def reflect_answers(question: str, chunks: List[Dict[str, Any]], model: st
 
     messages = [{"content": prompt, "role": "user"}]
 
-    for i in range(RETRY):
-        try:
-            response = await acompletion(model=model, messages=messages, response_format=AnswerWithChunkId, temperature=0)
-            result = json.loads(response.choices[0].message.content)
-            logger.info("Reflected answer: %s", result)
-            return result
-        except Exception as e:
-            logger.error("Error reflecting answers: %s", e)
-            time.sleep(1)
+    try:
+        result = await _structured_completion(model, messages, AnswerWithChunkId, "Answer reflection", "reflect")
+        logger.info("Reflected answer: %s", result)
+        return result
+    except Exception as e:
+        logger.error("Error reflecting answers: %s", e)
 
 
 # --------------------------------------------------------------------------
@@ -878,20 +1150,25 @@ async def process_batches_async(
 
 
 async def ask_json(
-    question: str = None, json_path: str = None, batch_size=256, relevance_model: str = None, answer_model: str = None
+    question: str = None,
+    json_path: Union[str, PaperContext] = None,
+    batch_size=256,
+    relevance_model: str = None,
+    answer_model: str = None,
 ) -> None:
     """
     Main asynchronous entry point for processing text chunks to extract and reflect on answers.
 
     Args:
         question (str): The question to ask about the paper
-        json_path (str): Path to the JSON file containing text chunks
+        json_path (str | PaperContext): Path to the JSON file containing text chunks, or a
+            PaperContext already loaded for the paper (avoids re-parsing the file per question)
         batch_size (int): Batch size for processing (default: 256)
         relevance_model (str): Model to use for chunk selection (default: from config)
         answer_model (str): Model to use for answer generation and reflection (default: from config)
 
     Steps performed:
-      1. Load JSON data containing text chunks.
+      1. Load JSON data containing text chunks (or reuse the given PaperContext).
       2. Filter chunks based on relevance to the question.
       3. Query each relevant chunk to retrieve an answer.
       4. Reflect on the collected answers to generate a final consolidated answer.
@@ -913,9 +1190,9 @@ async def ask_json(
             # Fallback to relative path
             json_path: str = "papers/001/pages/merged_v2.json"
 
-    # Load JSON data from file.
-    json_obj: Dict[str, Any] = load_json_file(json_path)
-    original_chunks: List[Dict[str, Any]] = json_obj.get("data", {}).get("chunks", [])
+    # Load JSON data from file, unless the caller already holds the parsed paper.
+    paper = PaperContext.ensure(json_path)
+    chunks: List[Dict[str, Any]] = paper.chunks
     # BATCH_SIZE: int = batch_size # TODO: should this be being used somewhere?
 
     # Set up models - use provided models or fall back to config defaults
@@ -925,10 +1202,9 @@ async def ask_json(
     logger.info(f"Using relevance model: {selected_relevance_model}")
     logger.info(f"Using answer model: {selected_answer_model}")
 
-    # Create a fresh copy of chunks for each question to avoid state persistence
-    # This prevents chunks from being modified by previous questions
-    chunks = [chunk.copy() for chunk in original_chunks]
-    logger.info(f"Using {len(chunks)} fresh chunks from merged_v2.json (deduplication handled in PDF processing)")
+    # The shared chunks are never modified; only the selected chunks are copied below
+    # before answers are attached to them.
+    logger.info(f"Using {len(chunks)} chunks from merged_v2.json (deduplication handled in PDF processing)")
 
     # DEBUG: Check first few chunks
     logger.info(f"DEBUG: First chunk keys: {list(chunks[0].keys()) if chunks else 'No chunks'}")
@@ -941,13 +1217,19 @@ async def ask_json(
     # Step 2: Filter out irrelevant chunks with question-specific settings.
     # Use parallel processing with optimized batch sizes
     relevance_batch_size = min(DEFAULT_RELEVANCE_BATCH_SIZE, len(chunks), MAX_CONCURRENT_REQUESTS)
-
-    # Step 2: Filter out irrelevant chunks with question-specific settings.
-    # Use parallel processing with optimized batch sizes
-    relevance_batch_size = min(DEFAULT_RELEVANCE_BATCH_SIZE, len(chunks), MAX_CONCURRENT_REQUESTS)
+    # Lexical BM25 pre-ranking keeps the relevance prompt bounded on long papers
+    candidate_chunks = paper.prerank(build_prerank_query(question), question_config.get("prerank_top_k"))
+    logger.info(f"BM25 pre-ranking kept {len(candidate_chunks)} of {len(paper.filtered_chunks)} candidate chunks")
     relevant_chunks: List[Dict[str, Any]] = await filter_all_chunks(
-        question, chunks, question_config["max_chunks"], batch_size=relevance_batch_size, model=selected_relevance_model
+        question,
+        candidate_chunks,
+        question_config["max_chunks"],
+        batch_size=relevance_batch_size,
+        model=selected_relevance_model,
+        prefiltered=True,
     )
+    # Copy only the selected chunks: answers get attached to them and the PaperContext is shared between questions
+    relevant_chunks = [chunk.copy() for chunk in relevant_chunks]
 
     if len(relevant_chunks) == 0:
         logger.info("No relevant chunks found for the question: %s", question)
@@ -976,11 +1258,17 @@ async def ask_json(
         logger.info(f"  Chunk {i+1}: ID {chunk_id}")
 
     # Step 2: Query each relevant chunk for its answer.
-    # Use parallel processing with optimized batch sizes for answer generation
-    answer_batch_size = min(DEFAULT_ANSWER_BATCH_SIZE, len(relevant_chunks), MAX_CONCURRENT_REQUESTS)
-    answered_chunks: List[Dict[str, Any]] = await query_all_chunks(
-        question, relevant_chunks, batch_size=answer_batch_size, model=selected_answer_model
-    )
+    if question_config.get("answer_strategy") == "batched":
+        # One structured call answers all selected chunks at once
+        answered_chunks: List[Dict[str, Any]] = await get_batched_answers(
+            question, relevant_chunks, model=selected_answer_model
+        )
+    else:
+        # Use parallel processing with optimized batch sizes for answer generation
+        answer_batch_size = min(DEFAULT_ANSWER_BATCH_SIZE, len(relevant_chunks), MAX_CONCURRENT_REQUESTS)
+        answered_chunks: List[Dict[str, Any]] = await query_all_chunks(
+            question, relevant_chunks, batch_size=answer_batch_size, model=selected_answer_model
+        )
     # Step 3: Reflect on all collected answers to produce the final answer.
     final_result: Any = await reflect_answers(question, answered_chunks, selected_answer_model)
     # final_result: Any = await process_batches_async(
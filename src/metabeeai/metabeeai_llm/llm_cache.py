@@ -0,0 +1,219 @@
+"""
+Persistent, content-addressed cache for LLM responses.
+
+Responses are stored in a SQLite database under ``<METABEEAI_DATA_DIR>/cache`` and
+keyed by a SHA-256 hash of everything that determines the output of a call: the
+model, the messages, the response_format schema and the sampling parameters.
+Re-running ``metabeeai llm`` after editing one question therefore only pays for
+the calls whose prompts actually changed.
+
+The cache is bounded in size; when it grows past ``max_size_mb`` the least
+recently used entries are evicted. Settings are read from ``CACHE_CONFIG`` in
+``pipeline_config.py``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILENAME = "llm_cache.sqlite"
+
+# After an eviction the cache is shrunk to this fraction of its maximum size, so
+# that eviction does not run again on every following write.
+EVICTION_TARGET_RATIO = 0.9
+
+
+def _schema_of(response_format: Any) -> Any:
+    """Return a JSON-serialisable description of a response_format (pydantic model or dict)."""
+    if response_format is None:
+        return None
+    if hasattr(response_format, "model_json_schema"):
+        return response_format.model_json_schema()
+    return response_format
+
+
+def make_cache_key(model: str, messages: Any, response_format: Any = None, **params) -> str:
+    """
+    Build the cache key for an LLM call.
+
+    Args:
+        model: Model name, e.g. "openai/gpt-4o-mini"
+        messages: Chat messages sent to the model
+        response_format: Pydantic model or dict used for structured output (optional)
+        **params: Any other parameters that influence the output (e.g. temperature)
+
+    Returns:
+        str: Hex SHA-256 digest identifying the call.
+    """
+    payload = {
+        "model": model,
+        "messages": messages,
+        "response_format": _schema_of(response_format),
+        "params": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed key/value store with size-based LRU eviction and hit/miss counters.
+
+    Args:
+        path: Path of the SQLite database file (created if missing)
+        max_size_mb: Maximum total size of the stored values before eviction
+    """
+
+    def __init__(self, path: str, max_size_mb: float = 1024):
+        self.path = path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+        self._conn.commit()
+        # Running total of the stored sizes, so that writes do not scan the table
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for ``key`` (refreshing its LRU position), or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """Store ``value`` under ``key``, evicting least recently used entries if the cache is full."""
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._size += size - (row[0] if row else 0)
+            self.writes += 1
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Remove a single entry."""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+            if row:
+                self._size -= row[0]
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._size = 0
+
+    def _evict(self):
+        if self._size <= self.max_size_bytes:
+            return
+        total = self._size
+        target = self.max_size_bytes * EVICTION_TARGET_RATIO
+        # Rows are read lazily, only as far as needed to get below the target size
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC")
+        evicted = []
+        for key, size in rows:
+            if total <= target:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self._size = total
+        self.evictions += len(evicted)
+        logger.info(f"LLM cache evicted {len(evicted)} entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size of the cache."""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_cache_path(filename: str = DEFAULT_CACHE_FILENAME) -> str:
+    """Get the path of a cache database inside the data directory."""
+    from metabeeai.config import get_data_dir
+
+    return os.path.join(get_data_dir(), "cache", filename)
+
+
+_LLM_CACHE = None
+_CACHE_DISABLED = False
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """
+    Get the shared response cache, creating it from pipeline_config on first use.
+
+    Returns:
+        LLMCache or None: None when caching is disabled (config or ``--no-cache``).
+    """
+    global _LLM_CACHE
+    if _CACHE_DISABLED:
+        return None
+    if _LLM_CACHE is None:
+        try:
+            from metabeeai.metabeeai_llm.pipeline_config import CACHE_CONFIG
+        except ImportError:
+            CACHE_CONFIG = {}
+        if not CACHE_CONFIG.get("enabled", True):
+            return None
+        path = CACHE_CONFIG.get("path") or get_cache_path()
+        _LLM_CACHE = LLMCache(path, max_size_mb=CACHE_CONFIG.get("max_size_mb", 1024))
+    return _LLM_CACHE
+
+
+def set_llm_cache(cache: Optional[LLMCache]):
+    """Replace the shared response cache. Passing None disables caching."""
+    global _LLM_CACHE, _CACHE_DISABLED
+    _LLM_CACHE = cache
+    _CACHE_DISABLED = cache is None
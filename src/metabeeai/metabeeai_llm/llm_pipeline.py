@@ -1,14 +1,21 @@
 import argparse
 import asyncio
+import contextlib
+import hashlib
 import json
+import logging
 import os
 import sys
 import time
 
 import yaml
 
+from metabeeai.metabeeai_llm.json_multistage_qa import ANSWER_MODEL, RELEVANCE_MODEL, PaperContext, get_question_metadata
 from metabeeai.metabeeai_llm.json_multistage_qa import ask_json as ask_json_async
 from metabeeai.metabeeai_llm.json_multistage_qa import format_to_list as format_to_list_async
+from metabeeai.metabeeai_llm.llm_cache import get_llm_cache, set_llm_cache
+from metabeeai.metabeeai_llm.retry import get_retry_policy
+from metabeeai.metabeeai_llm.usage import get_usage_tracker, usage_scope
 
 
 def ask_json(question_text, json_path):
@@ -54,6 +61,11 @@ def _get_questions():
 # ------------------------------------------------------------------------------
 # Helper Function: get_answer
 # ------------------------------------------------------------------------------
+def _question_label(question_text):
+    """Returns the questions.yml key of a question (used to label usage metrics), or the question itself."""
+    return get_question_metadata(question_text).get("question_key") or question_text[:60]
+
+
 async def get_answer(question_text, json_path, relevance_model=None, answer_model=None):
     """
     Retrieves the answer for a given question by calling ask_json.
@@ -61,11 +73,13 @@ async def get_answer(question_text, json_path, relevance_model=None, answer_mode
 
     Args:
         question_text: The question to ask
-        json_path: Path to the JSON file containing text chunks
+        json_path: Path to the JSON file containing text chunks, or a PaperContext
+            already loaded for the paper
         relevance_model: Model to use for chunk selection (defaults to config)
         answer_model: Model to use for answer generation and reflection (defaults to config)
     """
-    result = await ask_json_async(question_text, json_path, relevance_model=relevance_model, answer_model=answer_model)
+    with usage_scope(question=_question_label(question_text)):
+        result = await ask_json_async(question_text, json_path, relevance_model=relevance_model, answer_model=answer_model)
 
     # Ensure the result has the required structure
     if isinstance(result, dict):
@@ -87,92 +101,224 @@ async def get_answer(question_text, json_path, relevance_model=None, answer_mode
 # ------------------------------------------------------------------------------
 # Generic Recursive Function to Process a Hierarchical Question Tree
 # ------------------------------------------------------------------------------
-async def process_question_tree(tree, json_path, context=None, relevance_model=None, answer_model=None):
+async def _gather_in_order(coros, concurrent):
+    """
+    Awaits a list of coroutines and returns their results in the order given.
+
+    When ``concurrent`` is False the coroutines are awaited one after another (the
+    original serial behaviour); otherwise they are scheduled together with asyncio.gather.
+    """
+    if not concurrent:
+        return [await coro for coro in coros]
+    return list(await asyncio.gather(*coros))
+
+
+async def _limited(coro, semaphore):
+    """Awaits a coroutine while holding the shared question semaphore (if any)."""
+    if semaphore is None:
+        return await coro
+    async with semaphore:
+        return await coro
+
+
+async def process_question_tree(tree, json_path, context=None, relevance_model=None, answer_model=None, semaphore=None):
     """
     Recursively traverses the question tree (a nested dictionary) and obtains answers using get_answer.
 
     Args:
         tree: The question tree structure
-        json_path: Path to the JSON file containing text chunks
+        json_path: Path to the JSON file containing text chunks (or a PaperContext)
         context: Context for formatting questions with placeholders
         relevance_model: Model to use for chunk selection (defaults to config)
         answer_model: Model to use for answer generation and reflection (defaults to config)
+        semaphore: Optional asyncio.Semaphore shared by the whole traversal. When given, sibling
+            nodes and ``for_each`` items are scheduled concurrently and every LLM-backed leaf call
+            holds the semaphore, so it acts as a global concurrency limit. When None the tree is
+            processed serially.
 
     - If a node contains a "question" key, it is treated as a leaf node.
     - The "for_each" key indicates that the associated value should be processed for
       each item in a list provided via the context.
     - The context is used to format questions with placeholders.
+    - Output order always follows the order of the question tree, regardless of the
+      order in which concurrent answers complete.
     """
     if context is None:
         context = {}
 
+    concurrent = semaphore is not None
+
     # If the tree is a dictionary
     if isinstance(tree, dict):
         # If this dictionary has a "question" key, treat it as a leaf.
         if "question" in tree:
             question_text = tree["question"].format(**context)
-            answer = await get_answer(question_text, json_path, relevance_model=relevance_model, answer_model=answer_model)
+            answer = await _limited(
+                get_answer(question_text, json_path, relevance_model=relevance_model, answer_model=answer_model), semaphore
+            )
             # Process conditional branch if available.
             return answer
         else:
-            result = {}
-            for key, value in tree.items():
-                if key == "list":
-                    # If the key is "list", return the list as is.
-                    question_of_the_list = value["question"].format(**context)
-                    endpoint_name = value["endpoint_name"]
-                    answer = await get_answer(
-                        question_of_the_list, json_path, relevance_model=relevance_model, answer_model=answer_model
-                    )
-                    list_result = await format_to_list_async(question_of_the_list, answer["answer"])
-                    list_items = list_result["answer"]
-                    result[key] = {}
-                    for item in list_items:
-                        new_context = context.copy()
-                        new_context[endpoint_name] = item
-                        result[key][item] = await process_question_tree(
-                            value["for_each"],
-                            json_path,
-                            new_context,
-                            relevance_model=relevance_model,
-                            answer_model=answer_model,
-                        )
-                else:
-                    result[key] = await process_question_tree(
-                        value, json_path, context, relevance_model=relevance_model, answer_model=answer_model
+            keys = list(tree.keys())
+            values = await _gather_in_order(
+                [
+                    _process_list_node(value, json_path, context, relevance_model, answer_model, semaphore)
+                    if key == "list"
+                    else process_question_tree(
+                        value,
+                        json_path,
+                        context,
+                        relevance_model=relevance_model,
+                        answer_model=answer_model,
+                        semaphore=semaphore,
                     )
-            return result
+                    for key, value in tree.items()
+                ],
+                concurrent,
+            )
+            return dict(zip(keys, values))
     elif isinstance(tree, list):
-        return [
-            await process_question_tree(item, json_path, context, relevance_model=relevance_model, answer_model=answer_model)
-            for item in tree
-        ]
+        return await _gather_in_order(
+            [
+                process_question_tree(
+                    item, json_path, context, relevance_model=relevance_model, answer_model=answer_model, semaphore=semaphore
+                )
+                for item in tree
+            ],
+            concurrent,
+        )
     elif isinstance(tree, str):
         # If the tree itself is a string, treat it as a question.
         question_text = tree.format(**context)
-        return await get_answer(question_text, json_path, relevance_model=relevance_model, answer_model=answer_model)
+        return await _limited(
+            get_answer(question_text, json_path, relevance_model=relevance_model, answer_model=answer_model), semaphore
+        )
     else:
         return tree
 
 
+async def _process_list_node(value, json_path, context, relevance_model, answer_model, semaphore):
+    """
+    Processes a "list" node: asks the list question, splits the answer into items and
+    expands the ``for_each`` subtree once per item (concurrently when a semaphore is given).
+    """
+    question_of_the_list = value["question"].format(**context)
+    endpoint_name = value["endpoint_name"]
+    answer = await _limited(
+        get_answer(question_of_the_list, json_path, relevance_model=relevance_model, answer_model=answer_model), semaphore
+    )
+    with usage_scope(question=_question_label(question_of_the_list)):
+        list_result = await _limited(format_to_list_async(question_of_the_list, answer["answer"]), semaphore)
+    list_items = list_result["answer"]
+
+    item_contexts = []
+    for item in list_items:
+        new_context = context.copy()
+        new_context[endpoint_name] = item
+        item_contexts.append(new_context)
+
+    item_results = await _gather_in_order(
+        [
+            process_question_tree(
+                value["for_each"],
+                json_path,
+                new_context,
+                relevance_model=relevance_model,
+                answer_model=answer_model,
+                semaphore=semaphore,
+            )
+            for new_context in item_contexts
+        ],
+        semaphore is not None,
+    )
+    return dict(zip(list_items, item_results))
+
+
 # ------------------------------------------------------------------------------
 # Main Function: Retrieve All Answers Based on the Questions Dictionary
 # ------------------------------------------------------------------------------
-async def get_literature_answers(json_path, relevance_model=None, answer_model=None):
+async def get_literature_answers(
+    json_path, relevance_model=None, answer_model=None, question_concurrency=1, question_keys=None
+):
     """
     Processes the entire hierarchical question tree defined in QUESTIONS and returns
     the collected answers.
 
     Args:
-        json_path: Path to the JSON file containing text chunks
+        json_path: Path to the JSON file containing text chunks (or a PaperContext)
         relevance_model: Model to use for chunk selection (defaults to config)
         answer_model: Model to use for answer generation and reflection (defaults to config)
+        question_concurrency: Maximum number of questions answered at the same time.
+            1 (default) processes the tree serially.
+        question_keys: Optional list of top-level question keys (e.g. ["bee_species"]) to answer.
+            Defaults to every question in questions.yml.
     """
     questions = _get_questions()
-    answers = await process_question_tree(questions, json_path, relevance_model=relevance_model, answer_model=answer_model)
+    if question_keys is not None:
+        selected = set(question_keys)
+        questions = {"QUESTIONS": {key: value for key, value in questions["QUESTIONS"].items() if key in selected}}
+    # Parse and index the paper once; every question in the tree shares it.
+    paper = PaperContext.ensure(json_path)
+    semaphore = asyncio.Semaphore(question_concurrency) if question_concurrency and question_concurrency > 1 else None
+    answers = await process_question_tree(
+        questions, paper, relevance_model=relevance_model, answer_model=answer_model, semaphore=semaphore
+    )
     return answers
 
 
+# ------------------------------------------------------------------------------
+# Incremental Processing: per-question fingerprints
+# ------------------------------------------------------------------------------
+MANIFEST_FILENAME = "answers_manifest.json"
+
+
+def question_fingerprints(paper, relevance_model=None, answer_model=None):
+    """
+    Computes a fingerprint for every top-level question of questions.yml.
+
+    A fingerprint changes whenever the question's YAML definition, the models used or
+    the paper's merged_v2.json content changes, i.e. whenever its answer may change.
+
+    Args:
+        paper: PaperContext of the paper (provides the merged_v2.json content hash)
+        relevance_model: Model used for chunk selection (defaults to config)
+        answer_model: Model used for answer generation and reflection (defaults to config)
+
+    Returns:
+        dict: question key -> hex SHA-256 fingerprint, in questions.yml order.
+    """
+    fingerprints = {}
+    for key, definition in _get_questions()["QUESTIONS"].items():
+        payload = {
+            "definition": definition,
+            "relevance_model": relevance_model or RELEVANCE_MODEL,
+            "answer_model": answer_model or ANSWER_MODEL,
+            "chunks": paper.content_hash,
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        fingerprints[key] = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    return fingerprints
+
+
+def load_manifest(paper_path):
+    """Loads the per-question fingerprints recorded for a paper ({} if there are none)."""
+    manifest_path = os.path.join(paper_path, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r") as f:
+            return json.load(f).get("questions", {})
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(paper_path, fingerprints):
+    """Records the fingerprints of the answers currently stored in the paper's answers.json."""
+    manifest_path = os.path.join(paper_path, MANIFEST_FILENAME)
+    with open(manifest_path, "w") as f:
+        json.dump({"questions": fingerprints, "updated": time.strftime("%Y-%m-%d %H:%M:%S")}, f, indent=2)
+
+
 # ------------------------------------------------------------------------------
 # Main Execution
 # ------------------------------------------------------------------------------
@@ -207,7 +353,58 @@ def merge_json_in_the_folder(folder_path, overwrite=False):
         json.dump(json_obj, f, indent=2)
 
 
-async def process_papers(base_dir=None, paper_folders=None, overwrite_merged=False, relevance_model=None, answer_model=None):
+# ------------------------------------------------------------------------------
+# Output suppression shared by concurrently processed papers
+# ------------------------------------------------------------------------------
+_suppress_depth = 0
+_saved_output = None
+
+
+@contextlib.contextmanager
+def _suppressed_output():
+    """
+    Silences stdout/stderr and root logging while a paper is being answered.
+
+    Re-entrant: with several papers in flight the real streams are only restored when
+    the last one finishes. Use _progress() for lines that must still reach the console.
+    """
+    global _suppress_depth, _saved_output
+    if _suppress_depth == 0:
+        _saved_output = (sys.stdout, sys.stderr, logging.getLogger().level)
+        devnull = open(os.devnull, "w")
+        sys.stdout = devnull
+        sys.stderr = devnull
+        logging.getLogger().setLevel(logging.ERROR)
+    _suppress_depth += 1
+    try:
+        yield
+    finally:
+        _suppress_depth -= 1
+        if _suppress_depth == 0:
+            sys.stdout.close()
+            sys.stdout, sys.stderr, original_log_level = _saved_output
+            logging.getLogger().setLevel(original_log_level)
+            _saved_output = None
+
+
+def _progress(message):
+    """Prints a progress line to the real console, even while output is suppressed."""
+    stream = _saved_output[0] if _saved_output else sys.stdout
+    print(message, file=stream, flush=True)
+
+
+async def process_papers(
+    base_dir=None,
+    paper_folders=None,
+    overwrite_merged=False,
+    relevance_model=None,
+    answer_model=None,
+    question_concurrency=1,
+    paper_workers=1,
+    use_cache=True,
+    incremental=False,
+    metrics_path=None,
+):
     """
     Processes papers in the specified directory.
 
@@ -217,6 +414,17 @@ async def process_papers(base_dir=None, paper_folders=None, overwrite_merged=Fal
         overwrite_merged: Whether to overwrite existing merged.json files
         relevance_model: Model to use for chunk selection (defaults to config)
         answer_model: Model to use for answer generation and reflection (defaults to config)
+        question_concurrency: Maximum number of questions answered concurrently per paper (1 = serial)
+        paper_workers: Number of papers processed concurrently in this event loop (1 = one at a time).
+            All workers share the rate limiter configured in pipeline_config.RATE_LIMIT_CONFIG.
+        use_cache: Reuse cached LLM responses for identical requests (see pipeline_config.CACHE_CONFIG).
+            False bypasses the cache for this process.
+        incremental: Only answer the questions whose fingerprint (YAML definition, models and
+            merged_v2.json content) differs from the one recorded in the paper's answers_manifest.json,
+            and merge them into the existing answers.json.
+        metrics_path: JSONL file receiving one record per LLM call (tokens, cost, latency, retries,
+            labelled by paper, question key and stage). Defaults to a timestamped file in the logs directory;
+            a JSON summary is written next to it.
     """
     # Import centralized configuration if base_dir not provided
     if base_dir is None:
@@ -256,61 +464,53 @@ async def process_papers(base_dir=None, paper_folders=None, overwrite_merged=Fal
     print(f"🚀 Starting pipeline: {total_papers} papers to process")
     print(f"📁 Papers directory: {base_dir}")
     print(f"📝 Progress log: {log_file}")
+    if question_concurrency > 1:
+        print(f"⚡ Question concurrency: {question_concurrency}")
+    if paper_workers > 1:
+        print(f"⚡ Paper workers: {paper_workers}")
+    if not use_cache:
+        set_llm_cache(None)
+        print("💾 LLM response cache: disabled")
+    if incremental:
+        print("♻️  Incremental mode: unchanged questions are skipped")
+    if metrics_path is None:
+        from metabeeai.config import get_logs_dir
+
+        metrics_path = os.path.join(get_logs_dir(), f"llm_usage_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+    tracker = get_usage_tracker()
+    tracker.open(metrics_path)
+    print(f"📈 LLM usage metrics: {metrics_path}")
     print("=" * 60)
 
-    for paper_folder in paper_folders:
+    async def process_paper(paper_folder):
+        nonlocal completed_papers
         paper_path = os.path.join(base_dir, paper_folder)
 
+        def report(message):
+            # With several papers in flight, tag each line with its paper
+            _progress(message if paper_workers == 1 else f"[{paper_folder}] {message.strip()}")
+
         # Show overall progress
         remaining = total_papers - completed_papers
-        print(f"\n📊 Progress: {completed_papers}/{total_papers} completed, {remaining} remaining")
-        print(f"🔄 Processing paper {paper_folder}...")
+        report(f"\n📊 Progress: {completed_papers}/{total_papers} completed, {remaining} remaining")
+        report(f"🔄 Processing paper {paper_folder}...")
 
         # Skip if the paper directory doesn't exist
         if not os.path.exists(paper_path):
-            print(f"⏭️  Skipping {paper_folder} - directory not found")
-            continue
+            report(f"⏭️  Skipping {paper_folder} - directory not found")
+            return
 
         try:
             pages_path = os.path.join(paper_path, "pages/")
             if not os.path.exists(pages_path):
-                print(f"⏭️  Skipping {paper_folder} - pages directory not found")
-                continue
+                report(f"⏭️  Skipping {paper_folder} - pages directory not found")
+                return
 
             # Check if merged_v2.json exists
             json_path = os.path.join(pages_path, "merged_v2.json")
             if not os.path.exists(json_path):
-                print(f"⏭️  Skipping {paper_folder} - merged_v2.json not found")
-                continue
-
-            # Process the paper with progress tracking
-            questions = _get_questions()
-            print(f"  📖 Processing {len(questions)} questions...")
-
-            # Temporarily reduce logging verbosity and suppress all output during processing
-            import logging
-            import sys
-            from io import StringIO
-
-            # Capture and suppress all output during processing
-            original_stdout = sys.stdout
-            original_stderr = sys.stderr
-            original_log_level = logging.getLogger().level
-
-            # Suppress all output
-            sys.stdout = StringIO()
-            sys.stderr = StringIO()
-            logging.getLogger().setLevel(logging.ERROR)
-
-            try:
-                literature_answers = await get_literature_answers(
-                    json_path, relevance_model=relevance_model, answer_model=answer_model
-                )
-            finally:
-                # Restore all output
-                sys.stdout = original_stdout
-                sys.stderr = original_stderr
-                logging.getLogger().setLevel(original_log_level)
+                report(f"⏭️  Skipping {paper_folder} - merged_v2.json not found")
+                return
 
             # Merge with existing answers.json if it exists
             answers_path = os.path.join(paper_path, "answers.json")
@@ -326,18 +526,54 @@ async def process_papers(base_dir=None, paper_folders=None, overwrite_merged=Fal
                             existing_answers = existing_data["QUESTIONS"]
                         else:
                             existing_answers = existing_data
-                    print(f"  📝 Found existing answers with {len(existing_answers)} question(s)")
+                    report(f"  📝 Found existing answers with {len(existing_answers)} question(s)")
                 except Exception as e:
-                    print(f"  ⚠️  Could not read existing answers: {e}")
+                    report(f"  ⚠️  Could not read existing answers: {e}")
+
+            paper = PaperContext.from_json_file(json_path)
+            fingerprints = question_fingerprints(paper, relevance_model=relevance_model, answer_model=answer_model)
+
+            # In incremental mode only questions whose fingerprint changed (or whose answer is missing) are rerun
+            question_keys = None
+            if incremental:
+                recorded = load_manifest(paper_path)
+                answered = existing_answers.get("QUESTIONS", {}) if isinstance(existing_answers, dict) else {}
+                question_keys = [
+                    key for key, fingerprint in fingerprints.items() if recorded.get(key) != fingerprint or key not in answered
+                ]
+                if not question_keys:
+                    completed_papers += 1
+                    report(f"  ⏭️  Paper {paper_folder} is up to date, all {len(fingerprints)} questions unchanged")
+                    return
+
+            # Process the paper with progress tracking
+            question_count = len(question_keys) if question_keys is not None else len(fingerprints)
+            report(f"  📖 Processing {question_count} questions...")
+            paper_start_time = time.time()
+
+            # Temporarily reduce logging verbosity and suppress all output during processing
+            with _suppressed_output(), usage_scope(paper=paper_folder):
+                literature_answers = await get_literature_answers(
+                    paper,
+                    relevance_model=relevance_model,
+                    answer_model=answer_model,
+                    question_concurrency=question_concurrency,
+                    question_keys=question_keys,
+                )
 
             # Merge new answers with existing ones
             # New answers will update existing keys, but won't delete old keys
             if existing_answers:
+                if question_keys is not None and isinstance(existing_answers.get("QUESTIONS"), dict):
+                    # Incremental run: merge at question-key level so untouched answers are kept
+                    merged_questions = dict(existing_answers["QUESTIONS"])
+                    merged_questions.update(literature_answers.get("QUESTIONS", {}))
+                    literature_answers["QUESTIONS"] = merged_questions
                 # Preserve existing answers that aren't in the new results
                 for key in existing_answers:
                     if key not in literature_answers:
                         literature_answers[key] = existing_answers[key]
-                print(f"  🔄 Merged answers: {len(literature_answers)} total question(s)")
+                report(f"  🔄 Merged answers: {len(literature_answers)} total question(s)")
 
             # Save the merged results in QUESTIONS format
             output_data = {"QUESTIONS": literature_answers}
@@ -345,21 +581,35 @@ async def process_papers(base_dir=None, paper_folders=None, overwrite_merged=Fal
             with open(answers_path, "w") as f:
                 json.dump(output_data, f, indent=2)
 
+            # Record what the stored answers were computed from
+            recorded = load_manifest(paper_path) if question_keys is not None else {}
+            recorded.update({key: fingerprints[key] for key in (question_keys or fingerprints)})
+            save_manifest(paper_path, recorded)
+
             completed_papers += 1
-            print(f"  ✅ Paper {paper_folder} completed successfully")
+            report(f"  ✅ Paper {paper_folder} completed successfully in {time.time() - paper_start_time:.1f}s")
 
             # Log completion
             with open(log_file, "a") as f:
                 f.write(f"{paper_folder}: COMPLETED at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
 
         except Exception as e:
-            print(f"  ❌ Error processing paper {paper_folder}: {str(e)}")
+            report(f"  ❌ Error processing paper {paper_folder}: {str(e)}")
             failed_papers.append(paper_folder)
 
             # Log failure
             with open(log_file, "a") as f:
                 f.write(f"{paper_folder}: FAILED at {time.strftime('%Y-%m-%d %H:%M:%S')} - {str(e)}\n")
-            continue
+
+    # Worker pool: each worker pulls the next paper from a shared iterator, so at most
+    # paper_workers papers are in flight. All of them share the LLM rate limiter.
+    pending_folders = iter(paper_folders)
+
+    async def worker():
+        for paper_folder in pending_folders:
+            await process_paper(paper_folder)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(paper_workers, total_papers)))))
 
     # Final summary
     print("\n" + "=" * 60)
@@ -367,6 +617,29 @@ async def process_papers(base_dir=None, paper_folders=None, overwrite_merged=Fal
     print(f"✅ Successfully processed: {completed_papers}/{total_papers} papers")
     if failed_papers:
         print(f"❌ Failed papers: {', '.join(failed_papers)}")
+    cache = get_llm_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(
+            f"💾 LLM cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate),"
+            f" {stats['entries']} entries, {stats['size_bytes'] / (1024 * 1024):.1f} MB"
+        )
+    retry_stats = get_retry_policy().stats.as_dict()
+    if retry_stats["calls"]:
+        print(
+            f"🔄 LLM calls: {retry_stats['calls']} ({retry_stats['retries']} retries,"
+            f" {retry_stats['retried_calls']} calls retried, max {retry_stats['max_attempts']} attempts,"
+            f" {retry_stats['failed_calls']} failed)"
+        )
+    tracker.close()
+    if tracker.totals["calls"]:
+        summary_path = os.path.splitext(metrics_path)[0] + "_summary.json"
+        tracker.write_summary(summary_path)
+        print("\n📈 LLM usage by stage:")
+        print(tracker.format_table("stage"))
+        print("\n📈 LLM usage by question:")
+        print(tracker.format_table("question"))
+        print(f"\n📈 Per-call metrics: {metrics_path} (summary incl. per-paper totals: {summary_path})")
     print(f"📝 Detailed log: {log_file}")
 
 
@@ -408,9 +681,43 @@ def main(argv=None):
         default=None,
         help="Use predefined configuration: 'fast', 'balanced', or 'quality'",
     )
+    parser.add_argument(
+        "--question-concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of questions answered concurrently per paper (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--paper-workers",
+        type=int,
+        default=1,
+        help="Number of papers processed concurrently, sharing one API rate limiter (default: 1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the on-disk LLM response cache",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rerun questions whose questions.yml definition, models or merged_v2.json changed"
+        " since the last run, and merge them into the existing answers.json",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=None,
+        help="JSONL file for per-call LLM usage metrics (default: logs/llm_usage_<timestamp>.jsonl)",
+    )
 
     args = parser.parse_args(argv)
 
+    if args.question_concurrency < 1:
+        parser.error("--question-concurrency must be at least 1")
+    if args.paper_workers < 1:
+        parser.error("--paper-workers must be at least 1")
+
     # Handle predefined configurations
     if args.config:
         from metabeeai.metabeeai_llm.pipeline_config import BALANCED_CONFIG, FAST_CONFIG, QUALITY_CONFIG
@@ -438,6 +745,11 @@ def main(argv=None):
             overwrite_merged=args.overwrite,
             relevance_model=args.relevance_model,
             answer_model=args.answer_model,
+            question_concurrency=args.question_concurrency,
+            paper_workers=args.paper_workers,
+            use_cache=not args.no_cache,
+            incremental=args.incremental,
+            metrics_path=args.metrics_file,
         )
     )
 
@@ -46,19 +46,58 @@ PERFORMANCE_CONFIG = {
     "enable_batch_processing": True,  # Enable/disable batch processing
     "enable_progress_bars": True,  # Enable/disable progress bars
     "enable_detailed_logging": False,  # Enable/disable detailed logging
+    # "per_chunk": one answer call per selected chunk; "batched": one structured call per question.
+    # Override per question with "answer_strategy" in questions.yml.
+    "answer_strategy": "per_chunk",
+}
+
+# Local BM25 pre-ranking before LLM chunk selection: only the top-K chunks of a paper are
+# sent to the relevance model. Override per question with "prerank_top_k" in questions.yml.
+PRERANK_CONFIG = {
+    "enabled": True,
+    "default_top_k": 40,  # Candidate chunks passed to the relevance model per question
 }
 
 # Rate Limiting and Retry Configuration
 RETRY_CONFIG = {
-    "max_retries": 100,  # Maximum number of retries for failed API calls
-    "retry_delay": 1,  # Delay between retries in seconds
+    "max_retries": 10,  # Maximum number of retries for failed API calls
+    "retry_delay": 1,  # Delay before the first retry in seconds
     "exponential_backoff": True,  # Use exponential backoff for retries
+    "max_delay": 60,  # Upper bound for a single backoff delay in seconds
+    "jitter": True,  # Randomise delays so concurrent calls don't retry in lockstep
+}
+
+# API Rate Limits (shared token buckets for all LLM calls, per model)
+# Defaults correspond to OpenAI usage tier 2 - adjust to match your account's limits
+RATE_LIMIT_CONFIG = {
+    "default": {
+        "requests_per_minute": 500,
+        "tokens_per_minute": 200000,
+        "completion_token_reserve": 1000,  # Tokens reserved per call for the response until usage is known
+    },
+    "openai/gpt-4o": {"requests_per_minute": 5000, "tokens_per_minute": 450000},
+    "openai/gpt-4o-mini": {"requests_per_minute": 5000, "tokens_per_minute": 2000000},
+}
+
+# On-disk LLM response cache (stored under <METABEEAI_DATA_DIR>/cache unless "path" is set)
+CACHE_CONFIG = {
+    "enabled": True,
+    "path": None,
+    "max_size_mb": 1024,  # Least recently used responses are evicted beyond this size
 }
 
 
 def get_current_config():
     """Get the current configuration dictionary."""
-    return {"models": CURRENT_CONFIG, "parallel": PARALLEL_CONFIG, "performance": PERFORMANCE_CONFIG, "retry": RETRY_CONFIG}
+    return {
+        "models": CURRENT_CONFIG,
+        "parallel": PARALLEL_CONFIG,
+        "performance": PERFORMANCE_CONFIG,
+        "prerank": PRERANK_CONFIG,
+        "retry": RETRY_CONFIG,
+        "rate_limits": RATE_LIMIT_CONFIG,
+        "cache": CACHE_CONFIG,
+    }
 
 
 def print_config():
@@ -81,11 +120,29 @@ def print_config():
     print(f"  • Parallel Processing: {'✅ Enabled' if config['performance']['enable_parallel_processing'] else '❌ Disabled'}")
     print(f"  • Batch Processing: {'✅ Enabled' if config['performance']['enable_batch_processing'] else '❌ Disabled'}")
     print(f"  • Progress Bars: {'✅ Enabled' if config['performance']['enable_progress_bars'] else '❌ Disabled'}")
+    print(f"  • Answer Strategy: {config['performance']['answer_strategy']}")
+
+    print("\n🔎 BM25 Pre-ranking:")
+    print(f"  • Pre-ranking: {'✅ Enabled' if config['prerank']['enabled'] else '❌ Disabled'}")
+    print(f"  • Default Top-K: {config['prerank']['default_top_k']}")
 
     print("\n🔄 Retry Configuration:")
     print(f"  • Max Retries: {config['retry']['max_retries']}")
     print(f"  • Retry Delay: {config['retry']['retry_delay']}s")
     print(f"  • Exponential Backoff: {'✅ Enabled' if config['retry']['exponential_backoff'] else '❌ Disabled'}")
+    print(f"  • Max Delay: {config['retry']['max_delay']}s")
+    print(f"  • Jitter: {'✅ Enabled' if config['retry']['jitter'] else '❌ Disabled'}")
+
+    print("\n🚦 Rate Limits (per model):")
+    for model, limits in config["rate_limits"].items():
+        rpm = limits.get("requests_per_minute", "default")
+        tpm = limits.get("tokens_per_minute", "default")
+        print(f"  • {model}: {rpm} requests/min, {tpm} tokens/min")
+
+    print("\n💾 Response Cache:")
+    print(f"  • Cache: {'✅ Enabled' if config['cache']['enabled'] else '❌ Disabled'}")
+    print(f"  • Path: {config['cache']['path'] or '<data dir>/cache/llm_cache.sqlite'}")
+    print(f"  • Max Size: {config['cache']['max_size_mb']} MB")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+"""
+Token-bucket rate limiting for LLM API calls.
+
+A single RateLimiter instance is shared by every ``acompletion`` call made from
+``json_multistage_qa``, so concurrently processed questions and papers stay inside
+the requests-per-minute and tokens-per-minute quota of each model instead of
+triggering bursts of 429 responses.
+
+Limits are read from ``RATE_LIMIT_CONFIG`` in ``pipeline_config.py``.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Used when neither the model nor "default" is present in the configuration
+FALLBACK_LIMITS = {"requests_per_minute": 500, "tokens_per_minute": 200000, "completion_token_reserve": 1000}
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket that refills continuously at ``rate_per_minute``.
+
+    Waiters are served in FIFO order. A request larger than the bucket capacity is
+    clamped to the capacity so that it can still proceed once the bucket is full.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+        self._loop = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _get_lock(self):
+        # asyncio.Lock is bound to the loop it is first used in; the synchronous
+        # wrappers in llm_pipeline run a fresh loop per call, so recreate it when needed.
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def acquire(self, amount: float = 1) -> float:
+        """
+        Wait until ``amount`` tokens are available and take them.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        async with self._get_lock():
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def adjust(self, delta: float):
+        """Return (negative delta) or take (positive delta) tokens after the fact, e.g. to reconcile estimates."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class RateLimiter:
+    """
+    Per-model request and token limits backed by two TokenBuckets each.
+
+    Args:
+        limits: Mapping of model name -> {"requests_per_minute", "tokens_per_minute",
+            "completion_token_reserve"}. The "default" entry applies to models without
+            their own entry.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.limits = limits or {}
+        self._buckets = {}
+
+    def _limits_for(self, model: str) -> Dict[str, Any]:
+        limits = dict(FALLBACK_LIMITS)
+        limits.update(self.limits.get("default", {}))
+        limits.update(self.limits.get(model, {}))
+        return limits
+
+    def _get_buckets(self, model: str):
+        if model not in self._buckets:
+            limits = self._limits_for(model)
+            self._buckets[model] = (
+                TokenBucket(limits["requests_per_minute"]),
+                TokenBucket(limits["tokens_per_minute"]),
+            )
+        return self._buckets[model]
+
+    def estimate_tokens(self, model: str, messages: List[Dict[str, Any]]) -> int:
+        """Estimate the tokens a call will consume: prompt tokens plus a completion reserve."""
+        try:
+            from litellm import token_counter
+
+            prompt_tokens = token_counter(model=model, messages=messages)
+        except Exception:
+            # Rough fallback of ~4 characters per token
+            prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages) // 4
+        return int(prompt_tokens) + int(self._limits_for(model)["completion_token_reserve"])
+
+    async def acquire(self, model: str, messages: List[Dict[str, Any]]) -> int:
+        """
+        Wait for a request slot and enough token budget for the given call.
+
+        Returns:
+            int: The number of tokens reserved, to be passed to ``record_usage``.
+        """
+        request_bucket, token_bucket = self._get_buckets(model)
+        estimated = self.estimate_tokens(model, messages)
+        waited = await request_bucket.acquire(1)
+        waited += await token_bucket.acquire(estimated)
+        if waited > 0:
+            logger.info(f"Rate limiter delayed {model} call by {waited:.2f}s")
+        return estimated
+
+    def record_usage(self, model: str, estimated: int, usage: Any = None):
+        """Reconcile the reserved token estimate with the usage reported by the API."""
+        total_tokens = getattr(usage, "total_tokens", None)
+        if total_tokens is None and isinstance(usage, dict):
+            total_tokens = usage.get("total_tokens")
+        if total_tokens is None:
+            return
+        _, token_bucket = self._get_buckets(model)
+        token_bucket.adjust(total_tokens - estimated)
+
+    def release(self, model: str, estimated: int):
+        """Return the tokens reserved for a call that failed without consuming any (e.g. a 429 response)."""
+        _, token_bucket = self._get_buckets(model)
+        token_bucket.adjust(-estimated)
+
+
+_RATE_LIMITER = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the shared rate limiter, creating it from pipeline_config on first use."""
+    global _RATE_LIMITER
+    if _RATE_LIMITER is None:
+        try:
+            from metabeeai.metabeeai_llm.pipeline_config import RATE_LIMIT_CONFIG
+        except ImportError:
+            RATE_LIMIT_CONFIG = {}
+        _RATE_LIMITER = RateLimiter(RATE_LIMIT_CONFIG)
+    return _RATE_LIMITER
+
+
+def set_rate_limiter(limiter: RateLimiter):
+    """Replace the shared rate limiter (e.g. to apply limits chosen on the command line)."""
+    global _RATE_LIMITER
+    _RATE_LIMITER = limiter
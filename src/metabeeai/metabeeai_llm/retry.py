@@ -0,0 +1,286 @@
+"""
+Retry with jittered exponential backoff for LLM API calls.
+
+All LLM calls in ``json_multistage_qa`` go through ``call_with_retry``, which reads
+``RETRY_CONFIG`` from ``pipeline_config.py``:
+
+- only transient errors are retried: rate limits, timeouts, connection and server
+  errors (from litellm, openai, httpx or requests) and malformed model output
+  (``MalformedOutputError``); everything else, including authentication errors, bad
+  requests and programming errors such as a TypeError, is raised immediately;
+- the delay between attempts grows exponentially up to ``max_delay``, with jitter so
+  that concurrent callers do not retry in lockstep;
+- a ``Retry-After`` (or ``retry-after-ms``) header sent with the error is honoured;
+- every call's attempt count is recorded, and calls that needed retries are logged.
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Client-error status codes that may succeed when retried (all 5xx codes are retryable)
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+# Exception class names (checked along the MRO) of transient errors
+RETRYABLE_ERROR_NAMES = {
+    # litellm and openai
+    "RateLimitError",
+    "Timeout",
+    "APITimeoutError",
+    "APIConnectionError",
+    "InternalServerError",
+    "ServiceUnavailableError",
+    "BadGatewayError",
+    # httpx
+    "TimeoutException",
+    "NetworkError",
+    "RemoteProtocolError",
+    # requests and builtins (asyncio.TimeoutError is TimeoutError)
+    "ConnectionError",
+    "TimeoutError",
+    # metabeeai
+    "MalformedOutputError",
+}
+# Exception class names (checked along the MRO) that will not succeed when retried
+FATAL_ERROR_NAMES = {
+    "AuthenticationError",
+    "PermissionDeniedError",
+    "NotFoundError",
+    "BadRequestError",
+    "ContextWindowExceededError",
+    "ContentPolicyViolationError",
+    "UnsupportedParamsError",
+}
+
+# Attempt number (1-based) of the call currently being made through RetryPolicy.run
+_current_attempt = contextvars.ContextVar("metabeeai_retry_attempt", default=1)
+
+DEFAULT_RETRY_CONFIG = {
+    "max_retries": 10,
+    "retry_delay": 1,
+    "exponential_backoff": True,
+    "max_delay": 60,
+    "jitter": True,
+}
+
+
+class MalformedOutputError(ValueError):
+    """A model response that could not be parsed or validated; the same request may succeed when retried."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Decide whether an error is worth retrying.
+
+    Rate limits (429), timeouts, connection problems, server errors and malformed
+    model output are retryable. Client errors such as invalid credentials or an
+    oversized prompt are fatal, and so is anything unrecognised: a bug would fail
+    the same way on every attempt.
+    """
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if names & FATAL_ERROR_NAMES:
+        return False
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int) and 400 <= status_code < 500:
+        return status_code in RETRYABLE_STATUS_CODES
+    if isinstance(status_code, int) and status_code >= 500:
+        return True
+    return bool(names & RETRYABLE_ERROR_NAMES)
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Return the delay in seconds requested by a Retry-After header on the error, if any."""
+    headers = None
+    for source in (getattr(error, "response", None), error):
+        for attribute in ("headers", "litellm_response_headers"):
+            try:
+                headers = getattr(source, attribute, None)
+            except Exception:
+                headers = None
+            if headers:
+                break
+        if headers:
+            break
+    if not headers:
+        return None
+
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return max(0.0, float(value) / 1000)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            # HTTP-date form
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class RetryStats:
+    """Counters describing how many attempts the calls made through a RetryPolicy needed."""
+
+    def __init__(self):
+        self.calls = 0
+        self.attempts = 0
+        self.retried_calls = 0
+        self.failed_calls = 0
+        self.max_attempts = 0
+
+    def record(self, attempts: int, succeeded: bool):
+        self.calls += 1
+        self.attempts += attempts
+        self.max_attempts = max(self.max_attempts, attempts)
+        if attempts > 1:
+            self.retried_calls += 1
+        if not succeeded:
+            self.failed_calls += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.attempts - self.calls,
+            "retried_calls": self.retried_calls,
+            "failed_calls": self.failed_calls,
+            "max_attempts": self.max_attempts,
+        }
+
+
+class RetryPolicy:
+    """
+    Retry an async callable with jittered exponential backoff.
+
+    Args:
+        max_retries: Retries after the first attempt (a call makes at most max_retries + 1 attempts)
+        retry_delay: Delay before the first retry, in seconds
+        exponential_backoff: Double the delay after every failed attempt
+        max_delay: Upper bound for the computed delay, in seconds
+        jitter: Randomise each delay between 50% and 100% of its computed value
+        retryable: Predicate deciding whether an error is retried (default: ``is_retryable``)
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 10,
+        retry_delay: float = 1,
+        exponential_backoff: bool = True,
+        max_delay: float = 60,
+        jitter: bool = True,
+        retryable: Callable[[BaseException], bool] = is_retryable,
+    ):
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.exponential_backoff = exponential_backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retryable = retryable
+        self.stats = RetryStats()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> "RetryPolicy":
+        """Create a policy from a RETRY_CONFIG-style dictionary (missing keys use the defaults)."""
+        settings = dict(DEFAULT_RETRY_CONFIG)
+        settings.update(config or {})
+        return cls(
+            max_retries=settings["max_retries"],
+            retry_delay=settings["retry_delay"],
+            exponential_backoff=settings["exponential_backoff"],
+            max_delay=settings["max_delay"],
+            jitter=settings["jitter"],
+        )
+
+    def compute_delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        Delay before the retry following failed attempt number ``attempt`` (1-based).
+
+        A Retry-After value sent by the server is used as a lower bound.
+        """
+        delay = self.retry_delay * (2 ** (attempt - 1) if self.exponential_backoff else 1)
+        delay = min(delay, self.max_delay)
+        if self.jitter:
+            delay = delay / 2 + random.uniform(0, delay / 2)
+        retry_after = get_retry_after(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def run(self, func: Callable[[], Awaitable[Any]], description: str = "LLM call") -> Any:
+        """
+        Await ``func()`` until it succeeds, a fatal error occurs, or the retries are exhausted.
+
+        Args:
+            func: Zero-argument callable returning a new awaitable for each attempt
+            description: Short description of the call used in log messages
+
+        Returns:
+            The result of the first successful attempt.
+
+        Raises:
+            The last error, if it was fatal or all attempts failed.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            token = _current_attempt.set(attempt)
+            try:
+                result = await func()
+            except Exception as e:
+                if not self.retryable(e):
+                    self.stats.record(attempt, succeeded=False)
+                    logger.error(f"{description} failed with non-retryable error: {e}")
+                    raise
+                if attempt > self.max_retries:
+                    self.stats.record(attempt, succeeded=False)
+                    logger.error(f"{description} failed after {attempt} attempts: {e}")
+                    raise
+                delay = self.compute_delay(attempt, e)
+                logger.warning(f"{description} attempt {attempt} failed ({type(e).__name__}: {e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                _current_attempt.reset(token)
+
+            self.stats.record(attempt, succeeded=True)
+            if attempt > 1:
+                logger.info(f"{description} succeeded after {attempt} attempts")
+            return result
+
+
+def current_attempt() -> int:
+    """Return the attempt number of the retried call in progress (1 outside of RetryPolicy.run)."""
+    return _current_attempt.get()
+
+
+_RETRY_POLICY = None
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Get the shared retry policy, creating it from pipeline_config on first use."""
+    global _RETRY_POLICY
+    if _RETRY_POLICY is None:
+        try:
+            from metabeeai.metabeeai_llm.pipeline_config import RETRY_CONFIG
+        except ImportError:
+            RETRY_CONFIG = {}
+        _RETRY_POLICY = RetryPolicy.from_config(RETRY_CONFIG)
+    return _RETRY_POLICY
+
+
+def set_retry_policy(policy: RetryPolicy):
+    """Replace the shared retry policy."""
+    global _RETRY_POLICY
+    _RETRY_POLICY = policy
+
+
+async def call_with_retry(func: Callable[[], Awaitable[Any]], description: str = "LLM call") -> Any:
+    """Run ``func`` with the shared retry policy (see RetryPolicy.run)."""
+    return await get_retry_policy().run(func, description)
@@ -0,0 +1,214 @@
+"""
+Token, cost and latency accounting for LLM calls.
+
+Every call made through ``json_multistage_qa._acompletion`` is recorded by the shared
+UsageTracker together with the paper, question key and pipeline stage it belongs to.
+Those labels are carried in context variables (set with ``usage_scope``), so they
+follow the call through concurrently running asyncio tasks without being passed
+around explicitly.
+
+Stages used by the pipeline: "relevance", "answer", "reflect" and "format_list".
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_paper = contextvars.ContextVar("metabeeai_usage_paper", default=None)
+_current_question = contextvars.ContextVar("metabeeai_usage_question", default=None)
+_current_stage = contextvars.ContextVar("metabeeai_usage_stage", default=None)
+
+_SCOPE_VARS = {"paper": _current_paper, "question": _current_question, "stage": _current_stage}
+
+UNKNOWN = "unknown"
+
+
+@contextlib.contextmanager
+def usage_scope(**labels):
+    """
+    Label every LLM call made inside the block.
+
+    Args:
+        **labels: Any of ``paper``, ``question`` and ``stage``. Labels that are not given
+            keep the value of the enclosing scope.
+    """
+    tokens = []
+    try:
+        for name, value in labels.items():
+            tokens.append((_SCOPE_VARS[name], _SCOPE_VARS[name].set(value)))
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def current_labels() -> Dict[str, Optional[str]]:
+    """Return the paper/question/stage labels of the calling context."""
+    return {name: var.get() for name, var in _SCOPE_VARS.items()}
+
+
+def _usage_value(usage: Any, key: str) -> int:
+    if usage is None:
+        return 0
+    value = usage.get(key) if isinstance(usage, dict) else getattr(usage, key, None)
+    return int(value or 0)
+
+
+def _compute_cost(response: Any) -> float:
+    try:
+        from litellm import completion_cost
+
+        return float(completion_cost(completion_response=response) or 0.0)
+    except Exception:
+        return 0.0
+
+
+class UsageTracker:
+    """
+    Collects per-call LLM metrics and aggregates them per paper, question key and stage.
+
+    Aggregates are always kept in memory; individual records are also appended to a
+    JSONL file while one is open (see ``open``).
+    """
+
+    def __init__(self):
+        self.totals = self._new_bucket()
+        self.by_dimension = {dimension: defaultdict(self._new_bucket) for dimension in ("paper", "question", "stage", "model")}
+        self.metrics_path = None
+        self._file = None
+
+    @staticmethod
+    def _new_bucket() -> Dict[str, Any]:
+        return {
+            "calls": 0,
+            "cached_calls": 0,
+            "failed_calls": 0,
+            "retries": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "cost": 0.0,
+            "latency_s": 0.0,
+        }
+
+    def open(self, path: str):
+        """Start appending one JSON line per call to ``path``."""
+        self.close()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.metrics_path = path
+        self._file = open(path, "a")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def record(
+        self,
+        model: str,
+        response: Any = None,
+        latency: float = 0.0,
+        attempt: int = 1,
+        cached: bool = False,
+        error: Optional[BaseException] = None,
+    ) -> Dict[str, Any]:
+        """
+        Record one LLM call.
+
+        Args:
+            model: Model the call was made with
+            response: litellm response (its ``usage`` provides the token counts)
+            latency: Wall-clock duration of the call in seconds
+            attempt: Attempt number of the call within its retry sequence (1 = first try)
+            cached: True if the response came from the response cache (no tokens billed)
+            error: The exception raised by the call, if it failed
+
+        Returns:
+            dict: The stored record.
+        """
+        usage = None if cached else getattr(response, "usage", None)
+        labels = current_labels()
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "paper": labels["paper"] or UNKNOWN,
+            "question": labels["question"] or UNKNOWN,
+            "stage": labels["stage"] or UNKNOWN,
+            "model": model,
+            "prompt_tokens": _usage_value(usage, "prompt_tokens"),
+            "completion_tokens": _usage_value(usage, "completion_tokens"),
+            "total_tokens": _usage_value(usage, "total_tokens"),
+            "cost": 0.0 if cached or response is None else _compute_cost(response),
+            "latency_s": round(latency, 3),
+            "attempt": attempt,
+            "cached": cached,
+            "error": f"{type(error).__name__}: {error}" if error is not None else None,
+        }
+
+        for bucket in [self.totals] + [self.by_dimension[dimension][record[dimension]] for dimension in self.by_dimension]:
+            bucket["calls"] += 1
+            bucket["cached_calls"] += int(cached)
+            bucket["failed_calls"] += int(error is not None)
+            bucket["retries"] += int(attempt > 1)
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens", "cost", "latency_s"):
+                bucket[key] += record[key]
+
+        if self._file is not None:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+        return record
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the totals and the per-paper, per-question, per-stage and per-model aggregates."""
+        summary = {"totals": dict(self.totals)}
+        for dimension, buckets in self.by_dimension.items():
+            summary[f"by_{dimension}"] = {key: dict(value) for key, value in buckets.items()}
+        return summary
+
+    def format_table(self, dimension: str) -> str:
+        """Format the aggregates of one dimension ("paper", "question", "stage" or "model") as a text table."""
+        header = (
+            f"{dimension.capitalize():<28} {'Calls':>7} {'Cached':>7} {'Retries':>7} {'Failed':>7}"
+            f" {'Prompt':>10} {'Compl.':>9} {'Cost $':>9} {'Avg s':>7}"
+        )
+        lines = [header, "-" * len(header)]
+        rows = sorted(self.by_dimension[dimension].items(), key=lambda item: -item[1]["cost"])
+        for key, bucket in rows + [("TOTAL", self.totals)]:
+            live_calls = bucket["calls"] - bucket["cached_calls"]
+            average_latency = bucket["latency_s"] / live_calls if live_calls else 0.0
+            lines.append(
+                f"{str(key)[:28]:<28} {bucket['calls']:>7} {bucket['cached_calls']:>7} {bucket['retries']:>7}"
+                f" {bucket['failed_calls']:>7} {bucket['prompt_tokens']:>10} {bucket['completion_tokens']:>9}"
+                f" {bucket['cost']:>9.4f} {average_latency:>7.2f}"
+            )
+        return "\n".join(lines)
+
+    def write_summary(self, path: str):
+        """Write ``summary()`` to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+_USAGE_TRACKER = None
+
+
+def get_usage_tracker() -> UsageTracker:
+    """Get the shared usage tracker."""
+    global _USAGE_TRACKER
+    if _USAGE_TRACKER is None:
+        _USAGE_TRACKER = UsageTracker()
+    return _USAGE_TRACKER
+
+
+def set_usage_tracker(tracker: UsageTracker):
+    """Replace the shared usage tracker (e.g. to start a fresh run)."""
+    global _USAGE_TRACKER
+    _USAGE_TRACKER = tracker
@@ -3,7 +3,7 @@
 
 from .batch_deduplicate import batch_deduplicate
 from .deduplicate_chunks import analyze_chunk_uniqueness, deduplicate_chunks, process_merged_json_file
-from .merger import adjust_and_merge_json, process_all_papers
+from .merger import adjust_and_merge_json, merge_and_deduplicate_papers, process_all_papers
 from .split_pdf import split_pdfs
 from .va_process_papers import process_papers
 
@@ -12,6 +12,7 @@ __all__ = [
     "process_papers",
     "process_all_papers",
     "adjust_and_merge_json",
+    "merge_and_deduplicate_papers",
     "batch_deduplicate",
     "analyze_chunk_uniqueness",
     "deduplicate_chunks",
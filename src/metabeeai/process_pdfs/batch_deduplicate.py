@@ -9,10 +9,17 @@ import json
 import logging
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from metabeeai.process_pdfs.deduplicate_chunks import analyze_chunk_uniqueness, process_merged_json_file
+from metabeeai.process_pdfs.deduplicate_chunks import (
+    DEDUP_MODES,
+    DEFAULT_IOU_THRESHOLD,
+    DEFAULT_JACCARD_THRESHOLD,
+    process_merged_json_file,
+)
 
 
 # Try to get the papers directory from config, with fallbacks
@@ -128,13 +135,17 @@ def find_merged_json_files(paper_folders: List[Path]) -> List[Dict[str, Any]]:
     return merged_files
 
 
-def process_single_paper(file_info: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+def process_single_paper(
+    file_info: Dict[str, Any], dry_run: bool = False, mode: str = "exact", threshold: Optional[float] = None
+) -> Dict[str, Any]:
     """
     Process a single paper's merged_v2.json file.
 
     Args:
         file_info (Dict[str, Any]): Information about the file to process.
         dry_run (bool): If True, only analyze without making changes.
+        mode (str): "exact", "near" or "overlap" duplicate detection.
+        threshold (float): Jaccard (near) or box IoU (overlap) threshold; None for the mode's default.
 
     Returns:
         Dict[str, Any]: Processing results.
@@ -145,51 +156,93 @@ def process_single_paper(file_info: Dict[str, Any], dry_run: bool = False) -> Di
     logger.info(f"Processing paper {paper_id}: {json_path}")
 
     try:
-        if dry_run:
-            # Just analyze without deduplicating
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            chunks = data.get("data", {}).get("chunks", [])
-            analysis = analyze_chunk_uniqueness(chunks)
-
+        # Dry runs go through the same parse and duplicate search as real runs, without writing
+        result = process_merged_json_file(json_path, mode=mode, threshold=threshold, dry_run=dry_run)
+        if dry_run and "deduplication_stats" in result:
             return {
                 "paper_id": paper_id,
                 "status": "analyzed",
                 "file_path": str(json_path),
-                "analysis": analysis,
-                "message": "Dry run - no changes made",
+                "analysis": result["deduplication_stats"],
+                "message": result["message"],
             }
-        else:
-            # Actually process the file
-            result = process_merged_json_file(json_path)
-            result["paper_id"] = paper_id
+        result["paper_id"] = paper_id
 
-            # Debug: log what we got back
-            logger.warning(f"Paper {paper_id} result: {result}")
+        # Debug: log what we got back
+        logger.debug(f"Paper {paper_id} result: {result}")
 
-            return result
+        return result
 
     except Exception as e:
         logger.error(f"Error processing paper {paper_id}: {e}")
         return {"paper_id": paper_id, "status": "error", "file_path": str(json_path), "error": str(e)}
 
 
+class _SummaryStream:
+    """
+    Write a batch summary JSON file incrementally.
+
+    The ``results`` list is written one paper at a time as results come in, followed by
+    the totals when the batch is finished, so an interrupted run leaves the results of
+    every paper finished so far on disk.
+    """
+
+    def __init__(self, path: Path, header: Dict[str, Any]):
+        self.path = Path(path)
+        self.count = 0
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("{\n")
+        for key, value in header.items():
+            self._file.write(f"  {json.dumps(key)}: {json.dumps(value, default=str)},\n")
+        self._file.write('  "results": [')
+        self._file.flush()
+
+    def add(self, result: Dict[str, Any]):
+        text = json.dumps(result, indent=2, default=str).replace("\n", "\n    ")
+        self._file.write(("," if self.count else "") + "\n    " + text)
+        self._file.flush()
+        self.count += 1
+
+    def close(self, footer: Dict[str, Any]):
+        self._file.write("\n  ]" if self.count else "]")
+        for key, value in footer.items():
+            self._file.write(f",\n  {json.dumps(key)}: {json.dumps(value, default=str)}")
+        self._file.write("\n}\n")
+        self._file.close()
+        logger.info(f"Results summary saved to: {self.path}")
+
+
 def batch_deduplicate(
-    base_dir: Path = None, dry_run: bool = False, start_paper: int = None, end_paper: int = None, folder_list: list = None
+    base_dir: Path = None,
+    dry_run: bool = False,
+    start_paper: int = None,
+    end_paper: int = None,
+    folder_list: list = None,
+    mode: str = "exact",
+    threshold: Optional[float] = None,
+    workers: int = 1,
+    summary_path: Path = None,
 ) -> Dict[str, Any]:
     """
     Process all merged_v2.json files in the base directory.
 
+    With ``workers`` > 1 papers are processed in a process pool, so a full corpus is
+    bounded by disk bandwidth rather than by one core. If ``summary_path`` is given,
+    each paper's result is appended to that JSON file as soon as it completes.
+
     Args:
         base_dir (Path): Base directory containing paper folders.
         dry_run (bool): If True, only analyze without making changes.
         start_paper (int): First paper number to process (inclusive) - for numeric folders.
         end_paper (int): Last paper number to process (inclusive) - for numeric folders.
         folder_list (list): List of folder names to process (overrides start_paper/end_paper).
+        mode (str): "exact", "near" or "overlap" duplicate detection.
+        threshold (float): Jaccard (near) or box IoU (overlap) threshold; None for the mode's default.
+        workers (int): Number of worker processes (1 processes papers in this process).
+        summary_path (Path): JSON file the summary is streamed to (not written if None).
 
     Returns:
-        Dict[str, Any]: Summary of processing results.
+        Dict[str, Any]: Summary of processing results, with results ordered by paper.
     """
     if base_dir is None:
         base_dir = Path(get_papers_dir())
@@ -235,16 +288,33 @@ def batch_deduplicate(
 
     if not merged_files:
         logger.warning("No merged_v2.json files found to process")
-        return {"status": "no_files_found", "total_papers": 0}
+        summary = {"status": "no_files_found", "total_papers": 0}
+        if summary_path is not None:
+            save_results_summary(summary, Path(summary_path))
+        return summary
 
     # Process each file
     results = []
     total_processed = 0
     total_duplicates_removed = 0
+    stream = None
+    if summary_path is not None:
+        stream = _SummaryStream(
+            summary_path,
+            {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "dry_run": dry_run,
+                "base_directory": str(base_dir),
+                "mode": mode,
+                "threshold": threshold,
+            },
+        )
 
-    for file_info in merged_files:
-        result = process_single_paper(file_info, dry_run)
+    def record(result: Dict[str, Any]):
+        nonlocal total_processed, total_duplicates_removed
         results.append(result)
+        if stream is not None:
+            stream.add(result)
 
         # Check if processing was successful (either status="success" or success=True)
         if result.get("status") == "success" or result.get("success"):
@@ -253,12 +323,12 @@ def batch_deduplicate(
             if "deduplication_info" in result:
                 duplicates = result["deduplication_info"].get("duplicates_removed", 0)
                 total_duplicates_removed += duplicates
-                logger.warning(f"Paper {result.get('paper_id')}: Found {duplicates} duplicates in deduplication_info")
+                logger.info(f"Paper {result.get('paper_id')}: Found {duplicates} duplicates in deduplication_info")
             # Also check deduplication_stats as fallback
             elif "deduplication_stats" in result:
                 duplicates = result["deduplication_stats"].get("duplicate_chunks", 0)
                 total_duplicates_removed += duplicates
-                logger.warning(f"Paper {result.get('paper_id')}: Found {duplicates} duplicates in deduplication_stats")
+                logger.info(f"Paper {result.get('paper_id')}: Found {duplicates} duplicates in deduplication_stats")
             else:
                 logger.warning(f"Paper {result.get('paper_id')}: No duplicate info found in result keys: {list(result.keys())}")
         elif result.get("status") == "analyzed":
@@ -267,16 +337,50 @@ def batch_deduplicate(
             if "analysis" in result:
                 duplicates = result["analysis"].get("duplicate_chunks", 0)
                 total_duplicates_removed += duplicates
-                logger.warning(f"Paper {result.get('paper_id')}: Found {duplicates} duplicates in analysis")
+                logger.info(f"Paper {result.get('paper_id')}: Found {duplicates} duplicates in analysis")
         else:
             logger.warning(f"Paper {result.get('paper_id')}: Unexpected result structure: {list(result.keys())}")
 
+    try:
+        if workers > 1 and len(merged_files) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(merged_files))) as executor:
+                futures = {
+                    executor.submit(process_single_paper, file_info, dry_run, mode, threshold): file_info
+                    for file_info in merged_files
+                }
+                for future in as_completed(futures):
+                    file_info = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Error processing paper {file_info['paper_id']}: {e}")
+                        result = {
+                            "paper_id": file_info["paper_id"],
+                            "status": "error",
+                            "file_path": str(file_info["json_path"]),
+                            "error": str(e),
+                        }
+                    record(result)
+        else:
+            for file_info in merged_files:
+                record(process_single_paper(file_info, dry_run, mode, threshold))
+    finally:
+        totals = {
+            "status": "completed" if len(results) == len(merged_files) else "interrupted",
+            "total_papers": len(merged_files),
+            "processed_papers": total_processed,
+            "total_duplicates_removed": total_duplicates_removed,
+        }
+        if stream is not None:
+            stream.close(totals)
+
+    # Results arrive in completion order; report them in folder order
+    order = {file_info["paper_id"]: i for i, file_info in enumerate(merged_files)}
+    results.sort(key=lambda result: order.get(result.get("paper_id"), len(order)))
+
     # Generate summary
     summary = {
-        "status": "completed",
-        "total_papers": len(merged_files),
-        "processed_papers": total_processed,
-        "total_duplicates_removed": total_duplicates_removed,
+        **totals,
         "dry_run": dry_run,
         "base_directory": str(base_dir),
         "results": results,
@@ -291,6 +395,11 @@ def batch_deduplicate(
     return summary
 
 
+def default_summary_path() -> Path:
+    """Get a timestamped summary file name in the current directory."""
+    return Path(f"deduplication_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+
 def save_results_summary(summary: Dict[str, Any], output_file: Path = None) -> None:
     """
     Save the processing results summary to a file.
@@ -300,8 +409,7 @@ def save_results_summary(summary: Dict[str, Any], output_file: Path = None) -> N
         output_file (Path): Output file path (defaults to timestamped file).
     """
     if output_file is None:
-        timestamp = summary.get("timestamp", "unknown")
-        output_file = Path(f"deduplication_summary_{timestamp}.json")
+        output_file = default_summary_path()
 
     try:
         with open(output_file, "w", encoding="utf-8") as f:
@@ -323,7 +431,36 @@ def main():
 
     parser.add_argument("--end-paper", type=int, help="Last paper number to process (inclusive)")
 
-    parser.add_argument("--output", type=str, help="Output file for results summary (defaults to timestamped file)")
+    parser.add_argument(
+        "--mode",
+        type=str,
+        choices=DEDUP_MODES,
+        default="exact",
+        help="Duplicate detection: exact (identical text, default), near (MinHash/LSH Jaccard similarity) "
+        "or overlap (identical text or overlapping grounding boxes on the same page, for 2-page splits)",
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help=f"Jaccard similarity threshold of the near mode (default: {DEFAULT_JACCARD_THRESHOLD}) "
+        f"or grounding box IoU threshold of the overlap mode (default: {DEFAULT_IOU_THRESHOLD})",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of papers deduplicated in parallel worker processes (default: 1)",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Output file for the results summary, written as papers complete (defaults to a timestamped file; "
+        "dry runs only write a summary when given)",
+    )
 
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
 
@@ -339,19 +476,28 @@ def main():
     else:
         base_dir = None  # Will use default from config
 
+    # Results are streamed to the summary file as papers complete
+    if args.output:
+        summary_path = Path(args.output)
+    elif not args.dry_run:
+        # Auto-save results for actual processing runs
+        summary_path = default_summary_path()
+    else:
+        summary_path = None
+
     # Run batch processing
     try:
         summary = batch_deduplicate(
-            base_dir=base_dir, dry_run=args.dry_run, start_paper=args.start_paper, end_paper=args.end_paper
+            base_dir=base_dir,
+            dry_run=args.dry_run,
+            start_paper=args.start_paper,
+            end_paper=args.end_paper,
+            mode=args.mode,
+            threshold=args.threshold,
+            workers=args.workers,
+            summary_path=summary_path,
         )
 
-        # Save results if requested
-        if args.output:
-            save_results_summary(summary, Path(args.output))
-        elif not args.dry_run:
-            # Auto-save results for actual processing runs
-            save_results_summary(summary)
-
         # Print final summary
         print("\n" + "=" * 60)
         print("BATCH DEDUPLICATION SUMMARY")
@@ -3,120 +3,392 @@
 Chunk deduplication module for the PDF processing pipeline.
 This module provides functions to identify and remove duplicate text chunks
 while preserving all chunk IDs and metadata.
+
+Three modes are supported:
+
+- ``exact``: chunks whose stripped text is identical
+- ``near``: chunks whose character shingles have a Jaccard similarity of at least a
+  threshold (default 0.8), e.g. copies from the overlapping 2-page split mode that
+  differ by whitespace, hyphenation or a trailing sentence. Candidates are found with
+  MinHash signatures and LSH banding, so the cost grows linearly with the text of a paper.
+- ``overlap``: exact copies plus chunks of the same type whose grounding boxes on the
+  same global page have an intersection over union of at least a threshold (default
+  0.7). In the overlapping 2-page split mode the merger maps the shared page of two
+  windows onto the same global page, so every interior page is extracted twice at the
+  same position.
 """
 
 import json
 import logging
+import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 
 # Configure logging
 logging.basicConfig(level=logging.WARNING)  # Reduce verbosity
 logger = logging.getLogger(__name__)
 
+DEDUP_MODES = ["exact", "near", "overlap"]
+DEFAULT_JACCARD_THRESHOLD = 0.8
+DEFAULT_IOU_THRESHOLD = 0.7
+DEFAULT_THRESHOLDS = {"near": DEFAULT_JACCARD_THRESHOLD, "overlap": DEFAULT_IOU_THRESHOLD}
+
+# MinHash / LSH settings for the near-duplicate mode
+SHINGLE_SIZE = 5  # characters per shingle
+NUM_PERMUTATIONS = 128
+LSH_RECALL = 0.99  # probability that a pair at exactly the threshold becomes an LSH candidate
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_SHINGLE_BASE = np.uint64(1000003)
+# Multiply-shift hash functions h(x) = (a * x + b) >> 32 over wrapping 64-bit integers, with odd a
+_PERMUTATIONS = np.random.default_rng(1).integers(0, 1 << 64, size=(2, NUM_PERMUTATIONS), dtype=np.uint64, endpoint=False)
+_PERMUTATIONS[0] |= np.uint64(1)
+
+
+def _normalize_text(text: str) -> str:
+    """Lowercase, join words hyphenated across line breaks and collapse whitespace."""
+    text = re.sub(r"(\w)-\s*\n\s*(\w)", r"\1\2", text.lower())
+    return " ".join(text.split())
+
+
+def _shingles(text: str) -> np.ndarray:
+    """Return the sorted unique 32-bit hashes of the character shingles of a normalized text."""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) == 0:
+        return np.zeros(1, dtype=np.uint64)
+    size = min(SHINGLE_SIZE, len(codes))
+    count = len(codes) - size + 1
+    # Polynomial rolling hash of every window, computed for all windows at once
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        hashes = (hashes * _SHINGLE_BASE + codes[offset : offset + count]) & _MAX_HASH
+    return np.unique(hashes)
+
+
+def _minhash(shingles: np.ndarray) -> np.ndarray:
+    """Return the MinHash signature (NUM_PERMUTATIONS values) of a set of shingle hashes."""
+    a, b = _PERMUTATIONS
+    return ((shingles[:, None] * a + b) >> np.uint64(32)).min(axis=0)
+
+
+def _lsh_rows(threshold: float) -> int:
+    """
+    Rows per LSH band: the most selective banding that still makes a pair at the threshold
+    a candidate with probability LSH_RECALL (candidates are verified with the exact Jaccard similarity).
+    """
+    for rows in sorted((r for r in range(1, NUM_PERMUTATIONS + 1) if NUM_PERMUTATIONS % r == 0), reverse=True):
+        if 1 - (1 - threshold**rows) ** (NUM_PERMUTATIONS // rows) >= LSH_RECALL:
+            return rows
+    return 1
+
+
+def _jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """Jaccard similarity of two sorted unique shingle hash arrays."""
+    intersection = np.intersect1d(a, b, assume_unique=True).size
+    return intersection / (a.size + b.size - intersection)
+
+
+def _chunk_boxes(chunk: Dict[str, Any]):
+    """Yield (page, (left, top, right, bottom)) for every grounding of a chunk that has a box."""
+    for g in chunk.get("grounding") or []:
+        box = g.get("box")
+        if isinstance(box, dict):
+            yield g.get("page"), (box["l"], box["t"], box["r"], box["b"])
+        elif isinstance(g.get("bbox"), (list, tuple)) and len(g["bbox"]) == 4:
+            yield g.get("page"), tuple(g["bbox"])
+
+
+def _iou_matrix(boxes: np.ndarray) -> np.ndarray:
+    """Pairwise intersection over union of boxes given as rows (left, top, right, bottom)."""
+    left = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+    top = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+    right = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+    bottom = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+    intersection = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    union = areas[:, None] + areas[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+class _DisjointSets:
+    """Union-find whose roots are the smallest member, so groups keep the order of first occurrence."""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x: int, y: int) -> bool:
+        """Merge the sets of x and y; returns False if they were already in the same set."""
+        root_x, root_y = self.find(x), self.find(y)
+        if root_x == root_y:
+            return False
+        self.parent[max(root_x, root_y)] = min(root_x, root_y)
+        return True
+
+    def groups(self) -> Dict[int, List[int]]:
+        members = {}
+        for x in range(len(self.parent)):
+            members.setdefault(self.find(x), []).append(x)
+        return members
+
+
+def _find_duplicate_groups(chunks: List[Dict[str, Any]], mode: str = "exact", threshold: Optional[float] = None):
+    """
+    Group the indices of duplicate chunks.
 
-def analyze_chunk_uniqueness(chunks: List[Dict[str, Any]]) -> dict:
+    Returns:
+        List of (indices, similarity) tuples in order of first occurrence. ``similarity`` is
+        the lowest Jaccard similarity between the first text of the group and the others
+        (near mode) or the lowest box IoU of the matches that formed the group (overlap
+        mode); it is 1.0 for exact duplicates and single chunks.
+    """
+    if mode not in DEDUP_MODES:
+        raise ValueError(f"Unknown dedup mode '{mode}', expected one of {DEDUP_MODES}")
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS.get(mode)
+
+    texts = [chunk.get("text", "").strip() for chunk in chunks]
+    exact_groups = {}
+    for i, text in enumerate(texts):
+        exact_groups.setdefault(text, []).append(i)
+    if mode == "exact":
+        return [(indices, 1.0) for indices in exact_groups.values()]
+
+    if mode == "overlap":
+        # Exact copies, plus chunks of the same type whose boxes overlap on the same global page
+        sets = _DisjointSets(len(chunks))
+        for indices in exact_groups.values():
+            for i in indices[1:]:
+                sets.union(indices[0], i)
+
+        by_page = {}
+        for i, chunk in enumerate(chunks):
+            for page, box in _chunk_boxes(chunk):
+                by_page.setdefault(page, []).append((i, box))
+
+        match_iou = {}
+        for entries in by_page.values():
+            if len(entries) < 2:
+                continue
+            owners = [i for i, _ in entries]
+            ious = _iou_matrix(np.array([box for _, box in entries], dtype=float))
+            for a, b in zip(*np.nonzero(np.triu(ious >= threshold, k=1))):
+                i, j = owners[a], owners[b]
+                type_i, type_j = chunks[i].get("chunk_type"), chunks[j].get("chunk_type")
+                if i == j or (type_i and type_j and type_i != type_j):
+                    continue
+                if sets.union(i, j):
+                    match_iou[(i, j)] = float(ious[a, b])
+
+        groups = []
+        for root, indices in sets.groups().items():
+            members = set(indices)
+            similarity = min((iou for (i, _), iou in match_iou.items() if i in members), default=1.0)
+            groups.append((indices, similarity))
+        return groups
+
+    # Near mode: exact copies are merged first, then one representative per text is compared
+    representatives = [indices[0] for indices in exact_groups.values()]
+    shingles = [_shingles(_normalize_text(texts[i])) for i in representatives]
+    rows = _lsh_rows(threshold)
+    bands = NUM_PERMUTATIONS // rows
+
+    buckets = {}
+    for position, chunk_shingles in enumerate(shingles):
+        signature = _minhash(chunk_shingles)
+        for band in range(bands):
+            key = (band, signature[band * rows : (band + 1) * rows].tobytes())
+            buckets.setdefault(key, []).append(position)
+
+    # Union-find over candidate pairs that pass the exact Jaccard check
+    sets = _DisjointSets(len(representatives))
+    checked = set()
+    for members in buckets.values():
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                pair = (members[i], members[j])
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if sets.find(pair[0]) != sets.find(pair[1]) and _jaccard(shingles[pair[0]], shingles[pair[1]]) >= threshold:
+                    sets.union(*pair)
+
+    exact_indices = list(exact_groups.values())
+    groups = []
+    for root, positions in sets.groups().items():
+        indices = sorted(i for position in positions for i in exact_indices[position])
+        similarity = min((_jaccard(shingles[root], shingles[p]) for p in positions[1:]), default=1.0)
+        groups.append((indices, similarity))
+    return groups
+
+
+def analyze_chunk_uniqueness(chunks: List[Dict[str, Any]], mode: str = "exact", threshold: Optional[float] = None) -> dict:
     """
     Analyze the uniqueness of chunks in a paper.
 
     Args:
         chunks (List[Dict[str, Any]]): List of chunks to analyze.
+        mode (str): "exact" (identical text), "near" (Jaccard similarity >= threshold)
+            or "overlap" (exact text or grounding box IoU >= threshold).
+        threshold (float): Jaccard (near) or IoU (overlap) threshold; defaults to 0.8 and 0.7.
 
     Returns:
-        dict: Analysis results including duplicate statistics.
+        dict: Analysis results including duplicate statistics. In near and overlap mode each
+        duplicate group also reports its lowest ``similarity`` (Jaccard or box IoU) and
+        ``near_duplicate_groups`` counts the groups whose texts are not all identical.
     """
     if not chunks:
         return {"total_chunks": 0, "unique_chunks": 0, "duplicate_chunks": 0, "duplication_rate": 0.0, "duplicate_groups": 0}
 
-    # Group chunks by text content
-    text_groups = {}
-    for chunk in chunks:
-        text_content = chunk.get("text", "").strip()
-        chunk_id = chunk.get("chunk_id", "unknown")
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS.get(mode)
+    return _summarize_groups(chunks, _find_duplicate_groups(chunks, mode, threshold), mode, threshold)
 
-        if text_content in text_groups:
-            text_groups[text_content]["chunk_ids"].append(chunk_id)
-        else:
-            text_groups[text_content] = {
-                "chunk_ids": [chunk_id],
-                "text_preview": text_content[:100] + "..." if len(text_content) > 100 else text_content,
-            }
 
+def _summarize_groups(chunks: List[Dict[str, Any]], groups, mode: str, threshold: Optional[float]) -> dict:
+    """Build the ``analyze_chunk_uniqueness`` result from the duplicate groups of non-empty chunks."""
     total_chunks = len(chunks)
-    unique_chunks = len(text_groups)
+    unique_chunks = len(groups)
     duplicate_chunks = total_chunks - unique_chunks
     duplication_rate = (duplicate_chunks / total_chunks) * 100 if total_chunks > 0 else 0
 
     # Find groups with duplicates
-    duplicate_groups = {text: group for text, group in text_groups.items() if len(group["chunk_ids"]) > 1}
-
-    return {
+    duplicate_details = []
+    near_duplicate_groups = 0
+    for indices, similarity in groups:
+        if len(indices) < 2:
+            continue
+        text_content = chunks[indices[0]].get("text", "").strip()
+        details = {
+            "text_preview": text_content[:100] + "..." if len(text_content) > 100 else text_content,
+            "chunk_ids": [chunks[i].get("chunk_id", "unknown") for i in indices],
+            "count": len(indices),
+        }
+        if mode != "exact":
+            details["similarity"] = round(similarity, 3)
+            if len({chunks[i].get("text", "").strip() for i in indices}) > 1:
+                near_duplicate_groups += 1
+        duplicate_details.append(details)
+
+    analysis = {
         "total_chunks": total_chunks,
         "unique_chunks": unique_chunks,
         "duplicate_chunks": duplicate_chunks,
         "duplication_rate": round(duplication_rate, 2),
-        "duplicate_groups": len(duplicate_groups),
-        "duplicate_details": [
-            {"text_preview": group["text_preview"], "chunk_ids": group["chunk_ids"], "count": len(group["chunk_ids"])}
-            for text, group in duplicate_groups.items()
-        ],
+        "duplicate_groups": len(duplicate_details),
+        "duplicate_details": duplicate_details,
     }
+    if mode != "exact":
+        threshold_key = "jaccard_threshold" if mode == "near" else "iou_threshold"
+        analysis.update({"mode": mode, threshold_key: threshold, "near_duplicate_groups": near_duplicate_groups})
+    return analysis
 
 
-def deduplicate_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def make_deduplication_info(analysis: dict) -> dict:
+    """
+    Build the ``deduplication_info`` stored in a deduplicated merged JSON file.
+
+    Args:
+        analysis (dict): Result of ``analyze_chunk_uniqueness``.
+    """
+    info = {
+        "original_chunks": analysis["total_chunks"],
+        "unique_chunks": analysis["unique_chunks"],
+        "duplicates_removed": analysis["duplicate_chunks"],
+        "duplication_rate": analysis["duplication_rate"],
+        "duplicate_groups": analysis["duplicate_groups"],
+    }
+    for key in ("mode", "jaccard_threshold", "iou_threshold", "near_duplicate_groups"):
+        if key in analysis:
+            info[key] = analysis[key]
+    return info
+
+
+def deduplicate_chunks(
+    chunks: List[Dict[str, Any]], mode: str = "exact", threshold: Optional[float] = None
+) -> List[Dict[str, Any]]:
     """
     Remove duplicate chunks based on text content while preserving chunk IDs.
 
+    Each group of duplicates is replaced by one chunk (the one with the most metadata;
+    among near duplicates with equal metadata, the one with the longest text) that lists
+    the IDs of all chunks of the group in ``chunk_ids``. Chunks that were already merged
+    by an earlier deduplication contribute all of their ``chunk_ids``.
+
     Args:
         chunks (List[Dict[str, Any]]): List of chunks to deduplicate.
+        mode (str): "exact" (identical text), "near" (Jaccard similarity >= threshold)
+            or "overlap" (exact text or grounding box IoU >= threshold).
+        threshold (float): Jaccard (near) or IoU (overlap) threshold; defaults to 0.8 and 0.7.
 
     Returns:
         List[Dict[str, Any]]: Deduplicated list of chunks with merged chunk IDs.
     """
     if not chunks:
         return chunks
+    return _merge_groups(chunks, _find_duplicate_groups(chunks, mode, threshold))
 
-    # Create a dictionary to group chunks by text content
-    text_groups = {}
-
-    for chunk in chunks:
-        text_content = chunk.get("text", "").strip()
-        chunk_id = chunk.get("chunk_id", "unknown")
-
-        if text_content in text_groups:
-            # Add this chunk_id to the existing group
-            text_groups[text_content]["chunk_ids"].append(chunk_id)
-            # Keep the chunk with the most metadata (merge if needed)
-            existing_chunk = text_groups[text_content]["chunk"]
-            if len(chunk) > len(existing_chunk):
-                text_groups[text_content]["chunk"] = chunk
-        else:
-            # Create new group
-            text_groups[text_content] = {"chunk": chunk, "chunk_ids": [chunk_id]}
 
+def _merge_groups(chunks: List[Dict[str, Any]], groups) -> List[Dict[str, Any]]:
+    """Replace every duplicate group by one chunk carrying the IDs of the whole group."""
     # Create deduplicated list with merged chunk IDs
     deduplicated_chunks = []
-    for text_content, group in text_groups.items():
-        chunk = group["chunk"].copy()
-        chunk["chunk_ids"] = group["chunk_ids"]  # Replace single ID with list of all IDs
+    for indices, _ in groups:
+        group = [chunks[i] for i in indices]
+        # Keep the chunk with the most metadata (merge if needed)
+        kept = group[0]
+        for candidate in group[1:]:
+            if (len(candidate), len(candidate.get("text", "").strip())) > (len(kept), len(kept.get("text", "").strip())):
+                kept = candidate
+
+        chunk = kept.copy()
+        # Replace single ID with list of all IDs (keeping the IDs of chunks merged earlier)
+        chunk_ids = [chunk_id for c in group for chunk_id in (c.get("chunk_ids") or [c.get("chunk_id", "unknown")])]
+        chunk["chunk_ids"] = list(dict.fromkeys(chunk_ids))
         chunk["original_chunk_id"] = chunk.get("chunk_id")  # Keep original for reference
-        chunk["chunk_id"] = group["chunk_ids"][0]  # Use first ID as primary
+        chunk["chunk_id"] = chunk["chunk_ids"][0]  # Use first ID as primary
         deduplicated_chunks.append(chunk)
 
     return deduplicated_chunks
 
 
-def get_duplicate_summary(chunks: List[Dict[str, Any]]) -> str:
+def deduplicate_and_analyze(chunks: List[Dict[str, Any]], mode: str = "exact", threshold: Optional[float] = None):
+    """
+    Deduplicate chunks and analyze their uniqueness with a single duplicate search.
+
+    Equivalent to calling ``deduplicate_chunks`` and ``analyze_chunk_uniqueness``, but the
+    (in near mode, MinHash/LSH) search for duplicate groups runs once.
+
+    Returns:
+        tuple: (deduplicated chunks, analysis)
+    """
+    if not chunks:
+        return chunks, analyze_chunk_uniqueness(chunks)
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS.get(mode)
+    groups = _find_duplicate_groups(chunks, mode, threshold)
+    return _merge_groups(chunks, groups), _summarize_groups(chunks, groups, mode, threshold)
+
+
+def get_duplicate_summary(chunks: List[Dict[str, Any]], mode: str = "exact", threshold: Optional[float] = None) -> str:
     """
     Get a human-readable summary of duplicate chunks.
 
     Args:
         chunks (List[Dict[str, Any]]): List of chunks to analyze.
+        mode (str): "exact", "near" or "overlap" (see ``analyze_chunk_uniqueness``).
+        threshold (float): Jaccard (near) or IoU (overlap) threshold.
 
     Returns:
         str: Summary of duplicate information.
     """
-    analysis = analyze_chunk_uniqueness(chunks)
+    analysis = analyze_chunk_uniqueness(chunks, mode, threshold)
 
     if analysis["duplicate_chunks"] == 0:
         return "No duplicate chunks found."
@@ -129,7 +401,8 @@ def get_duplicate_summary(chunks: List[Dict[str, Any]]) -> str:
         for i, group in enumerate(analysis["duplicate_details"][:5], 1):  # Show first 5 groups
             summary += f"  {i}. {group['text_preview']}\n"
             summary += f"     IDs: {', '.join(group['chunk_ids'][:3])}{'...' if len(group['chunk_ids']) > 3 else ''}\n"
-            summary += f"     Count: {group['count']}\n\n"
+            summary += f"     Count: {group['count']}"
+            summary += f" (similarity >= {group['similarity']})\n\n" if "similarity" in group else "\n\n"
 
         if len(analysis["duplicate_details"]) > 5:
             summary += f"  ... and {len(analysis['duplicate_details']) - 5} more duplicate groups.\n"
@@ -137,13 +410,23 @@ def get_duplicate_summary(chunks: List[Dict[str, Any]]) -> str:
     return summary
 
 
-def process_merged_json_file(json_file_path: Path, output_path: Path = None) -> dict:
+def process_merged_json_file(
+    json_file_path: Path,
+    output_path: Path = None,
+    mode: str = "exact",
+    threshold: Optional[float] = None,
+    dry_run: bool = False,
+) -> dict:
     """
     Process a merged JSON file to deduplicate chunks and save the result.
 
     Args:
         json_file_path (Path): Path to the input merged JSON file.
         output_path (Path): Path to save the deduplicated output (defaults to overwrite input).
+        mode (str): "exact" (identical text), "near" (Jaccard similarity >= threshold)
+            or "overlap" (exact text or grounding box IoU >= threshold).
+        threshold (float): Jaccard (near) or IoU (overlap) threshold; defaults to 0.8 and 0.7.
+        dry_run (bool): If True, only compute the statistics and leave the file unchanged.
 
     Returns:
         dict: Deduplication statistics and results.
@@ -164,29 +447,31 @@ def process_merged_json_file(json_file_path: Path, output_path: Path = None) ->
             logger.warning(f"No chunks found in {json_file_path}")
             return {"error": "No chunks found"}
 
-        # Analyze uniqueness
-        uniqueness_analysis = analyze_chunk_uniqueness(chunks)
+        # Analyze uniqueness and deduplicate from the same duplicate search
+        deduplicated_chunks, uniqueness_analysis = deduplicate_and_analyze(chunks, mode, threshold)
         logger.info(
             f"Found {uniqueness_analysis['duplicate_chunks']}"
             f" duplicates ({uniqueness_analysis['duplication_rate']}% duplication rate)"
         )
 
+        if dry_run:
+            return {
+                "success": True,
+                "input_file": str(json_file_path),
+                "output_file": str(json_file_path),
+                "deduplication_stats": uniqueness_analysis,
+                "message": "Dry run - no changes made",
+            }
+
         # Deduplicate if needed
         if uniqueness_analysis["duplicate_chunks"] > 0:
             logger.info(f"Deduplicating chunks: {uniqueness_analysis['duplicate_chunks']} duplicates found")
-            deduplicated_chunks = deduplicate_chunks(chunks)
 
             # Update the data structure
             data["data"]["chunks"] = deduplicated_chunks
 
             # Add deduplication metadata
-            data["deduplication_info"] = {
-                "original_chunks": uniqueness_analysis["total_chunks"],
-                "unique_chunks": uniqueness_analysis["unique_chunks"],
-                "duplicates_removed": uniqueness_analysis["duplicate_chunks"],
-                "duplication_rate": uniqueness_analysis["duplication_rate"],
-                "duplicate_groups": uniqueness_analysis["duplicate_groups"],
-            }
+            data["deduplication_info"] = make_deduplication_info(uniqueness_analysis)
 
             # Save the deduplicated file
             with open(output_path, "w", encoding="utf-8") as f:
@@ -9,9 +9,21 @@
 import argparse
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from termcolor import cprint
 
+try:
+    from .deduplicate_chunks import (
+        deduplicate_and_analyze,
+        make_deduplication_info,
+    )
+except ImportError:
+    from deduplicate_chunks import (
+        deduplicate_and_analyze,
+        make_deduplication_info,
+    )
+
 
 def detect_page_mode(json_files):
     """
@@ -33,10 +45,12 @@ def detect_page_mode(json_files):
     return "single"
 
 
-def adjust_and_merge_json(json_files, output_file, filter_types=None):
-    if filter_types is None:
-        filter_types = []
-    merged = {"data": {"chunks": []}}
+def _iter_merged_chunks(json_files, filter_types):
+    """
+    Yield the chunks of the page files with page numbers adjusted to the whole paper.
+
+    Only one page file is held in memory at a time.
+    """
     page_offset = 0  # global offset for merged pages
 
     # Detect whether we're dealing with single-page or overlapping 2-page PDFs
@@ -71,7 +85,7 @@ def adjust_and_merge_json(json_files, output_file, filter_types=None):
                     for g in chunk["grounding"]:
                         # Adjust page number by offset (each file adds 1 page)
                         g["page"] = g["page"] + page_offset
-                merged["data"]["chunks"].append(chunk)
+                yield chunk
             # Each file represents 1 page
             page_offset += 1
         else:
@@ -88,7 +102,7 @@ def adjust_and_merge_json(json_files, output_file, filter_types=None):
                             g["page"] = new_page
                             if max_new_page_this_file is None or new_page > max_new_page_this_file:
                                 max_new_page_this_file = new_page
-                    merged["data"]["chunks"].append(chunk)
+                    yield chunk
                 if max_new_page_this_file is not None:
                     page_offset = max_new_page_this_file + 1
             else:
@@ -111,47 +125,252 @@ def adjust_and_merge_json(json_files, output_file, filter_types=None):
                             if max_new_page_this_file is None or new_page > max_new_page_this_file:
                                 max_new_page_this_file = new_page
                         chunk["grounding"] = new_grounding
-                    merged["data"]["chunks"].append(chunk)
+                    yield chunk
                 # Update offset based on the number of pages in the current file.
                 page_offset += file_max_page - file_min_page
 
-    with open(output_file, "w", encoding="utf-8") as out:
-        json.dump(merged, out, indent=2)
+
+def _write_merged_chunks(out, chunks, compact=False, extra=None):
+    """
+    Stream chunks into a merged JSON document ({"data": {"chunks": [...]}, **extra}).
+
+    The default output is identical to ``json.dump(merged, out, indent=2)``; with
+    ``compact`` the document is written without whitespace.
+
+    Returns:
+        dict: ``chunks`` (number of chunks written) and ``pages`` (highest grounding page + 1, 0 if none)
+    """
+    if compact:
+        header, list_end, empty_list_end, data_end = '{"data":{"chunks":[', "]", "]", "}"
+    else:
+        # json.dump(indent=2) layout: chunks sit at depth 3, an empty list stays on one line
+        header, list_end, empty_list_end, data_end = '{\n  "data": {\n    "chunks": [', "\n    ]", "]", "\n  }"
+
+    total_chunks = 0
+    max_page = None
+    out.write(header)
+    for chunk in chunks:
+        if compact:
+            text = json.dumps(chunk, separators=(",", ":"))
+        else:
+            text = "\n      " + json.dumps(chunk, indent=2).replace("\n", "\n      ")
+        out.write(text if total_chunks == 0 else "," + text)
+        total_chunks += 1
+        for g in chunk.get("grounding", []):
+            if max_page is None or g["page"] > max_page:
+                max_page = g["page"]
+    out.write((list_end if total_chunks else empty_list_end) + data_end)
+
+    for key, value in (extra or {}).items():
+        if compact:
+            out.write("," + json.dumps(key) + ":" + json.dumps(value, separators=(",", ":")))
+        else:
+            out.write(",\n  " + json.dumps(key) + ": " + json.dumps(value, indent=2).replace("\n", "\n  "))
+    out.write("}" if compact else "\n}")
+
+    return {"chunks": total_chunks, "pages": max_page + 1 if max_page is not None else 0}
+
+
+def _write_merged_file(output_file, chunks, compact=False, extra=None):
+    """Write a merged JSON document through a temporary file that replaces ``output_file`` once complete."""
+    tmp_file = output_file + ".tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as out:
+            stats = _write_merged_chunks(out, chunks, compact=compact, extra=extra)
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    return stats
+
+
+def _find_page_json_files(pages_dir):
+    """Return the sorted page JSON files ("main_*.json") of a paper."""
+    if not os.path.isdir(pages_dir):
+        return []
+    return sorted(os.path.join(pages_dir, f) for f in os.listdir(pages_dir) if f.startswith("main_") and f.endswith(".json"))
+
+
+def adjust_and_merge_json(json_files, output_file, filter_types=None, compact=False):
+    """
+    Merge the page JSON files of a paper into one file, adjusting grounding page numbers.
+
+    Chunks are streamed to a temporary file next to ``output_file``, which replaces it
+    once complete, so peak memory scales with one page file rather than the whole paper.
+
+    Args:
+        json_files: Sorted page JSON files (main_p01.pdf.json, ... or main_p01-02.pdf.json, ...)
+        output_file: Path of the merged JSON file
+        filter_types: Chunk types to leave out (e.g. marginalia)
+        compact: Write JSON without indentation
+
+    Returns:
+        dict: ``chunks`` and ``pages`` of the merged file
+    """
+    if filter_types is None:
+        filter_types = []
+    return _write_merged_file(output_file, _iter_merged_chunks(json_files, filter_types), compact=compact)
 
 
-def process_all_papers(base_papers_dir, filter_types):
+def process_all_papers(base_papers_dir, filter_types, compact=False):
     # Process each paper folder in alphanumeric sorted order
     paper_folders = sorted(
         [folder for folder in os.listdir(base_papers_dir) if os.path.isdir(os.path.join(base_papers_dir, folder))]
     )
 
     for paper_folder in paper_folders:
-        paper_path = os.path.join(base_papers_dir, paper_folder)
-        pages_dir = os.path.join(paper_path, "pages")
-
-        if os.path.isdir(pages_dir):
-            # Find all JSON files starting with "main_" in the pages subfolder.
-            json_files = [
-                os.path.join(pages_dir, f) for f in os.listdir(pages_dir) if f.startswith("main_") and f.endswith(".json")
-            ]
-            json_files.sort()
-            if json_files:
-                output_file = os.path.join(pages_dir, "merged_v2.json")
-                page_mode = detect_page_mode(json_files)
-                mode_desc = "single-page" if page_mode == "single" else "overlapping 2-page"
-                adjust_and_merge_json(json_files, output_file, filter_types)
-                cprint(f"Paper {paper_folder}: Merged {len(json_files)} files ({mode_desc} mode) into {output_file}", "green")
-
-                # Load the merged file to compute total pages and total chunks.
-                with open(output_file, "r", encoding="utf-8") as f:
-                    merged_data = json.load(f)
-                chunks = merged_data["data"]["chunks"]
-                total_chunks = len(chunks)
-
-                # Compute unique pages from all grounding entries.
-                pages = {g["page"] for chunk in chunks if "grounding" in chunk for g in chunk["grounding"]}
-                total_pages = max(pages) + 1 if pages else 0
-                print(f"Paper {paper_folder}: Total pages: {total_pages}, Total chunks: {total_chunks}")
+        pages_dir = os.path.join(base_papers_dir, paper_folder, "pages")
+
+        # Find all JSON files starting with "main_" in the pages subfolder.
+        json_files = _find_page_json_files(pages_dir)
+        if json_files:
+            output_file = os.path.join(pages_dir, "merged_v2.json")
+            page_mode = detect_page_mode(json_files)
+            mode_desc = "single-page" if page_mode == "single" else "overlapping 2-page"
+            # Page and chunk counts are collected while merging
+            stats = adjust_and_merge_json(json_files, output_file, filter_types, compact=compact)
+            cprint(f"Paper {paper_folder}: Merged {len(json_files)} files ({mode_desc} mode) into {output_file}", "green")
+            print(f"Paper {paper_folder}: Total pages: {stats['pages']}, Total chunks: {stats['chunks']}")
+
+
+def merge_and_deduplicate_paper(
+    base_papers_dir, paper_folder, filter_types=None, compact=False, dedup_mode="exact", threshold=None
+):
+    """
+    Merge the page JSON files of a paper and deduplicate its chunks in a single pass.
+
+    Writes the same merged_v2.json as ``adjust_and_merge_json`` followed by
+    ``process_merged_json_file`` (with ``deduplication_info`` when duplicates were
+    removed), but the page files are parsed once and the result is written once.
+    ``dedup_mode`` and ``threshold`` select the duplicate detection (see
+    ``deduplicate_chunks``). Papers split into overlapping 2-page windows are
+    deduplicated in "overlap" mode instead of "exact", so the chunks of each shared
+    page are recognised by their grounding boxes and not only by identical text.
+
+    Returns:
+        dict: ``paper``, ``status`` ("ok", "no_pages" or "error"), number of page ``files``,
+        ``chunks`` before deduplication, ``duplicates_removed``, ``pages`` and ``error``
+    """
+    result = {
+        "paper": paper_folder,
+        "status": "ok",
+        "files": 0,
+        "chunks": 0,
+        "duplicates_removed": 0,
+        "pages": 0,
+        "error": None,
+    }
+    pages_dir = os.path.join(base_papers_dir, paper_folder, "pages")
+    json_files = _find_page_json_files(pages_dir)
+    result["files"] = len(json_files)
+    if not json_files:
+        result["status"] = "no_pages"
+        return result
+
+    try:
+        if dedup_mode == "exact" and detect_page_mode(json_files) == "overlap":
+            dedup_mode = "overlap"
+        chunks = list(_iter_merged_chunks(json_files, filter_types or []))
+        result["chunks"] = len(chunks)
+        result["pages"] = max((g["page"] for chunk in chunks for g in chunk.get("grounding", [])), default=-1) + 1
+
+        extra = None
+        deduplicated, analysis = deduplicate_and_analyze(chunks, dedup_mode, threshold)
+        if analysis["duplicate_chunks"] > 0:
+            chunks = deduplicated
+            extra = {"deduplication_info": make_deduplication_info(analysis)}
+            result["duplicates_removed"] = analysis["duplicate_chunks"]
+
+        _write_merged_file(os.path.join(pages_dir, "merged_v2.json"), chunks, compact=compact, extra=extra)
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _report_merge_result(result):
+    paper = result["paper"]
+    if result["status"] == "ok":
+        cprint(
+            f"Paper {paper}: Merged {result['files']} files, {result['pages']} pages, {result['chunks']} chunks"
+            f" ({result['duplicates_removed']} duplicates removed)",
+            "green",
+        )
+    elif result["status"] == "error":
+        cprint(f"Paper {paper}: Error while merging: {result['error']}", "red")
+
+
+def merge_and_deduplicate_papers(
+    base_papers_dir,
+    paper_folders=None,
+    filter_types=None,
+    compact=False,
+    workers=1,
+    dedup_mode="exact",
+    threshold=None,
+):
+    """
+    Run the fused merge and deduplication stage for several papers.
+
+    Args:
+        base_papers_dir: Directory containing paper subfolders
+        paper_folders: Paper folders to process (defaults to all subfolders)
+        filter_types: Chunk types to leave out (e.g. marginalia)
+        compact: Write merged_v2.json without indentation
+        workers: Number of worker processes handling papers in parallel (1 = serial)
+        dedup_mode: "exact", "near" or "overlap" duplicate detection
+        threshold: Jaccard (near) or box IoU (overlap) threshold; None for the mode's default
+
+    Returns:
+        dict: Counts of ``papers``, ``merged`` and ``failed`` papers, total ``chunks`` and
+        ``duplicates_removed``, ``errors`` per paper and the per-paper ``results``
+    """
+    if paper_folders is None:
+        paper_folders = sorted(f for f in os.listdir(base_papers_dir) if os.path.isdir(os.path.join(base_papers_dir, f)))
+
+    results = []
+    workers = max(1, min(workers, len(paper_folders)))
+    if workers == 1:
+        for paper_folder in paper_folders:
+            result = merge_and_deduplicate_paper(base_papers_dir, paper_folder, filter_types, compact, dedup_mode, threshold)
+            _report_merge_result(result)
+            results.append(result)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    merge_and_deduplicate_paper, base_papers_dir, paper_folder, filter_types, compact, dedup_mode, threshold
+                ): paper_folder
+                for paper_folder in paper_folders
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself failed (e.g. it was killed)
+                    result = {
+                        "paper": futures[future],
+                        "status": "error",
+                        "files": 0,
+                        "chunks": 0,
+                        "duplicates_removed": 0,
+                        "pages": 0,
+                        "error": str(e),
+                    }
+                _report_merge_result(result)
+                results.append(result)
+        results.sort(key=lambda r: r["paper"])
+
+    return {
+        "papers": len(results),
+        "merged": sum(r["status"] == "ok" for r in results),
+        "failed": sum(r["status"] == "error" for r in results),
+        "chunks": sum(r["chunks"] for r in results),
+        "duplicates_removed": sum(r["duplicates_removed"] for r in results),
+        "errors": {r["paper"]: r["error"] for r in results if r["status"] == "error"},
+        "results": results,
+    }
 
 
 def main():
@@ -168,13 +387,18 @@ def main():
         default=[],
         help="List of keywords for filtering out chunks based on 'chunk_type' (e.g., marginalia).",
     )
+    parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="Write merged_v2.json without indentation (smaller and faster to write and load)",
+    )
     args = parser.parse_args()
 
     papers_dir = os.path.join(args.basepath, "papers")
     if not os.path.isdir(papers_dir):
         print(f"Error: papers folder not found in {args.basepath}")
         return
-    process_all_papers(papers_dir, args.filter_chunk_type)
+    process_all_papers(papers_dir, args.filter_chunk_type, compact=args.compact_json)
 
 
 if __name__ == "__main__":
@@ -24,14 +24,16 @@ from dotenv import load_dotenv
 try:
     # Try relative imports first (when used as module)
     from .batch_deduplicate import batch_deduplicate
-    from .merger import process_all_papers
+    from .merger import merge_and_deduplicate_papers, process_all_papers
     from .split_pdf import split_pdfs
+    from .va_event_log import print_stats
     from .va_process_papers import process_papers
 except ImportError:
     # Fall back to direct imports (when run as script)
     from batch_deduplicate import batch_deduplicate
-    from merger import process_all_papers
+    from merger import merge_and_deduplicate_papers, process_all_papers
     from split_pdf import split_pdfs
+    from va_event_log import print_stats
     from va_process_papers import process_papers
 
 
@@ -131,6 +133,15 @@ def run_full_pipeline(
     skip_deduplicate=False,
     filter_types=None,
     pages_per_split=1,
+    in_memory_split=False,
+    split_backend="pypdf2",
+    workers=1,
+    upload_concurrency=1,
+    retry_failed=False,
+    page_dedup="bytes",
+    compact_json=False,
+    dedup_mode="exact",
+    dedup_threshold=None,
 ):
     """
     Run the complete PDF processing pipeline.
@@ -146,6 +157,15 @@ def run_full_pipeline(
         skip_deduplicate: Skip deduplication step
         filter_types: List of chunk types to filter out during merging
         pages_per_split: Number of pages per split (1 for single-page, 2 for overlapping 2-page)
+        in_memory_split: Split PDFs in memory during the API step instead of writing split PDFs to disk
+        split_backend: PDF library used for splitting ("pypdf2" or "pymupdf")
+        workers: Number of worker processes used to split, merge and deduplicate papers in parallel
+        upload_concurrency: Maximum number of concurrent uploads to the Vision API (1 = serial)
+        retry_failed: Only retry the pages the job manifest records as failed or interrupted in the API step
+        page_dedup: Reuse stored responses of identical pages in the API step ("bytes", "pixels" or "off")
+        compact_json: Write merged_v2.json without indentation
+        dedup_mode: Duplicate detection in the deduplication step ("exact", "near" or "overlap")
+        dedup_threshold: Jaccard (near) or box IoU (overlap) threshold; None for the mode's default
     """
     print("=" * 60)
     print("MetaBeeAI PDF Processing Pipeline")
@@ -156,13 +176,21 @@ def run_full_pipeline(
     print()
 
     # Step 1: Split PDFs
-    if not skip_split:
+    if in_memory_split and not skip_api:
+        print("STEP 1/4: Splitting PDFs in memory during API processing (--in-memory-split)")
+        print()
+    elif not skip_split:
         mode_desc = "single-page" if pages_per_split == 1 else "overlapping 2-page"
         print(f"STEP 1/4: Splitting PDFs into {mode_desc} segments")
         print("-" * 60)
         try:
-            split_pdfs(papers_dir, pages_per_split=pages_per_split)
-            print("✓ PDF splitting completed\n")
+            split_summary = split_pdfs(papers_dir, pages_per_split=pages_per_split, backend=split_backend, workers=workers)
+            print("✓ PDF splitting completed")
+            if split_summary:
+                print(f"  - Split: {split_summary['processed']} papers into {split_summary['splits']} PDFs")
+                if split_summary["failed"]:
+                    print(f"  - Failed: {split_summary['failed']} papers ({', '.join(split_summary['errors'])})")
+            print()
         except Exception as e:
             print(f"✗ Error during PDF splitting: {e}")
             return False
@@ -176,7 +204,16 @@ def run_full_pipeline(
         print("-" * 60)
         print("This step may take a while depending on the number of papers...")
         try:
-            process_papers(papers_dir, start_folder=start_folder)
+            process_papers(
+                papers_dir,
+                start_folder=start_folder,
+                in_memory_split=in_memory_split,
+                pages_per_split=pages_per_split,
+                split_backend=split_backend,
+                concurrency=upload_concurrency,
+                retry_failed=retry_failed,
+                page_dedup=page_dedup,
+            )
             print("✓ API processing completed\n")
         except Exception as e:
             print(f"✗ Error during API processing: {e}")
@@ -185,12 +222,36 @@ def run_full_pipeline(
         print("STEP 2/4: Skipping API processing (--skip-api)")
         print()
 
+    # Steps 3 and 4: Merge and deduplicate each paper in one pass
+    if not skip_merge and not skip_deduplicate:
+        print("STEP 3-4/4: Merging JSON files into merged_v2.json and deduplicating chunks")
+        print("-" * 60)
+        try:
+            merge_summary = merge_and_deduplicate_papers(
+                papers_dir,
+                paper_folders,
+                filter_types or [],
+                compact=compact_json,
+                workers=workers,
+                dedup_mode=dedup_mode,
+                threshold=dedup_threshold,
+            )
+            print("✓ JSON merging and deduplication completed")
+            print(f"  - Merged: {merge_summary['merged']} papers ({merge_summary['chunks']} chunks)")
+            print(f"  - Duplicates removed: {merge_summary['duplicates_removed']}")
+            if merge_summary["failed"]:
+                print(f"  - Failed: {merge_summary['failed']} papers ({', '.join(merge_summary['errors'])})")
+            print()
+        except Exception as e:
+            print(f"✗ Error during JSON merging and deduplication: {e}")
+            return False
+
     # Step 3: Merge JSON files
-    if not skip_merge:
+    elif not skip_merge:
         print("STEP 3/4: Merging JSON files into merged_v2.json")
         print("-" * 60)
         try:
-            process_all_papers(papers_dir, filter_types or [])
+            process_all_papers(papers_dir, filter_types or [], compact=compact_json)
             print("✓ JSON merging completed\n")
         except Exception as e:
             print(f"✗ Error during JSON merging: {e}")
@@ -199,13 +260,23 @@ def run_full_pipeline(
         print("STEP 3/4: Skipping JSON merging (--skip-merge)")
         print()
 
-    # Step 4: Deduplicate chunks
-    if not skip_deduplicate:
+    # Step 4: Deduplicate chunks (already done together with merging unless merging was skipped)
+    if skip_deduplicate:
+        print("STEP 4/4: Skipping deduplication (--skip-deduplicate)")
+        print()
+    elif skip_merge:
         print("STEP 4/4: Deduplicating chunks in merged files")
         print("-" * 60)
         try:
             # Process only the folders in our range
-            summary = batch_deduplicate(base_dir=Path(papers_dir), dry_run=False, folder_list=paper_folders)
+            summary = batch_deduplicate(
+                base_dir=Path(papers_dir),
+                dry_run=False,
+                folder_list=paper_folders,
+                mode=dedup_mode,
+                threshold=dedup_threshold,
+                workers=workers,
+            )
             print("✓ Deduplication completed")
             print(f"  - Processed: {summary.get('processed_papers', 0)} papers")
             print(f"  - Duplicates removed: {summary.get('total_duplicates_removed', 0)}")
@@ -213,9 +284,6 @@ def run_full_pipeline(
         except Exception as e:
             print(f"✗ Error during deduplication: {e}")
             return False
-    else:
-        print("STEP 4/4: Skipping deduplication (--skip-deduplicate)")
-        print()
 
     # Final summary
     print("=" * 60)
@@ -265,6 +333,30 @@ Examples:
 
   # Split PDFs into overlapping 2-page documents
   python process_all.py --pages 2
+
+  # Split PDFs in memory and upload the page buffers without writing split PDFs
+  python process_all.py --in-memory-split --split-backend pymupdf
+
+  # Split, merge and deduplicate papers in 8 parallel worker processes
+  python process_all.py --workers 8
+
+  # Upload up to 8 pages to the Vision API at a time
+  python process_all.py --upload-concurrency 8
+
+  # Retry only the pages whose upload failed in a previous run, then merge and deduplicate
+  python process_all.py --skip-split --retry-failed
+
+  # Reuse API responses of pages that render identically to already processed pages
+  python process_all.py --page-dedup pixels
+
+  # Write merged_v2.json without indentation
+  python process_all.py --merge-only --compact-json
+
+  # Also remove near-duplicate chunks (e.g. overlapping 2-page splits)
+  python process_all.py --merge-only --dedup-mode near --dedup-threshold 0.85
+
+  # Show throughput, p50/p95 latency and failure rate of the latest API run
+  python process_all.py --stats
         """,
     )
 
@@ -310,11 +402,87 @@ Examples:
         help="Number of pages per split: 1 for single-page (default), 2 for overlapping 2-page",
     )
 
+    parser.add_argument(
+        "--in-memory-split",
+        action="store_true",
+        help="Split PDFs in memory during API processing instead of writing split PDFs to pages/",
+    )
+
+    parser.add_argument(
+        "--split-backend",
+        type=str,
+        choices=["pypdf2", "pymupdf"],
+        default="pypdf2",
+        help="PDF library used for splitting (default: pypdf2)",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to split PDFs and to merge and deduplicate papers in parallel (default: 1)",
+    )
+
+    parser.add_argument(
+        "--upload-concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of concurrent Vision API uploads, with rate limiting and retries (default: 1, serial)",
+    )
+
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="In the API step, only retry pages recorded as failed or interrupted in the job manifest",
+    )
+
+    parser.add_argument(
+        "--page-dedup",
+        type=str,
+        choices=["off", "bytes", "pixels"],
+        default="bytes",
+        help="Reuse stored API responses of identical pages: bytes (identical split PDF, default), "
+        "pixels (identical rendered pages) or off",
+    )
+
+    parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="Write merged_v2.json without indentation (smaller and faster to write and load)",
+    )
+
+    parser.add_argument(
+        "--dedup-mode",
+        type=str,
+        choices=["exact", "near", "overlap"],
+        default="exact",
+        help="Duplicate detection in the deduplication step: exact (identical text, default; overlap for 2-page "
+        "splits), near (MinHash/LSH Jaccard similarity, catches copies differing by whitespace, hyphenation or a "
+        "sentence) or overlap (identical text or overlapping grounding boxes on the same page)",
+    )
+
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="Jaccard similarity threshold of --dedup-mode near (default: 0.8) or box IoU threshold of "
+        "--dedup-mode overlap (default: 0.7)",
+    )
+
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print throughput, latency and failure statistics of the latest Vision API run, then exit",
+    )
+
     args = parser.parse_args()
 
     # Get papers directory
     papers_dir = args.dir if args.dir else get_papers_dir()
 
+    if args.stats:
+        sys.exit(0 if print_stats(papers_dir) else 1)
+
     # If merge-only is specified, automatically skip split and API steps
     if args.merge_only:
         args.skip_split = True
@@ -398,6 +566,15 @@ Examples:
             skip_deduplicate=args.skip_deduplicate,
             filter_types=args.filter_chunk_type,
             pages_per_split=args.pages,
+            in_memory_split=args.in_memory_split,
+            split_backend=args.split_backend,
+            workers=args.workers,
+            upload_concurrency=args.upload_concurrency,
+            retry_failed=args.retry_failed,
+            page_dedup=args.page_dedup,
+            compact_json=args.compact_json,
+            dedup_mode=args.dedup_mode,
+            dedup_threshold=args.dedup_threshold,
         )
 
         if success:
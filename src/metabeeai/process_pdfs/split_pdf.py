@@ -1,11 +1,129 @@
 #!/usr/bin/env python3
 import argparse
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import PyPDF2
 
+# Libraries that can be used to split PDFs: PyPDF2 (pure Python) or PyMuPDF (faster, C-based)
+SPLIT_BACKENDS = ["pypdf2", "pymupdf"]
 
-def split_pdfs(papers_dir=None, pages_per_split=1):
+
+def split_filename(page_index, pages_per_split=1):
+    """
+    Name of the split starting at the 0-based ``page_index``.
+
+    Returns:
+        str: ``main_pNN.pdf`` for single pages or ``main_pNN-MM.pdf`` for overlapping 2-page splits.
+    """
+    if pages_per_split == 1:
+        return f"main_p{page_index+1:02d}.pdf"
+    return f"main_p{page_index+1:02d}-{page_index+2:02d}.pdf"
+
+
+def _split_ranges(total_pages, pages_per_split):
+    # Overlapping 2-page splits stop at the second-to-last page
+    return range(total_pages) if pages_per_split == 1 else range(total_pages - 1)
+
+
+def _iter_splits_pypdf2(pdf_path, pages_per_split):
+    pdf_reader = PyPDF2.PdfReader(pdf_path)
+    total_pages = len(pdf_reader.pages)
+    for i in _split_ranges(total_pages, pages_per_split):
+        pdf_writer = PyPDF2.PdfWriter()
+        for page_index in range(i, i + pages_per_split):
+            pdf_writer.add_page(pdf_reader.pages[page_index])
+        buffer = io.BytesIO()
+        pdf_writer.write(buffer)
+        yield split_filename(i, pages_per_split), buffer.getvalue()
+
+
+def _iter_splits_pymupdf(pdf_path, pages_per_split):
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as source:
+        for i in _split_ranges(source.page_count, pages_per_split):
+            with fitz.open() as split_doc:
+                split_doc.insert_pdf(source, from_page=i, to_page=i + pages_per_split - 1)
+                yield split_filename(i, pages_per_split), split_doc.tobytes(garbage=3, deflate=True, no_new_id=True)
+
+
+def iter_page_splits(pdf_path, pages_per_split=1, backend="pypdf2"):
+    """
+    Split a PDF in memory, yielding one PDF byte buffer per single page or overlapping 2-page segment.
+
+    The source PDF is parsed once and nothing is written to disk, so the splits can be
+    streamed straight to the upload stage (see va_process_papers.process_papers).
+
+    Args:
+        pdf_path: Path to the PDF to split
+        pages_per_split: 1 for single pages, 2 for overlapping 2-page segments
+        backend: "pypdf2" or "pymupdf"
+
+    Yields:
+        tuple: (filename, pdf_bytes) where filename follows the on-disk naming (main_p01.pdf, main_p01-02.pdf)
+    """
+    if pages_per_split not in [1, 2]:
+        raise ValueError(f"pages_per_split must be 1 or 2, got {pages_per_split}")
+    if backend == "pypdf2":
+        yield from _iter_splits_pypdf2(pdf_path, pages_per_split)
+    elif backend == "pymupdf":
+        yield from _iter_splits_pymupdf(pdf_path, pages_per_split)
+    else:
+        raise ValueError(f"Unknown split backend '{backend}', expected one of {SPLIT_BACKENDS}")
+
+
+def split_paper(papers_dir, subfolder, pages_per_split=1, backend="pypdf2"):
+    """
+    Split ``{subfolder}_main.pdf`` of one paper folder into ``pages/``.
+
+    Runs in a worker process when split_pdfs is called with ``workers > 1``, so it
+    returns a result instead of printing.
+
+    Returns:
+        dict: ``paper``, ``status`` ("ok", "missing" or "error"), ``splits`` written,
+        ``pages`` in the source PDF and ``error`` message (None on success).
+    """
+    result = {"paper": subfolder, "status": "ok", "splits": 0, "pages": 0, "error": None}
+
+    # Create pages directory if it doesn't exist
+    pages_dir = os.path.join(papers_dir, subfolder, "pages")
+    os.makedirs(pages_dir, exist_ok=True)
+
+    pdf_path = os.path.join(papers_dir, subfolder, f"{subfolder}_main.pdf")
+    if not os.path.exists(pdf_path):
+        result["status"] = "missing"
+        return result
+
+    try:
+        for filename, pdf_bytes in iter_page_splits(pdf_path, pages_per_split, backend):
+            with open(os.path.join(pages_dir, filename), "wb") as output_file:
+                output_file.write(pdf_bytes)
+            result["splits"] += 1
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+        return result
+
+    # Overlapping 2-page mode creates one split fewer than there are pages
+    result["pages"] = result["splits"] if pages_per_split == 1 else result["splits"] + 1
+    return result
+
+
+def _report_split_result(papers_dir, result, pages_per_split):
+    subfolder = result["paper"]
+    pdf_path = os.path.join(papers_dir, subfolder, f"{subfolder}_main.pdf")
+    if result["status"] == "missing":
+        print(f"PDF file not found at {pdf_path}, skipping...")
+    elif result["status"] == "error":
+        print(f"Error processing {pdf_path}: {result['error']}")
+    else:
+        kind = "single-page" if pages_per_split == 1 else "overlapping 2-page"
+        print(f"Successfully processed {subfolder}_main.pdf ({result['pages']} pages, created {result['splits']} {kind} PDFs)")
+
+
+def split_pdfs(papers_dir=None, pages_per_split=1, backend="pypdf2", workers=1):
     """
     Split PDFs in the specified directory into single-page or overlapping 2-page segments.
 
@@ -14,11 +132,21 @@ def split_pdfs(papers_dir=None, pages_per_split=1):
         pages_per_split: Number of pages per split (1 or 2). Default is 1.
                         1 = single-page documents
                         2 = overlapping 2-page documents
+        backend: PDF library used for splitting, "pypdf2" (default) or "pymupdf"
+        workers: Number of worker processes splitting papers in parallel (1 = serial)
+
+    Returns:
+        dict: Summary with counts of ``processed``, ``missing`` and ``failed`` papers, total
+        ``splits`` written, ``errors`` per paper and the per-paper ``results``;
+        None if the arguments or directory are invalid.
     """
     # Validate pages_per_split
     if pages_per_split not in [1, 2]:
         print(f"Error: pages_per_split must be 1 or 2, got {pages_per_split}")
         return
+    if backend not in SPLIT_BACKENDS:
+        print(f"Error: backend must be one of {SPLIT_BACKENDS}, got {backend}")
+        return
 
     # Import centralized configuration if papers_dir not provided
     if papers_dir is None:
@@ -35,71 +163,53 @@ def split_pdfs(papers_dir=None, pages_per_split=1):
         return
 
     # Get all subfolders in the specified directory
-    subfolders = [f for f in os.listdir(papers_dir) if os.path.isdir(os.path.join(papers_dir, f))]
+    subfolders = sorted(f for f in os.listdir(papers_dir) if os.path.isdir(os.path.join(papers_dir, f)))
 
     if not subfolders:
         print(f"No subfolders found in '{papers_dir}'")
         return
 
     mode = "single-page" if pages_per_split == 1 else "overlapping 2-page"
-    print(f"Found {len(subfolders)} subfolders to process in {mode} mode")
-
-    for subfolder in subfolders:
-        # Create pages directory if it doesn't exist
-        pages_dir = os.path.join(papers_dir, subfolder, "pages")
-        os.makedirs(pages_dir, exist_ok=True)
-
-        # Construct path to main PDF using subfolder name
-        pdf_path = os.path.join(papers_dir, subfolder, f"{subfolder}_main.pdf")
-
-        if not os.path.exists(pdf_path):
-            print(f"PDF file not found at {pdf_path}, skipping...")
-            continue
-
-        try:
-            # read the PDF
-            print(f"Processing {pdf_path}...")
-            pdf_reader = PyPDF2.PdfReader(pdf_path)
-            total_pages = len(pdf_reader.pages)
-
-            if pages_per_split == 1:
-                # Create single-page PDFs
-                splits_created = 0
-                for i in range(total_pages):
-                    pdf_writer = PyPDF2.PdfWriter()
-                    pdf_writer.add_page(pdf_reader.pages[i])
-
-                    output_path = os.path.join(pages_dir, f"main_p{i+1:02d}.pdf")
-                    with open(output_path, "wb") as output_file:
-                        pdf_writer.write(output_file)
-                    splits_created += 1
-
-                print(
-                    f"Successfully processed {subfolder}_main.pdf ({total_pages} pages, "
-                    f"created {splits_created} single-page PDFs)"
-                )
-
-            elif pages_per_split == 2:
-                # Create overlapping 2-page PDFs
-                splits_created = 0
-                for i in range(total_pages - 1):  # Stop at second-to-last page
-                    pdf_writer = PyPDF2.PdfWriter()
-                    # Add current page and next page
-                    pdf_writer.add_page(pdf_reader.pages[i])
-                    pdf_writer.add_page(pdf_reader.pages[i + 1])
-
-                    output_path = os.path.join(pages_dir, f"main_p{i+1:02d}-{i+2:02d}.pdf")
-                    with open(output_path, "wb") as output_file:
-                        pdf_writer.write(output_file)
-                    splits_created += 1
-
-                print(
-                    f"Successfully processed {subfolder}_main.pdf ({total_pages} pages, "
-                    f"created {splits_created} overlapping 2-page PDFs)"
-                )
-
-        except Exception as e:
-            print(f"Error processing {pdf_path}: {str(e)}")
+    workers = max(1, min(workers, len(subfolders)))
+    print(f"Found {len(subfolders)} subfolders to process in {mode} mode" + (f" with {workers} workers" if workers > 1 else ""))
+
+    results = []
+    if workers == 1:
+        for subfolder in subfolders:
+            print(f"Processing {os.path.join(papers_dir, subfolder, f'{subfolder}_main.pdf')}...")
+            result = split_paper(papers_dir, subfolder, pages_per_split, backend)
+            _report_split_result(papers_dir, result, pages_per_split)
+            results.append(result)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(split_paper, papers_dir, subfolder, pages_per_split, backend): subfolder
+                for subfolder in subfolders
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself failed (e.g. it was killed)
+                    result = {"paper": futures[future], "status": "error", "splits": 0, "pages": 0, "error": str(e)}
+                _report_split_result(papers_dir, result, pages_per_split)
+                results.append(result)
+        results.sort(key=lambda r: r["paper"])
+
+    summary = {
+        "papers": len(results),
+        "processed": sum(r["status"] == "ok" for r in results),
+        "missing": sum(r["status"] == "missing" for r in results),
+        "failed": sum(r["status"] == "error" for r in results),
+        "splits": sum(r["splits"] for r in results),
+        "errors": {r["paper"]: r["error"] for r in results if r["status"] == "error"},
+        "results": results,
+    }
+    print(
+        f"Split {summary['processed']} papers into {summary['splits']} PDFs"
+        f" ({summary['missing']} without a main PDF, {summary['failed']} failed)"
+    )
+    return summary
 
 
 if __name__ == "__main__":
@@ -115,6 +225,9 @@ Examples:
 
   # Split into overlapping 2-page documents
   %(prog)s /path/to/papers --pages 2
+
+  # Split papers in 8 parallel worker processes
+  %(prog)s /path/to/papers --workers 8
         """,
     )
     parser.add_argument("directory", type=str, help="Directory containing paper subfolders")
@@ -125,10 +238,23 @@ Examples:
         choices=[1, 2],
         help="Number of pages per split: 1 for single-page (default), 2 for overlapping 2-page",
     )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="pypdf2",
+        choices=SPLIT_BACKENDS,
+        help="PDF library used for splitting: pypdf2 (default) or pymupdf (faster)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes splitting papers in parallel (default: 1)",
+    )
 
     # Parse arguments
     args = parser.parse_args()
 
     # Run the main function
-    split_pdfs(args.directory, pages_per_split=args.pages)
+    split_pdfs(args.directory, pages_per_split=args.pages, backend=args.backend, workers=args.workers)
     print("Processing complete!")
@@ -0,0 +1,267 @@
+"""
+Concurrent uploader for the Vision Agentic Document Analysis API.
+
+``process_papers`` uploads split PDFs one at a time, so every page pays the full
+round-trip latency of the API. AsyncUploader keeps up to ``max_in_flight`` uploads
+running at once over a pooled HTTP/1.1 connection (one TLS handshake per
+connection instead of per page), limits the request rate per API host with a
+token bucket, and retries rate-limited, timed-out and failed requests with
+jittered exponential backoff (honouring ``Retry-After``).
+
+Blocking work never runs on the event loop thread: jobs are pulled from their
+iterator (which may split PDFs and write to the job manifest) and ``on_result`` is
+called on a single I/O thread, and responses are written with ``asyncio.to_thread``.
+
+Responses are written to the same ``main_pNN.pdf.json`` files as the serial path.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    from .va_job_manifest import atomic_write_text
+except ImportError:
+    from va_job_manifest import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+VA_API_URL = "https://api.va.landing.ai/v1/tools/agentic-document-analysis"
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_TIMEOUT = 300
+DEFAULT_UPLOAD_RETRY_CONFIG = {
+    "max_retries": 5,
+    "retry_delay": 2,
+    "exponential_backoff": True,
+    "max_delay": 60,
+    "jitter": True,
+}
+
+# An upload job: (page_file, pdf_bytes, json_path)
+UploadJob = Tuple[str, bytes, str]
+
+_NO_MORE_JOBS = object()
+
+
+class UploadError(Exception):
+    """
+    HTTP error response from the API.
+
+    ``status_code`` and ``response`` are exposed so that the retry policy can tell
+    retryable errors (429, 5xx) from fatal ones and honour ``Retry-After``.
+    """
+
+    def __init__(self, response: httpx.Response):
+        self.response = response
+        self.status_code = response.status_code
+        super().__init__(f"HTTP {response.status_code}: {response.text[:200]}")
+
+
+class AsyncUploader:
+    """
+    Upload PDFs to the API with bounded concurrency, per-host rate limiting and retries.
+
+    Use as an async context manager so that the connection pool is closed afterwards.
+
+    Args:
+        url: API endpoint
+        api_key: Landing AI API key (defaults to the LANDING_AI_API_KEY environment variable)
+        max_in_flight: Maximum number of uploads running at once (also the connection pool size)
+        requests_per_minute: Maximum request rate per API host (None disables rate limiting)
+        retry_config: RETRY_CONFIG-style dictionary for the retry policy
+        timeout: Timeout of a single request in seconds
+    """
+
+    def __init__(
+        self,
+        url: str = VA_API_URL,
+        api_key: Optional[str] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        requests_per_minute: Optional[float] = DEFAULT_REQUESTS_PER_MINUTE,
+        retry_config: Optional[Dict[str, Any]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        from metabeeai.metabeeai_llm.retry import RetryPolicy
+
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.url = url
+        self.api_key = api_key if api_key is not None else os.getenv("LANDING_AI_API_KEY")
+        self.max_in_flight = max_in_flight
+        self.requests_per_minute = requests_per_minute
+        self.timeout = timeout
+        self.retry_policy = RetryPolicy.from_config({**DEFAULT_UPLOAD_RETRY_CONFIG, **(retry_config or {})})
+        self._buckets = {}
+        self._client = None
+        self._slots = None
+        self._io_executor = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.max_in_flight, max_keepalive_connections=self.max_in_flight),
+            timeout=self.timeout,
+        )
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+        self._client = None
+
+    def _bucket_for(self, url: str):
+        """Return the token bucket of the host ``url`` points to (None without rate limiting)."""
+        if not self.requests_per_minute:
+            return None
+        from metabeeai.metabeeai_llm.rate_limiter import TokenBucket
+
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            # Capacity of one request: uploads are spread evenly instead of bursting
+            self._buckets[host] = TokenBucket(self.requests_per_minute, capacity=1)
+        return self._buckets[host]
+
+    async def _post(self, page_file: str, pdf_bytes: bytes) -> httpx.Response:
+        bucket = self._bucket_for(self.url)
+        if bucket is not None:
+            await bucket.acquire()
+        response = await self._client.post(
+            self.url,
+            files={"pdf": (page_file, pdf_bytes, "application/pdf")},
+            headers={"Authorization": f"Basic {self.api_key}"},
+        )
+        if response.status_code >= 400:
+            raise UploadError(response)
+        return response
+
+    async def upload(self, page_file: str, pdf_bytes: bytes, result: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Upload one PDF (retrying as configured) and return the response body.
+
+        Args:
+            page_file: File name sent with the upload
+            pdf_bytes: PDF content
+            result: Optional dict whose ``attempts`` entry is updated with the number of attempts made
+
+        Raises:
+            UploadError or httpx.HTTPError: If the upload failed with a fatal error or after all retries.
+        """
+
+        async def attempt():
+            if result is not None:
+                result["attempts"] = result.get("attempts", 0) + 1
+            try:
+                response = await self._post(page_file, pdf_bytes)
+            except UploadError as e:
+                if result is not None:
+                    result["status"] = e.status_code
+                raise
+            if result is not None:
+                result["status"] = response.status_code
+            return response.text
+
+        return await self.retry_policy.run(attempt, description=f"Upload of {page_file}")
+
+    async def _run_job(self, job: UploadJob, on_result: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, Any]:
+        page_file, pdf_bytes, json_path = job
+        start_time = time.time()
+        result = {
+            "page_file": page_file,
+            "json_path": json_path,
+            "bytes": len(pdf_bytes),
+            "success": False,
+            "status": None,
+            "error": None,
+            "error_class": None,
+            "attempts": 0,
+        }
+        try:
+            text = await self.upload(page_file, pdf_bytes, result)
+            await asyncio.to_thread(atomic_write_text, json_path, text)
+            result["success"] = True
+        except Exception as e:
+            result["error"] = str(e)
+            result["error_class"] = type(e).__name__
+        finally:
+            self._slots.release()
+        result["processing_time"] = time.time() - start_time
+        if on_result is not None:
+            try:
+                await asyncio.get_running_loop().run_in_executor(self._io_executor, on_result, result)
+            except Exception as e:
+                logger.exception(f"Recording the result of {page_file} failed")
+                result.update(success=False, error=f"Recording the result failed: {e}", error_class=type(e).__name__)
+        return result
+
+    async def upload_all(
+        self, jobs: Iterable[UploadJob], on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload every job and write each response to its ``json_path``.
+
+        Jobs are pulled from ``jobs`` only when an in-flight slot is free, so a lazy
+        iterator (e.g. in-memory splits) never holds more than ``max_in_flight`` PDFs.
+
+        Args:
+            jobs: Iterable of (page_file, pdf_bytes, json_path)
+            on_result: Called with each result dict as soon as its upload finishes. If it raises,
+                the error is logged and the result is marked as failed
+
+        Returns:
+            list: One dict per job with ``page_file``, ``json_path``, ``bytes``, ``success``, ``status``
+            (last HTTP status), ``error``, ``error_class``, ``processing_time`` and ``attempts``, in completion order.
+        """
+        loop = asyncio.get_running_loop()
+        results = []
+        tasks = set()
+        iterator = iter(jobs)
+        # One thread for the job iterator and on_result keeps the caller's bookkeeping single-threaded
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="va-upload-io")
+        try:
+            while True:
+                await self._slots.acquire()
+                job = await loop.run_in_executor(self._io_executor, next, iterator, _NO_MORE_JOBS)
+                if job is _NO_MORE_JOBS:
+                    self._slots.release()
+                    break
+                task = asyncio.create_task(self._run_job(job, on_result))
+                tasks.add(task)
+                task.add_done_callback(lambda task: results.append(task.result()))
+                task.add_done_callback(tasks.discard)
+            while tasks:
+                await asyncio.gather(*list(tasks))
+        finally:
+            self._io_executor.shutdown(wait=True)
+            self._io_executor = None
+        return results
+
+
+def upload_pages(
+    jobs: Iterable[UploadJob],
+    url: str = VA_API_URL,
+    api_key: Optional[str] = None,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    requests_per_minute: Optional[float] = DEFAULT_REQUESTS_PER_MINUTE,
+    retry_config: Optional[Dict[str, Any]] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Synchronous wrapper running ``AsyncUploader.upload_all`` in a new event loop (see AsyncUploader)."""
+
+    async def _run():
+        async with AsyncUploader(
+            url=url,
+            api_key=api_key,
+            max_in_flight=max_in_flight,
+            requests_per_minute=requests_per_minute,
+            retry_config=retry_config,
+        ) as uploader:
+            return await uploader.upload_all(jobs, on_result=on_result)
+
+    return asyncio.run(_run())
@@ -0,0 +1,218 @@
+"""
+Structured, buffered event log for the Vision API stage.
+
+``process_papers`` records one JSON line per page event (upload, reuse, skip, error)
+in ``PAPERS_DIR/va_events_<timestamp>.jsonl``. Lines go through a logging
+MemoryHandler, so they are written to disk in batches instead of opening the file
+for every event. The buffer is flushed when it is full, when its oldest event is
+``flush_interval`` seconds old and right away for events with an error, so a killed
+run loses at most a few seconds of events. The same logger can echo each event's
+message to the console. Each line has the fields ``timestamp``, ``event``, ``paper``,
+``page``, ``duration_s``, ``bytes``, ``status`` (HTTP status), ``attempts``,
+``error_class`` and ``error`` (fields that do not apply are omitted).
+
+``summarize_events`` turns one or more logs into throughput, latency percentiles
+and failure rate; ``metabeeai process-pdfs --stats`` prints it for the latest run.
+"""
+
+import glob
+import json
+import logging
+import logging.handlers
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+EVENT_LOG_PREFIX = "va_events_"
+
+# Number of events buffered in memory before they are written out
+DEFAULT_BUFFER_CAPACITY = 500
+# Maximum time in seconds an event stays in the buffer (checked when the next event is recorded)
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Format a log record carrying an ``event_fields`` dict as one JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {"timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")}
+        fields.update(getattr(record, "event_fields", {"event": "message", "message": record.getMessage()}))
+        return json.dumps(fields, ensure_ascii=False)
+
+
+class TimedMemoryHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler that also flushes when ``flush_interval`` seconds have passed since its last flush."""
+
+    def __init__(self, capacity: int, flush_interval: float, flushLevel: int, target: logging.Handler):
+        super().__init__(capacity, flushLevel=flushLevel, target=target)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def shouldFlush(self, record: logging.LogRecord) -> bool:
+        return super().shouldFlush(record) or time.monotonic() - self._last_flush >= self.flush_interval
+
+    def flush(self):
+        super().flush()
+        self._last_flush = time.monotonic()
+
+
+class EventLog:
+    """
+    JSONL event log written through a buffered logging handler.
+
+    Events with an ``error`` field are logged at ERROR level and flushed right away.
+
+    Args:
+        path: JSONL file to append to
+        capacity: Number of events buffered before they are flushed to disk
+        flush_interval: Seconds after which buffered events are flushed
+        console: Also print each event's message to stdout
+    """
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int = DEFAULT_BUFFER_CAPACITY,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        console: bool = False,
+    ):
+        self.path = path
+        self._file_handler = logging.FileHandler(path, mode="a", encoding="utf-8", delay=True)
+        self._file_handler.setFormatter(JsonLineFormatter())
+        self._handler = TimedMemoryHandler(capacity, flush_interval, flushLevel=logging.ERROR, target=self._file_handler)
+        self._logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(self._handler)
+        self._console_handler = None
+        if console:
+            self._console_handler = logging.StreamHandler(sys.stdout)
+            self._console_handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(self._console_handler)
+
+    def event(self, event: str, **fields):
+        """Record one event; fields whose value is None are left out."""
+        payload = {"event": event}
+        payload.update({key: value for key, value in fields.items() if value is not None})
+        level = logging.ERROR if "error" in payload else logging.INFO
+        self._logger.log(level, payload.get("message", event), extra={"event_fields": payload})
+
+    def flush(self):
+        self._handler.flush()
+
+    def close(self):
+        """Flush the buffered events and release the file."""
+        for handler in (self._handler, self._console_handler):
+            if handler is not None:
+                self._logger.removeHandler(handler)
+                handler.close()
+        self._file_handler.close()
+
+
+def new_event_log_path(papers_dir: str, timestamp: Optional[str] = None) -> str:
+    """Get the path of the event log of a new run in ``papers_dir``."""
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(papers_dir, f"{EVENT_LOG_PREFIX}{timestamp}.jsonl")
+
+
+def find_event_logs(papers_dir: str) -> List[str]:
+    """Return the event logs in ``papers_dir``, oldest first."""
+    return sorted(glob.glob(os.path.join(papers_dir, f"{EVENT_LOG_PREFIX}*.jsonl")))
+
+
+def load_events(paths: Iterable[str]) -> List[Dict[str, Any]]:
+    """Read the events of one or more logs, skipping lines that are not valid JSON."""
+    events = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+    return events
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of ``values`` (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_events(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summarise page events.
+
+    Returns:
+        dict: Counts of ``uploads``, ``failed``, ``reused`` and ``skipped`` pages, ``failure_rate``
+        (failed / uploads), uploaded ``bytes``, ``latency_p50_s`` / ``latency_p95_s`` /
+        ``latency_mean_s`` of uploads, ``elapsed_s`` between the first and last event,
+        ``pages_per_minute`` (uploaded and reused pages) and ``errors`` by error class.
+    """
+    uploads = [e for e in events if e.get("event") == "upload"]
+    failed = [e for e in uploads if not e.get("success")]
+    reused = sum(e.get("event") == "reused" for e in events)
+    skipped = sum(e.get("event") == "skipped" for e in events)
+    latencies = [e["duration_s"] for e in uploads if "duration_s" in e]
+
+    timestamps = [datetime.fromisoformat(e["timestamp"]) for e in events if "timestamp" in e]
+    elapsed = (max(timestamps) - min(timestamps)).total_seconds() if timestamps else 0.0
+    processed = len(uploads) - len(failed) + reused
+
+    errors = {}
+    for e in failed:
+        error_class = e.get("error_class", "Unknown")
+        errors[error_class] = errors.get(error_class, 0) + 1
+
+    return {
+        "uploads": len(uploads),
+        "failed": len(failed),
+        "reused": reused,
+        "skipped": skipped,
+        "failure_rate": len(failed) / len(uploads) if uploads else 0.0,
+        "bytes": sum(e.get("bytes", 0) for e in uploads),
+        "latency_p50_s": _percentile(latencies, 50),
+        "latency_p95_s": _percentile(latencies, 95),
+        "latency_mean_s": sum(latencies) / len(latencies) if latencies else 0.0,
+        "elapsed_s": elapsed,
+        "pages_per_minute": processed / elapsed * 60 if elapsed > 0 else 0.0,
+        "errors": errors,
+    }
+
+
+def format_stats(summary: Dict[str, Any]) -> str:
+    """Format a ``summarize_events`` result as text."""
+    lines = [
+        f"Uploads:      {summary['uploads']} ({summary['failed']} failed, failure rate {summary['failure_rate']:.1%})",
+        f"Reused:       {summary['reused']} pages from the page store",
+        f"Skipped:      {summary['skipped']} pages already processed",
+        f"Uploaded:     {summary['bytes'] / 1e6:.1f} MB",
+        f"Latency:      p50 {summary['latency_p50_s']:.2f}s, p95 {summary['latency_p95_s']:.2f}s,"
+        f" mean {summary['latency_mean_s']:.2f}s",
+        f"Throughput:   {summary['pages_per_minute']:.1f} pages/min over {summary['elapsed_s']:.0f}s",
+    ]
+    if summary["errors"]:
+        lines.append("Errors:       " + ", ".join(f"{name} x{count}" for name, count in sorted(summary["errors"].items())))
+    return "\n".join(lines)
+
+
+def print_stats(papers_dir: str) -> bool:
+    """
+    Print the statistics of the latest run recorded in ``papers_dir``.
+
+    Returns:
+        bool: False if no event log was found.
+    """
+    paths = find_event_logs(papers_dir)
+    if not paths:
+        print(f"No Vision API event logs ({EVENT_LOG_PREFIX}*.jsonl) found in {papers_dir}")
+        return False
+    print(f"Vision API statistics from {os.path.basename(paths[-1])}:")
+    print(format_stats(summarize_events(load_events(paths[-1:]))))
+    return True
@@ -0,0 +1,193 @@
+"""
+Durable job manifest for the Vision API stage.
+
+Every page upload is tracked in a SQLite database (``va_jobs.sqlite`` in the papers
+directory) with its state, attempt count, content hash and last error:
+
+- ``pending``: known but not uploaded yet
+- ``in_flight``: upload started; left over after a crash and reset to pending on the next run
+- ``done``: response written to its JSON file
+- ``failed``: the last upload attempt failed (see ``error``)
+
+A page is only skipped when it is ``done``, its JSON file still exists and its PDF
+is unchanged (same content hash), so a truncated response from an interrupted run
+or a page whose PDF was replaced is re-processed instead of being skipped forever.
+Responses are written with ``atomic_write_text`` (temporary file, then rename), so
+a JSON file is either complete or absent.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_MANIFEST_FILENAME = "va_jobs.sqlite"
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+JOB_STATES = [PENDING, IN_FLIGHT, DONE, FAILED]
+
+
+def atomic_write_text(path: str, text: str):
+    """Write ``text`` to ``path`` through a temporary file in the same directory and an atomic rename."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def content_hash(data: bytes) -> str:
+    """Return the hex SHA-256 digest of a page PDF."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_complete_json(path: str) -> bool:
+    """Return True if ``path`` exists and holds a complete JSON document."""
+    try:
+        with open(path) as f:
+            json.load(f)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+class JobManifest:
+    """
+    SQLite-backed record of page upload jobs, keyed by (paper, page_file).
+
+    Args:
+        path: Path of the SQLite database file (created if missing)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " paper TEXT NOT NULL,"
+            " page_file TEXT NOT NULL,"
+            " json_path TEXT NOT NULL,"
+            " content_hash TEXT,"
+            " state TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " error TEXT,"
+            " updated REAL NOT NULL,"
+            " PRIMARY KEY (paper, page_file))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state)")
+        self._conn.commit()
+
+    def _upsert(self, paper: str, page_file: str, json_path: str, state: str, **fields):
+        columns = ["paper", "page_file", "json_path", "state", "updated"] + list(fields)
+        values = [paper, page_file, json_path, state, time.time()] + list(fields.values())
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns[2:])
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+                f" ON CONFLICT (paper, page_file) DO UPDATE SET {updates}",
+                values,
+            )
+            self._conn.commit()
+
+    def get(self, paper: str, page_file: str) -> Optional[Dict]:
+        """Return the job record of a page, or None if it is not in the manifest."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM jobs WHERE paper = ? AND page_file = ?", (paper, page_file))
+            row = cursor.fetchone()
+            return dict(zip([c[0] for c in cursor.description], row)) if row else None
+
+    def needs_upload(self, paper: str, page_file: str, json_path: str, page_hash: Optional[str] = None) -> bool:
+        """
+        Decide whether a page has to be (re-)uploaded.
+
+        A done page is uploaded again if its JSON file is missing or ``page_hash`` (the
+        content hash of the current page PDF) differs from the hash it was uploaded with;
+        the stale JSON file is then removed. A page with any other state is uploaded again.
+        A JSON file written before the manifest existed is adopted as done if it is a
+        complete JSON document; a truncated one is re-processed.
+        """
+        job = self.get(paper, page_file)
+        if job is not None:
+            if job["state"] != DONE:
+                return True
+            if page_hash is not None and job["content_hash"] is not None and job["content_hash"] != page_hash:
+                if os.path.exists(json_path):
+                    os.remove(json_path)
+                return True
+            return not os.path.exists(json_path)
+        if os.path.exists(json_path) and is_complete_json(json_path):
+            fields = {"content_hash": page_hash} if page_hash is not None else {}
+            self._upsert(paper, page_file, json_path, DONE, error=None, **fields)
+            return False
+        return True
+
+    def mark_in_flight(self, paper: str, page_file: str, json_path: str, page_hash: Optional[str] = None):
+        """Record that an upload attempt for the page is starting."""
+        self._upsert(paper, page_file, json_path, IN_FLIGHT, content_hash=page_hash)
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET attempts = attempts + 1 WHERE paper = ? AND page_file = ?", (paper, page_file))
+            self._conn.commit()
+
+    def mark_done(self, paper: str, page_file: str, json_path: str, page_hash: Optional[str] = None):
+        fields = {"content_hash": page_hash} if page_hash is not None else {}
+        self._upsert(paper, page_file, json_path, DONE, error=None, **fields)
+
+    def mark_failed(self, paper: str, page_file: str, json_path: str, error: str):
+        self._upsert(paper, page_file, json_path, FAILED, error=error)
+
+    def reset_in_flight(self) -> int:
+        """Return jobs left in flight by an interrupted run to pending. Returns the number of jobs reset."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ?, updated = ? WHERE state = ?", (PENDING, time.time(), IN_FLIGHT)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def jobs(self, states: Optional[List[str]] = None) -> List[Dict]:
+        """Return the job records (optionally only those in ``states``), ordered by paper and page file."""
+        query = "SELECT * FROM jobs"
+        params = []
+        if states:
+            query += f" WHERE state IN ({', '.join('?' * len(states))})"
+            params = list(states)
+        with self._lock:
+            cursor = self._conn.execute(query + " ORDER BY paper, page_file", params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {state: 0 for state in JOB_STATES}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_manifest_path(papers_dir: str) -> str:
+    """Get the default manifest path for a papers directory."""
+    return os.path.join(papers_dir, DEFAULT_MANIFEST_FILENAME)
@@ -0,0 +1,143 @@
+"""
+Content-addressed store of Vision API responses, used to skip re-uploading identical pages.
+
+The same PDF often appears under two paper IDs (preprint and published version) and
+supplementary pages repeat, but every upload costs about US$0.03 and several
+seconds. Each successful response is stored under a key derived from the page
+content; when an identical page comes up again its stored response is reused.
+
+Two kinds of keys are supported:
+
+- ``bytes``: SHA-256 of the split PDF bytes (exact, no extra work)
+- ``pixels``: SHA-256 of the pages rendered in grayscale at low resolution, which also
+  matches pages whose PDF structure differs (e.g. the same page cut from two files)
+
+Grounding page numbers in a response are relative to the split PDF (the merger adds
+the paper's page offsets), so a reused response only needs new chunk ids. These are
+derived deterministically from the new paper, page file and original id so that
+chunk ids stay unique across papers.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+DEFAULT_PAGE_STORE_FILENAME = "va_page_store.sqlite"
+PAGE_DEDUP_MODES = ["off", "bytes", "pixels"]
+
+# Price of one Vision API page, used to report the savings of reused responses
+VA_COST_PER_PAGE_USD = 0.03
+
+# Resolution used for pixel keys: enough to tell pages apart, cheap to render
+PIXEL_KEY_DPI = 72
+
+_CHUNK_ID_NAMESPACE = uuid.UUID("6f0c8f9e-4d0b-4b8e-9a57-6d2f1c3e8a11")
+
+
+def page_key(pdf_bytes: bytes, mode: str = "bytes") -> str:
+    """
+    Return the content key of a split PDF.
+
+    Args:
+        pdf_bytes: The split PDF
+        mode: "bytes" (hash of the PDF bytes) or "pixels" (hash of the rendered pages)
+    """
+    if mode == "bytes":
+        return "bytes:" + hashlib.sha256(pdf_bytes).hexdigest()
+    if mode == "pixels":
+        import fitz  # PyMuPDF
+
+        digest = hashlib.sha256()
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            for page in doc:
+                pixmap = page.get_pixmap(dpi=PIXEL_KEY_DPI, colorspace=fitz.csGRAY)
+                digest.update(f"{pixmap.width}x{pixmap.height};".encode())
+                digest.update(pixmap.samples)
+        return "pixels:" + digest.hexdigest()
+    raise ValueError(f"Unknown page dedup mode '{mode}', expected one of {PAGE_DEDUP_MODES}")
+
+
+def rewrite_response(response_text: str, paper: str, page_file: str) -> str:
+    """
+    Adapt a stored response to a new location by replacing every chunk id with a deterministic new one.
+
+    Ids are replaced throughout the response, so references to them (e.g. anchors in
+    the markdown) stay consistent.
+    """
+    data = json.loads(response_text)
+    chunks = data.get("data", {}).get("chunks", [])
+    mapping = {}
+    for chunk in chunks:
+        old_id = chunk.get("chunk_id")
+        if old_id:
+            mapping[old_id] = str(uuid.uuid5(_CHUNK_ID_NAMESPACE, f"{paper}/{page_file}/{old_id}"))
+    for old_id, new_id in mapping.items():
+        response_text = response_text.replace(old_id, new_id)
+    return response_text
+
+
+class PageStore:
+    """
+    SQLite-backed map from page content keys to Vision API responses.
+
+    Args:
+        path: Path of the SQLite database file (created if missing)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " paper TEXT,"
+            " page_file TEXT,"
+            " created REAL NOT NULL,"
+            " reuses INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored response and its origin (``response``, ``paper``, ``page_file``), or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT response, paper, page_file FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE pages SET reuses = reuses + 1 WHERE key = ?", (key,))
+            self._conn.commit()
+            self.hits += 1
+            return {"response": row[0], "paper": row[1], "page_file": row[2]}
+
+    def set(self, key: str, response_text: str, paper: str, page_file: str):
+        """Store the response of a page (the first response stored for a key is kept)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO pages (key, response, paper, page_file, created) VALUES (?, ?, ?, ?, ?)",
+                (key, response_text, paper, page_file, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_page_store_path() -> str:
+    """Get the default page store path inside the data directory's cache folder."""
+    from metabeeai.config import get_data_dir
+
+    return os.path.join(get_data_dir(), "cache", DEFAULT_PAGE_STORE_FILENAME)
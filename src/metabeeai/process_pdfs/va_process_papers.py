@@ -1,20 +1,205 @@
 import argparse
 import os
 import time
-from datetime import datetime
+from collections import defaultdict
 
 import requests
 from dotenv import load_dotenv
 
+try:
+    from .split_pdf import SPLIT_BACKENDS, iter_page_splits
+    from .va_async_uploader import DEFAULT_REQUESTS_PER_MINUTE, VA_API_URL, upload_pages
+    from .va_event_log import EventLog, new_event_log_path, print_stats
+    from .va_job_manifest import FAILED, PENDING, JobManifest, atomic_write_text, content_hash, get_manifest_path
+    from .va_page_store import (
+        PAGE_DEDUP_MODES,
+        VA_COST_PER_PAGE_USD,
+        PageStore,
+        get_page_store_path,
+        page_key,
+        rewrite_response,
+    )
+except ImportError:
+    from split_pdf import SPLIT_BACKENDS, iter_page_splits
+    from va_async_uploader import DEFAULT_REQUESTS_PER_MINUTE, VA_API_URL, upload_pages
+    from va_event_log import EventLog, new_event_log_path, print_stats
+    from va_job_manifest import FAILED, PENDING, JobManifest, atomic_write_text, content_hash, get_manifest_path
+    from va_page_store import PAGE_DEDUP_MODES, VA_COST_PER_PAGE_USD, PageStore, get_page_store_path, page_key, rewrite_response
+
+
+def _list_page_files(pages_path):
+    """Return the split PDFs in ``pages_path`` in page order."""
+    # Handle both single-page (main_p01.pdf) and 2-page (main_p01-02.pdf) formats
+    return sorted(
+        [f for f in os.listdir(pages_path) if f.endswith(".pdf")],
+        key=lambda x: int(x.split("_p")[1].split("-")[0].split(".")[0]),
+    )
+
+
+def _paper_of(json_path):
+    # json_path is papers_dir/FOLDER/pages/main_pNN.pdf.json
+    return os.path.basename(os.path.dirname(os.path.dirname(json_path)))
+
+
+def _iter_upload_jobs(
+    papers_dir, subfolders, log_message, manifest, start_job, in_memory_split, pages_per_split, split_backend, save_splits
+):
+    """
+    Yield (page_file, pdf_bytes, json_path) for every page of ``subfolders`` that still needs uploading.
+
+    Pages are read (or split) lazily, one at a time, as the upload stage asks for them.
+    Each page is passed to ``start_job(paper, page_file, pdf_bytes, json_path)`` and only
+    yielded if it returns True (i.e. the page was not served from the page store).
+    """
+    # Process each subfolder in alphanumeric order
+    for subfolder in subfolders:
+        log_message(f"\nProcessing subfolder: {subfolder}")
+        pages_path = os.path.join(papers_dir, subfolder, "pages")
+
+        if in_memory_split:
+            pdf_path = os.path.join(papers_dir, subfolder, f"{subfolder}_main.pdf")
+            if not os.path.exists(pdf_path):
+                log_message(f"PDF file not found at {pdf_path}, skipping...")
+                continue
+            os.makedirs(pages_path, exist_ok=True)
+            page_splits = iter_page_splits(pdf_path, pages_per_split, split_backend)
+        else:
+            # Make sure directory exists
+            if not os.path.exists(pages_path):
+                log_message(f"Pages directory not found at {pages_path}, skipping...")
+                continue
+
+            if not any(f.endswith(".pdf") for f in os.listdir(pages_path)):
+                log_message(f"No PDF files found in {pages_path}, skipping...")
+                continue
+            # Pages are read from disk when they are processed, to compare their hash with the manifest
+            page_splits = ((page_file, None) for page_file in _list_page_files(pages_path))
 
-def process_papers(papers_dir=None, start_folder=None):
+        # Process each page
+        try:
+            for page_file, pdf_bytes in page_splits:
+                if in_memory_split and save_splits:
+                    with open(os.path.join(pages_path, page_file), "wb") as f:
+                        f.write(pdf_bytes)
+
+                if pdf_bytes is None:
+                    with open(os.path.join(pages_path, page_file), "rb") as f:
+                        pdf_bytes = f.read()
+
+                # Check if the page has already been processed (and its PDF has not changed since)
+                json_path = os.path.join(pages_path, f"{page_file}.json")
+                if not manifest.needs_upload(subfolder, page_file, json_path, content_hash(pdf_bytes)):
+                    log_message(
+                        f"JSON file already exists for {page_file}, skipping...", "skipped", paper=subfolder, page=page_file
+                    )
+                    continue
+                if os.path.exists(json_path):
+                    log_message(f"JSON file for {page_file} is incomplete or its page changed, re-processing...")
+
+                if start_job(subfolder, page_file, pdf_bytes, json_path):
+                    yield page_file, pdf_bytes, json_path
+        except Exception as e:
+            # Failure to read or split the source PDF(s) of this paper
+            log_message(
+                f"Error splitting PDFs of {subfolder}: {str(e)}",
+                "split_error",
+                paper=subfolder,
+                error_class=type(e).__name__,
+                error=str(e),
+            )
+
+
+def _iter_retry_jobs(papers_dir, log_message, manifest, start_job, pages_per_split, split_backend):
+    """
+    Yield upload jobs for the pages recorded as failed or pending in the manifest, without scanning folders.
+
+    Pages are read from pages/ when the split PDF exists there, otherwise the paper's
+    main PDF is split in memory.
+    """
+    by_paper = defaultdict(list)
+    for job in manifest.jobs(states=[FAILED, PENDING]):
+        by_paper[job["paper"]].append(job)
+    log_message(
+        f"Retrying {sum(len(jobs) for jobs in by_paper.values())} failed or interrupted pages in {len(by_paper)} papers"
+    )
+
+    for paper, jobs in sorted(by_paper.items()):
+        log_message(f"\nRetrying pages of subfolder: {paper}")
+        pages_path = os.path.join(papers_dir, paper, "pages")
+        wanted = {job["page_file"]: job["json_path"] for job in jobs}
+        try:
+            if all(os.path.exists(os.path.join(pages_path, page_file)) for page_file in wanted):
+                page_splits = ((page_file, None) for page_file in sorted(wanted))
+            else:
+                pdf_path = os.path.join(papers_dir, paper, f"{paper}_main.pdf")
+                page_splits = iter_page_splits(pdf_path, pages_per_split, split_backend)
+
+            for page_file, pdf_bytes in page_splits:
+                if page_file not in wanted:
+                    continue
+                if pdf_bytes is None:
+                    with open(os.path.join(pages_path, page_file), "rb") as f:
+                        pdf_bytes = f.read()
+                if start_job(paper, page_file, pdf_bytes, wanted[page_file]):
+                    yield page_file, pdf_bytes, wanted[page_file]
+        except Exception as e:
+            log_message(
+                f"Error reading PDFs of {paper}: {str(e)}",
+                "split_error",
+                paper=paper,
+                error_class=type(e).__name__,
+                error=str(e),
+            )
+
+
+def process_papers(
+    papers_dir=None,
+    start_folder=None,
+    in_memory_split=False,
+    pages_per_split=1,
+    split_backend="pypdf2",
+    save_splits=False,
+    concurrency=1,
+    requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+    retry_failed=False,
+    manifest_path=None,
+    page_dedup="bytes",
+    page_store_path=None,
+):
     """
     Process papers in the specified directory using Vision Agentic Document Analysis, starting from an optional folder.
 
+    Progress is recorded per page in a SQLite job manifest (see va_job_manifest), so an
+    interrupted run resumes where it stopped and truncated responses are re-processed.
+
     Args:
         papers_dir: Directory containing paper subfolders (defaults to config)
         start_folder: Optional folder name to start processing from (alphanumeric ordering)
+        in_memory_split: Split each FOLDER_main.pdf in memory and upload the page buffers directly,
+            instead of reading split PDFs previously written to pages/ by split_pdfs
+        pages_per_split: Pages per split in in-memory mode (1 = single pages, 2 = overlapping 2-page)
+        split_backend: PDF library used for in-memory splitting ("pypdf2" or "pymupdf")
+        save_splits: In in-memory mode, also write the split PDFs to pages/ (as split_pdfs would)
+        concurrency: Maximum number of concurrent uploads. 1 uploads serially; higher values use the
+            async uploader (see va_async_uploader), which also rate-limits and retries failed uploads
+        requests_per_minute: Upload rate limit of the async uploader (0 or None disables it)
+        retry_failed: Only retry the pages the manifest records as failed or interrupted
+        manifest_path: Path of the job manifest (default: PAPERS_DIR/va_jobs.sqlite)
+        page_dedup: Reuse the stored response of an identical page instead of uploading it again:
+            "bytes" (identical split PDF), "pixels" (identical rendered pages) or "off" (see va_page_store)
+        page_store_path: Path of the page store (default: DATA_DIR/cache/va_page_store.sqlite)
+
+    Returns:
+        dict: Number of manifest jobs in each state after the run, plus the number of ``reused``
+        page responses (None if the arguments are invalid).
     """
+    if split_backend not in SPLIT_BACKENDS:
+        print(f"Error: split_backend must be one of {SPLIT_BACKENDS}, got {split_backend}")
+        return
+    if page_dedup not in PAGE_DEDUP_MODES:
+        print(f"Error: page_dedup must be one of {PAGE_DEDUP_MODES}, got {page_dedup}")
+        return
+
     # Import centralized configuration if papers_dir not provided
     if papers_dir is None:
         import sys
@@ -36,81 +221,190 @@ def process_papers(papers_dir=None, start_folder=None):
     # Sort alphanumerically (e.g., 6fhek9 comes before 6pafhf)
     subfolders.sort()
 
-    url = "https://api.va.landing.ai/v1/tools/agentic-document-analysis"
-
-    # Create log file with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file_path = os.path.join(papers_dir, f"processing_log_{timestamp}.txt")
-
-    def log_message(message):
-        """Write message to both console and log file"""
-        print(message)
-        with open(log_file_path, "a") as log_file:
-            log_file.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {message}\n")
-
-    # If start_folder is specified, filter subfolders
-    if start_folder:
-        start_idx = next((i for i, folder in enumerate(subfolders) if folder >= start_folder), len(subfolders))
-        if start_idx == len(subfolders):
-            log_message(f"Warning: Start folder '{start_folder}' not found or comes after all existing folders")
-        subfolders = subfolders[start_idx:]
-
-    log_message(f"Starting processing in directory: {papers_dir}")
-    log_message(f"Found {len(subfolders)} folders to process")
-
-    # Process each subfolder in alphanumeric order
-    for subfolder in subfolders:
-        log_message(f"\nProcessing subfolder: {subfolder}")
-        pages_path = os.path.join(papers_dir, subfolder, "pages")
-
-        # Make sure directory exists
-        if not os.path.exists(pages_path):
-            log_message(f"Pages directory not found at {pages_path}, skipping...")
-            continue
-
-        # Get list of PDF files and sort them
-        # Handle both single-page (main_p01.pdf) and 2-page (main_p01-02.pdf) formats
-        page_files = sorted(
-            [f for f in os.listdir(pages_path) if f.endswith(".pdf")],
-            key=lambda x: int(x.split("_p")[1].split("-")[0].split(".")[0]),
-        )
-
-        if not page_files:
-            log_message(f"No PDF files found in {pages_path}, skipping...")
-            continue
-
-        # Process each page
-        for page_file in page_files:
-            start_time = time.time()
-
-            # Check if JSON exists
-            json_path = os.path.join(pages_path, f"{page_file}.json")
-            if os.path.exists(json_path):
-                log_message(f"JSON file already exists for {page_file}, skipping...")
-                continue
-
-            file_path = os.path.join(pages_path, page_file)
-
-            try:
-                with open(file_path, "rb") as f:
-                    files = {"pdf": f}
-                    headers = {"Authorization": f"Basic {os.getenv('LANDING_AI_API_KEY')}"}
-
-                    response = requests.post(url, files=files, headers=headers)
+    url = VA_API_URL
+
+    # Create the event log with timestamp; it also prints each message to the console
+    event_log = EventLog(new_event_log_path(papers_dir), console=True)
+
+    def log_message(message, event="message", **fields):
+        """Record message, with any structured fields, in the event log and print it to the console"""
+        event_log.event(event, message=message.strip(), **fields)
+
+    try:
+        manifest = JobManifest(manifest_path or get_manifest_path(papers_dir))
+        interrupted = manifest.reset_in_flight()
+        if interrupted:
+            log_message(f"Resuming {interrupted} uploads interrupted in a previous run")
+
+        page_store = PageStore(page_store_path or get_page_store_path()) if page_dedup != "off" else None
+        page_keys = {}  # json_path -> page store key of the pages being uploaded
+        reused_pages = []
+
+        def start_job(paper, page_file, pdf_bytes, json_path):
+            """Reuse the stored response of an identical page, or mark the page in flight. True if it must be uploaded."""
+            page_hash = content_hash(pdf_bytes)
+            if page_store is not None:
+                try:
+                    key = page_key(pdf_bytes, page_dedup)
+                except Exception as e:
+                    log_message(f"Could not compute page key of {page_file}, uploading it: {str(e)}")
+                    key = None
+                stored = page_store.get(key) if key else None
+                if stored is not None:
+                    atomic_write_text(json_path, rewrite_response(stored["response"], paper, page_file))
+                    manifest.mark_done(paper, page_file, json_path, page_hash)
+                    reused_pages.append(page_file)
+                    log_message(
+                        f"Reused response of identical page {stored['paper']}/{stored['page_file']} for {page_file}",
+                        "reused",
+                        paper=paper,
+                        page=page_file,
+                        bytes=len(pdf_bytes),
+                        source=f"{stored['paper']}/{stored['page_file']}",
+                    )
+                    return False
+                if key:
+                    page_keys[json_path] = key
+            manifest.mark_in_flight(paper, page_file, json_path, page_hash)
+            return True
+
+        def finish_job(page_file, json_path, response_text=None, error=None):
+            """Record the outcome of an upload in the manifest and store successful responses in the page store."""
+            paper = _paper_of(json_path)
+            key = page_keys.pop(json_path, None)
+            if error is not None:
+                manifest.mark_failed(paper, page_file, json_path, error)
+                return
+            manifest.mark_done(paper, page_file, json_path)
+            if key and page_store is not None:
+                if response_text is None:
+                    with open(json_path) as f:
+                        response_text = f.read()
+                page_store.set(key, response_text, paper, page_file)
+
+        if retry_failed:
+            log_message(f"Starting retry of failed pages in directory: {papers_dir}")
+            jobs = _iter_retry_jobs(papers_dir, log_message, manifest, start_job, pages_per_split, split_backend)
+        else:
+            # If start_folder is specified, filter subfolders
+            if start_folder:
+                start_idx = next((i for i, folder in enumerate(subfolders) if folder >= start_folder), len(subfolders))
+                if start_idx == len(subfolders):
+                    log_message(f"Warning: Start folder '{start_folder}' not found or comes after all existing folders")
+                subfolders = subfolders[start_idx:]
+
+            log_message(f"Starting processing in directory: {papers_dir}")
+            log_message(f"Found {len(subfolders)} folders to process")
+            jobs = _iter_upload_jobs(
+                papers_dir,
+                subfolders,
+                log_message,
+                manifest,
+                start_job,
+                in_memory_split,
+                pages_per_split,
+                split_backend,
+                save_splits,
+            )
+
+        headers = {"Authorization": f"Basic {os.getenv('LANDING_AI_API_KEY')}"}
+
+        if concurrency > 1:
+            log_message(f"Uploading with up to {concurrency} concurrent requests")
+
+            def record_result(result):
+                page_file, json_path = result["page_file"], result["json_path"]
+                fields = {
+                    "paper": _paper_of(json_path),
+                    "page": page_file,
+                    "duration_s": round(result["processing_time"], 3),
+                    "bytes": result["bytes"],
+                    "status": result["status"],
+                    "attempts": result["attempts"],
+                    "success": result["success"],
+                    "error_class": result["error_class"],
+                    "error": result["error"],
+                }
+                if result["success"]:
+                    try:
+                        finish_job(page_file, json_path)
+                    except Exception as e:
+                        # The uploader logs the error and reports the page as failed
+                        manifest.mark_failed(_paper_of(json_path), page_file, json_path, f"Recording the result failed: {e}")
+                        raise
+                    log_message(
+                        f"Successfully processed {page_file} in {result['processing_time']:.2f} seconds", "upload", **fields
+                    )
+                else:
+                    finish_job(page_file, json_path, error=result["error"])
+                    log_message(
+                        f"Error processing {page_file} after {result['processing_time']:.2f} seconds: {result['error']}",
+                        "upload",
+                        **fields,
+                    )
+
+            upload_pages(
+                jobs, url=url, max_in_flight=concurrency, requests_per_minute=requests_per_minute, on_result=record_result
+            )
+        else:
+            # Reuse one connection for every upload
+            session = requests.Session()
+            for page_file, pdf_bytes, json_path in jobs:
+                start_time = time.time()
+                fields = {"paper": _paper_of(json_path), "page": page_file, "bytes": len(pdf_bytes), "attempts": 1}
+                try:
+                    files = {"pdf": (page_file, pdf_bytes, "application/pdf")}
+
+                    response = session.post(url, files=files, headers=headers)
                     response.raise_for_status()
 
                     # Calculate processing time
                     processing_time = time.time() - start_time
 
                     # Save response
-                    with open(json_path, "w") as f:
-                        f.write(response.text)
-
-                    log_message(f"Successfully processed {page_file} in {processing_time:.2f} seconds")
-
-            except Exception as e:
-                processing_time = time.time() - start_time
-                log_message(f"Error processing {page_file} after {processing_time:.2f} seconds: {str(e)}")
+                    atomic_write_text(json_path, response.text)
+                    finish_job(page_file, json_path, response.text)
+
+                    log_message(
+                        f"Successfully processed {page_file} in {processing_time:.2f} seconds",
+                        "upload",
+                        duration_s=round(processing_time, 3),
+                        status=response.status_code,
+                        success=True,
+                        **fields,
+                    )
+
+                except Exception as e:
+                    processing_time = time.time() - start_time
+                    finish_job(page_file, json_path, error=str(e))
+                    log_message(
+                        f"Error processing {page_file} after {processing_time:.2f} seconds: {str(e)}",
+                        "upload",
+                        duration_s=round(processing_time, 3),
+                        status=getattr(getattr(e, "response", None), "status_code", None),
+                        success=False,
+                        error_class=type(e).__name__,
+                        error=str(e),
+                        **fields,
+                    )
+
+        counts = manifest.counts()
+        manifest.close()
+        if page_store is not None:
+            page_store.close()
+            log_message(
+                f"Page dedup ({page_dedup}): reused {len(reused_pages)} stored responses, "
+                f"saving {len(reused_pages)} API calls (~${len(reused_pages) * VA_COST_PER_PAGE_USD:.2f})"
+            )
+        counts["reused"] = len(reused_pages)
+        log_message(
+            f"Job manifest: {counts['done']} done, {counts['failed']} failed, {counts['pending']} pending"
+            + (" (rerun with --retry-failed to retry failed pages)" if counts["failed"] else "")
+        )
+        return counts
+    finally:
+        event_log.close()
+        print_stats(papers_dir)
 
 
 def main():
@@ -128,13 +422,88 @@ Examples:
   # Process starting from a specific folder (alphanumeric)
   %(prog)s --start 95UKMIEY
   %(prog)s --dir data/papers --start CX9M8HCM
+
+  # Split FOLDER_main.pdf in memory and upload the pages directly (no split PDFs written)
+  %(prog)s --in-memory-split --pages 2 --split-backend pymupdf
+
+  # Upload 8 pages at a time (with rate limiting and retries)
+  %(prog)s --concurrency 8
+
+  # Retry only the pages that failed in previous runs (from the job manifest)
+  %(prog)s --retry-failed
+
+  # Also reuse responses of pages that render identically (e.g. preprint and published version)
+  %(prog)s --page-dedup pixels
+
+  # Show throughput, p50/p95 latency and failure rate of the latest run
+  %(prog)s --stats
         """,
     )
     parser.add_argument("--dir", type=str, help="Papers directory (default: data/papers)", default="data/papers")
     parser.add_argument("--start", type=str, help="Starting folder name (alphanumeric, e.g., 95UKMIEY, CX9M8HCM)", default=None)
+    parser.add_argument(
+        "--in-memory-split",
+        action="store_true",
+        help="Split each FOLDER_main.pdf in memory and upload the pages directly instead of reading pages/*.pdf",
+    )
+    parser.add_argument(
+        "--pages", type=int, choices=[1, 2], default=1, help="Pages per split in --in-memory-split mode (default: 1)"
+    )
+    parser.add_argument(
+        "--split-backend",
+        type=str,
+        choices=SPLIT_BACKENDS,
+        default="pypdf2",
+        help="PDF library used for in-memory splitting (default: pypdf2)",
+    )
+    parser.add_argument("--save-splits", action="store_true", help="Also write in-memory splits to pages/")
+    parser.add_argument("--concurrency", type=int, default=1, help="Maximum number of concurrent uploads (default: 1, serial)")
+    parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        default=DEFAULT_REQUESTS_PER_MINUTE,
+        help=f"Upload rate limit when --concurrency > 1 (default: {DEFAULT_REQUESTS_PER_MINUTE}, 0 disables)",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Only retry pages recorded as failed or interrupted in the job manifest (no folder scan)",
+    )
+    parser.add_argument(
+        "--manifest", type=str, default=None, help="Path of the job manifest (default: PAPERS_DIR/va_jobs.sqlite)"
+    )
+    parser.add_argument(
+        "--page-dedup",
+        type=str,
+        choices=PAGE_DEDUP_MODES,
+        default="bytes",
+        help="Reuse stored responses of identical pages: bytes (identical split PDF, default), "
+        "pixels (identical rendered pages) or off",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print throughput, latency and failure statistics of the latest run from its event log, then exit",
+    )
     args = parser.parse_args()
 
-    process_papers(args.dir, args.start)
+    if args.stats:
+        print_stats(args.dir)
+        return
+
+    process_papers(
+        args.dir,
+        args.start,
+        in_memory_split=args.in_memory_split,
+        pages_per_split=args.pages,
+        split_backend=args.split_backend,
+        save_splits=args.save_splits,
+        concurrency=args.concurrency,
+        requests_per_minute=args.requests_per_minute,
+        retry_failed=args.retry_failed,
+        manifest_path=args.manifest,
+        page_dedup=args.page_dedup,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""
+Tests for the concurrent DeepEval metric runner.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from metabeeai.llm_benchmarking.async_evaluation import AsyncMetricRunner, evaluate_concurrently, make_batch_results
+
+
+class LengthMetric:
+    """Metric stand-in scoring the length of the actual output, tracking concurrent measurements."""
+
+    __name__ = "Length"
+    running = 0
+    max_running = 0
+    calls = []
+
+    def __init__(self, failures=None):
+        self.threshold = 0.5
+        self.strict_mode = False
+        self.evaluation_cost = 0.001
+        self.failures = failures if failures is not None else {}
+
+    async def a_measure(self, test_case, _show_indicator=True):
+        cls = type(self)
+        cls.calls.append(test_case.name)
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures.get(test_case.name, 0) > 0:
+                self.failures[test_case.name] -= 1
+                raise TimeoutError("judge timed out")
+            self.score = min(1.0, len(test_case.actual_output) / 10)
+            self.success = self.score >= self.threshold
+            self.reason = "long enough" if self.success else "too short"
+            return self.score
+        finally:
+            cls.running -= 1
+
+
+def make_case(i, actual_output):
+    return SimpleNamespace(
+        name=f"paper_{i}_case_{i}",
+        input="Which bees?",
+        actual_output=actual_output,
+        expected_output="Apis mellifera",
+        additional_metadata={"paper_id": str(i), "question_key": "bee_species"},
+    )
+
+
+def test_measurements_are_concurrent_and_retried_per_case_and_metric():
+    LengthMetric.running = LengthMetric.max_running = 0
+    LengthMetric.calls = []
+    failures = {"paper_1_case_1": 1}  # shared by every instance: the first attempt for case 1 fails
+    cases = [make_case(i, "x" * (i * 3)) for i in range(6)]
+    completed = []
+
+    results = evaluate_concurrently(
+        cases,
+        [lambda: LengthMetric(failures)],
+        "gpt-4o",
+        concurrency=3,
+        max_retries=2,
+        on_result=completed.append,
+    )
+
+    assert [result["test_case_index"] for result in results] == list(range(6))
+    assert len(completed) == 6
+    assert LengthMetric.max_running == 3
+    # Only the failed pair was measured again
+    assert LengthMetric.calls.count("paper_1_case_1") == 2
+    assert len(LengthMetric.calls) == 7
+
+    entry = results[1]["metrics_data"][0]
+    assert entry["name"] == "Length"
+    assert entry["score"] == 0.3
+    assert entry["success"] is False
+    assert entry["evaluation_model"] == "gpt-4o"
+    assert results[4]["success"] is True
+    assert results[4]["paper_id"] == "4"
+
+
+def test_a_pair_that_keeps_failing_is_recorded_with_its_error():
+    failures = {"paper_0_case_0": 10}
+    runner = AsyncMetricRunner([lambda: LengthMetric(failures)], "gpt-4o", max_retries=0)
+
+    results = asyncio.run(runner.run([make_case(0, "abc"), make_case(1, "abcdefghij")]))
+
+    assert results[0]["success"] is False
+    assert results[0]["metrics_data"][0]["score"] is None
+    assert results[0]["metrics_data"][0]["error"] == "TimeoutError: judge timed out"
+    assert results[1]["success"] is True
+
+
+def test_a_deterministic_error_is_recorded_without_retries():
+    from deepeval.errors import MissingTestCaseParamsError
+
+    class StrictMetric(LengthMetric):
+        async def a_measure(self, test_case, _show_indicator=True):
+            type(self).calls.append(test_case.name)
+            raise MissingTestCaseParamsError("'retrieval_context' cannot be None")
+
+    StrictMetric.calls = []
+    runner = AsyncMetricRunner([StrictMetric], "gpt-4o", max_retries=5)
+
+    results = asyncio.run(runner.run([make_case(0, "abc")]))
+
+    assert StrictMetric.calls == ["paper_0_case_0"]
+    assert results[0]["metrics_data"][0]["error"].startswith("MissingTestCaseParamsError")
+    assert runner.retry_policy.stats.as_dict()["attempts"] == 1
+
+
+def make_test_result(test_case, index, score):
+    """A deepeval TestResult as returned by evaluate(), which drops the test case's additional_metadata."""
+    from deepeval.evaluate.types import TestResult
+    from deepeval.test_run.api import MetricData
+
+    metric = MetricData(name="Length", threshold=0.5, success=score >= 0.5, score=score, evaluation_model="gpt-4o")
+    return TestResult(name=test_case.name, success=metric.success, metrics_data=[metric], conversational=False, index=index)
+
+
+def test_batch_results_are_matched_with_their_test_cases_in_completion_order():
+    cases = [make_case(i, "x" * i) for i in range(3)]
+    # evaluate() ran asynchronously: the last test case finished first
+    test_results = [make_test_result(cases[2], 2, 0.9), make_test_result(cases[0], 0, 0.1), make_test_result(cases[1], 1, 0.5)]
+
+    pairs = make_batch_results(cases, [10, 11, 12], test_results, "gpt-4o")
+
+    assert [test_case.name for test_case, _ in pairs] == [case.name for case in cases]
+    assert [result["test_case_index"] for _, result in pairs] == [10, 11, 12]
+    assert [result["paper_id"] for _, result in pairs] == ["0", "1", "2"]
+    assert [result["metrics_data"][0]["score"] for _, result in pairs] == [0.1, 0.5, 0.9]
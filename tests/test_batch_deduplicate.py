@@ -0,0 +1,70 @@
+"""
+Tests for parallel batch deduplication and its streamed summary.
+"""
+
+import json
+
+import pytest
+
+from metabeeai.process_pdfs.batch_deduplicate import batch_deduplicate
+from metabeeai.process_pdfs.deduplicate_chunks import analyze_chunk_uniqueness, deduplicate_and_analyze, deduplicate_chunks
+
+TEXT = "Foragers returned to the hive with pollen loads after exposure to the fungicide."
+
+
+def write_merged(papers_dir, paper_id, texts):
+    pages_dir = papers_dir / paper_id / "pages"
+    pages_dir.mkdir(parents=True)
+    chunks = [{"chunk_id": f"{paper_id}-{i}", "text": text} for i, text in enumerate(texts)]
+    path = pages_dir / "merged_v2.json"
+    path.write_text(json.dumps({"data": {"chunks": chunks}}))
+    return path
+
+
+@pytest.fixture
+def papers_dir(tmp_path):
+    papers_dir = tmp_path / "papers"
+    for paper in range(1, 6):
+        # Paper n has n - 1 duplicates of TEXT
+        write_merged(papers_dir, str(paper), [TEXT] * paper + [f"Unique text of paper {paper}"])
+    return papers_dir
+
+
+def test_deduplicate_and_analyze_matches_separate_calls():
+    chunks = [{"chunk_id": f"c{i}", "text": text} for i, text in enumerate([TEXT, "Other", TEXT + " ", "Other"])]
+
+    deduplicated, analysis = deduplicate_and_analyze(chunks)
+
+    assert deduplicated == deduplicate_chunks(chunks)
+    assert analysis == analyze_chunk_uniqueness(chunks)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_batch_streams_summary_in_folder_order(papers_dir, tmp_path, workers):
+    summary_path = tmp_path / "summary.json"
+
+    summary = batch_deduplicate(base_dir=papers_dir, workers=workers, summary_path=summary_path)
+
+    assert summary["status"] == "completed"
+    assert summary["processed_papers"] == 5
+    assert summary["total_duplicates_removed"] == 0 + 1 + 2 + 3 + 4
+    assert [result["paper_id"] for result in summary["results"]] == ["1", "2", "3", "4", "5"]
+
+    written = json.loads(summary_path.read_text())
+    assert written["total_duplicates_removed"] == 10
+    assert sorted(result["paper_id"] for result in written["results"]) == ["1", "2", "3", "4", "5"]
+    assert written["dry_run"] is False
+
+    deduplicated = json.loads((papers_dir / "5" / "pages" / "merged_v2.json").read_text())
+    assert len(deduplicated["data"]["chunks"]) == 2
+
+
+def test_dry_run_reports_the_same_statistics_without_writing(papers_dir):
+    before = (papers_dir / "3" / "pages" / "merged_v2.json").read_text()
+
+    summary = batch_deduplicate(base_dir=papers_dir, dry_run=True, workers=2)
+
+    assert summary["total_duplicates_removed"] == 10
+    assert {result["status"] for result in summary["results"]} == {"analyzed"}
+    assert summary["results"][2]["analysis"]["duplicate_chunks"] == 2
+    assert (papers_dir / "3" / "pages" / "merged_v2.json").read_text() == before
@@ -0,0 +1,55 @@
+"""
+Tests for the batched answer strategy (one structured LLM call per question).
+"""
+
+import asyncio
+
+from metabeeai.metabeeai_llm import json_multistage_qa
+
+QUESTION = "Which bee species were studied?"
+
+
+def make_chunks():
+    return [
+        {"chunk_id": "c1", "text": "Colonies of Apis mellifera were exposed to imidacloprid."},
+        {"chunk_id": "c2", "text": "Bombus terrestris foraging declined."},
+        {"text": "Chunk without an id."},
+    ]
+
+
+def test_all_chunks_are_answered_in_one_call(monkeypatch):
+    calls = []
+
+    async def structured_completion(model, messages, response_format, description, stage):
+        calls.append((messages[0]["content"], response_format, stage))
+        return {
+            "answers": [
+                {"chunk_id": "c2", "reason": "named in the text", "answer": "Bombus terrestris"},
+                {"chunk_id": "c1", "reason": "named in the text", "answer": "Apis mellifera"},
+            ]
+        }
+
+    monkeypatch.setattr(json_multistage_qa, "_structured_completion", structured_completion)
+
+    chunks = asyncio.run(json_multistage_qa.get_batched_answers(QUESTION, make_chunks()))
+
+    assert len(calls) == 1
+    prompt, response_format, stage = calls[0]
+    assert response_format is json_multistage_qa.ChunkAnswerList
+    assert stage == "answer"
+    assert all(f"<Text chunk_id:{chunk_id}>" in prompt for chunk_id in ["c1", "c2", "chunk_2"])
+    # Answers are attached by chunk_id, whatever order the model returned them in
+    assert [chunk["answer"]["answer"] for chunk in chunks] == ["Apis mellifera", "Bombus terrestris", ""]
+    assert chunks[2]["answer"]["reason"] == "No answer returned for this chunk"
+
+
+def test_a_failed_call_leaves_empty_answers(monkeypatch):
+    async def structured_completion(*args):
+        raise RuntimeError("service unavailable")
+
+    monkeypatch.setattr(json_multistage_qa, "_structured_completion", structured_completion)
+
+    chunks = asyncio.run(json_multistage_qa.get_batched_answers(QUESTION, make_chunks()))
+
+    assert [chunk["answer"]["answer"] for chunk in chunks] == ["", "", ""]
+    assert asyncio.run(json_multistage_qa.get_batched_answers(QUESTION, [])) == []
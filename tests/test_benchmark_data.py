@@ -0,0 +1,85 @@
+"""
+Tests for the normalized benchmark dataset format and its lazy reader.
+"""
+
+import json
+import os
+
+import pytest
+
+from metabeeai.llm_benchmarking.benchmark_data import (
+    CHUNKS_FILENAME,
+    BenchmarkData,
+    LegacyBenchmarkData,
+    open_benchmark_data,
+)
+from metabeeai.llm_benchmarking.prep_benchmark_data import prepare_benchmark_data
+
+QUESTIONS_YML = """
+QUESTIONS:
+  bee_species:
+    question: Which bee species were studied?
+  pesticides:
+    question: Which pesticides were tested?
+"""
+
+
+def write_paper(papers_dir, paper_id, chunks, answers):
+    paper_dir = papers_dir / paper_id
+    (paper_dir / "pages").mkdir(parents=True)
+    merged = {"data": {"chunks": [{"chunk_id": chunk_id, "text": text} for chunk_id, text in chunks.items()]}}
+    (paper_dir / "pages" / "merged_v2.json").write_text(json.dumps(merged))
+    llm_answers = {"QUESTIONS": {key: {"answer": f"LLM {key}", "chunk_ids": ids} for key, ids in answers.items()}}
+    (paper_dir / "answers.json").write_text(json.dumps(llm_answers))
+    reviewer = {"QUESTIONS": {key: {"user_answer_positive": f"Reviewer {key}", "user_rating": 4} for key in answers}}
+    (paper_dir / "answers_extended.json").write_text(json.dumps(reviewer))
+
+
+@pytest.fixture
+def benchmark_inputs(tmp_path):
+    papers_dir = tmp_path / "papers"
+    write_paper(
+        papers_dir, "001", {"a": "Apis mellifera ü", "b": "Imidacloprid"}, {"bee_species": ["a"], "pesticides": ["b", "x"]}
+    )
+    write_paper(papers_dir, "002", {"c": "Bombus terrestris"}, {"bee_species": ["c"]})
+    questions_yml = tmp_path / "questions.yml"
+    questions_yml.write_text(QUESTIONS_YML)
+    return papers_dir, questions_yml
+
+
+def test_normalized_format_matches_legacy_json(benchmark_inputs, tmp_path):
+    papers_dir, questions_yml = benchmark_inputs
+    prepare_benchmark_data(str(papers_dir), str(questions_yml), str(tmp_path / "benchmark"))
+    prepare_benchmark_data(str(papers_dir), str(questions_yml), str(tmp_path / "benchmark.json"))
+
+    normalized = open_benchmark_data(str(tmp_path / "benchmark"))
+    legacy = open_benchmark_data(str(tmp_path / "benchmark.json"))
+    assert isinstance(normalized, BenchmarkData)
+    assert isinstance(legacy, LegacyBenchmarkData)
+    assert normalized.num_test_cases == legacy.num_test_cases == 3
+
+    for entry, legacy_entry in zip(normalized.iter_test_cases(), legacy.iter_test_cases()):
+        assert "retrieval_context" not in entry
+        assert entry["chunk_ids"] == legacy_entry["chunk_ids"]
+        assert normalized.retrieval_context(entry) == legacy.retrieval_context(legacy_entry)
+        assert normalized.context(entry["paper_id"]) == legacy.context(legacy_entry["paper_id"])
+
+    # Every chunk text is stored exactly once
+    lines = (tmp_path / "benchmark" / CHUNKS_FILENAME).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["chunk_id"] for line in lines] == ["a", "b", "c"]
+
+
+def test_papers_are_read_lazily_from_their_byte_range(benchmark_inputs, tmp_path):
+    papers_dir, questions_yml = benchmark_inputs
+    output = tmp_path / "benchmark"
+    prepare_benchmark_data(str(papers_dir), str(questions_yml), str(output))
+
+    benchmark = BenchmarkData(str(output), cache_size=1)
+    assert benchmark.chunk_map("002") == {"c": "Bombus terrestris"}
+    assert benchmark.chunk_map("001") == {"a": "Apis mellifera ü", "b": "Imidacloprid"}
+    assert list(benchmark._cache) == ["001"]
+    assert benchmark.context("missing") == []
+
+    entry = {"paper_id": "001", "chunk_ids": ["b", "x", "a"]}
+    assert benchmark.retrieval_context(entry) == ["Imidacloprid", "Apis mellifera ü"]
+    assert os.path.exists(output / "manifest.json")
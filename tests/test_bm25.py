@@ -0,0 +1,42 @@
+"""
+Tests for BM25 pre-ranking of paper chunks.
+"""
+
+from metabeeai.metabeeai_llm.bm25 import BM25Index, tokenize
+from metabeeai.metabeeai_llm.json_multistage_qa import PaperContext
+
+CHUNKS = [
+    {"chunk_id": "a", "text": "Journal: Apidologie"},
+    {"chunk_id": "b", "text": "Colonies of Apis mellifera were exposed to imidacloprid."},
+    {"chunk_id": "c", "text": "Bombus terrestris foraging declined after exposure."},
+]
+
+
+def test_tokenize_drops_stopwords_and_keeps_hyphenated_terms():
+    assert tokenize("The half-life of Imidacloprid in a colony's wax") == ["half-life", "imidacloprid", "colony's", "wax"]
+
+
+def test_documents_matching_more_and_rarer_terms_rank_first():
+    index = BM25Index(
+        [
+            "Honey bee colonies were monitored over winter.",
+            "Imidacloprid residues were measured in pollen collected by honey bees.",
+            "Imidacloprid imidacloprid exposure reduced bumblebee foraging.",
+            "",
+        ]
+    )
+
+    scores = index.scores("imidacloprid foraging")
+    assert scores[0] == scores[3] == 0
+    assert scores[2] > scores[1] > 0
+    # Ties between non-matching documents are broken by document order
+    assert index.top_k("imidacloprid foraging", 4) == [2, 1, 0, 3]
+    assert BM25Index([]).top_k("bees", 3) == []
+
+
+def test_prerank_keeps_the_best_matching_chunks_in_document_order():
+    paper = PaperContext(CHUNKS)
+
+    assert paper.prerank("bumblebee Bombus terrestris foraging", top_k=1) == [CHUNKS[2]]
+    assert paper.prerank("anything", top_k=None) == paper.filtered_chunks
+    assert paper.prerank("anything", top_k=5) == paper.filtered_chunks
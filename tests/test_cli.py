@@ -104,6 +104,11 @@ class TestLLMCommand:
         assert args.relevance_model is None
         assert args.answer_model is None
         assert args.config is None
+        assert args.question_concurrency == 1
+        assert args.paper_workers == 1
+        assert args.no_cache is False
+        assert args.incremental is False
+        assert args.metrics_file is None
 
     @patch("metabeeai.cli.handle_llm_command")
     def test_llm_with_dir(self, mock_handler):
@@ -169,6 +174,66 @@ class TestLLMCommand:
         args = mock_handler.call_args[0][0]
         assert args.config == config_value
 
+    @patch("metabeeai.cli.handle_llm_command")
+    def test_llm_with_question_concurrency(self, mock_handler):
+        """Test 'llm' command with --question-concurrency argument."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "llm", "--question-concurrency", "8"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.question_concurrency == 8
+
+    @patch("metabeeai.cli.handle_llm_command")
+    def test_llm_with_paper_workers(self, mock_handler):
+        """Test 'llm' command with --paper-workers argument."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "llm", "--paper-workers", "4"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.paper_workers == 4
+
+    @patch("metabeeai.cli.handle_llm_command")
+    def test_llm_with_no_cache(self, mock_handler):
+        """Test 'llm' command with --no-cache flag."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "llm", "--no-cache"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.no_cache is True
+
+    @patch("metabeeai.cli.handle_llm_command")
+    def test_llm_with_incremental(self, mock_handler):
+        """Test 'llm' command with --incremental flag."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "llm", "--incremental"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.incremental is True
+
+    @patch("metabeeai.cli.handle_llm_command")
+    def test_llm_with_metrics_file(self, mock_handler):
+        """Test 'llm' command with --metrics-file argument."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "llm", "--metrics-file", "logs/usage.jsonl"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.metrics_file == "logs/usage.jsonl"
+
 
 class TestProcessPDFsCommand:
     """Test the 'process-pdfs' subcommand arguments and defaults."""
@@ -197,6 +262,16 @@ class TestProcessPDFsCommand:
         assert args.skip_deduplicate is False
         assert args.filter_chunk_type == []
         assert args.pages == 1
+        assert args.in_memory_split is False
+        assert args.split_backend == "pypdf2"
+        assert args.workers == 1
+        assert args.upload_concurrency == 1
+        assert args.retry_failed is False
+        assert args.page_dedup == "bytes"
+        assert args.compact_json is False
+        assert args.dedup_mode == "exact"
+        assert args.dedup_threshold is None
+        assert args.stats is False
 
     @patch("metabeeai.cli.handle_process_pdfs_command")
     def test_process_pdfs_with_dir(self, mock_handler):
@@ -315,6 +390,105 @@ class TestProcessPDFsCommand:
         args = mock_handler.call_args[0][0]
         assert args.pages == expected
 
+    @patch("metabeeai.cli.handle_process_pdfs_command")
+    def test_process_pdfs_in_memory_split(self, mock_handler):
+        """Test 'process-pdfs' command with --in-memory-split and --split-backend."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "process-pdfs", "--in-memory-split", "--split-backend", "pymupdf"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.in_memory_split is True
+        assert args.split_backend == "pymupdf"
+
+    @patch("metabeeai.cli.handle_process_pdfs_command")
+    def test_process_pdfs_with_workers(self, mock_handler):
+        """Test 'process-pdfs' command with --workers argument."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "process-pdfs", "--workers", "8"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.workers == 8
+
+    @patch("metabeeai.cli.handle_process_pdfs_command")
+    def test_process_pdfs_with_upload_concurrency(self, mock_handler):
+        """Test 'process-pdfs' command with --upload-concurrency argument."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "process-pdfs", "--upload-concurrency", "8"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.upload_concurrency == 8
+
+    @patch("metabeeai.cli.handle_process_pdfs_command")
+    def test_process_pdfs_retry_failed(self, mock_handler):
+        """Test 'process-pdfs' command with --retry-failed flag."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "process-pdfs", "--retry-failed"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.retry_failed is True
+
+    @pytest.mark.parametrize("mode", ["off", "bytes", "pixels"])
+    @patch("metabeeai.cli.handle_process_pdfs_command")
+    def test_process_pdfs_page_dedup(self, mock_handler, mode):
+        """Test 'process-pdfs' command with different --page-dedup values."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "process-pdfs", "--page-dedup", mode]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.page_dedup == mode
+
+    @patch("metabeeai.cli.handle_process_pdfs_command")
+    def test_process_pdfs_compact_json(self, mock_handler):
+        """Test 'process-pdfs' command with --compact-json flag."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "process-pdfs", "--merge-only", "--compact-json"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.compact_json is True
+
+    @patch("metabeeai.cli.handle_process_pdfs_command")
+    def test_process_pdfs_near_dedup(self, mock_handler):
+        """Test 'process-pdfs' command with --dedup-mode near and --dedup-threshold."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "process-pdfs", "--dedup-mode", "near", "--dedup-threshold", "0.9"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.dedup_mode == "near"
+        assert args.dedup_threshold == 0.9
+
+    @patch("metabeeai.cli.handle_process_pdfs_command")
+    def test_process_pdfs_stats(self, mock_handler):
+        """Test 'process-pdfs' command with --stats flag."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "process-pdfs", "--stats"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.stats is True
+
 
 class TestReviewCommand:
     """Test the 'review' subcommand."""
@@ -355,6 +529,7 @@ class TestPrepBenchmarkCommand:
         assert args.papers_dir is None
         assert args.questions_yml is None
         assert args.output is None
+        assert args.format is None
 
     @patch("metabeeai.cli.handle_prep_benchmark_command")
     def test_prep_benchmark_with_papers_dir(self, mock_handler):
@@ -392,6 +567,18 @@ class TestPrepBenchmarkCommand:
         args = mock_handler.call_args[0][0]
         assert args.output == "/test/output.json"
 
+    @patch("metabeeai.cli.handle_prep_benchmark_command")
+    def test_prep_benchmark_with_format(self, mock_handler):
+        """Test 'prep-benchmark' command with --format argument."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "prep-benchmark", "--format", "json"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.format == "json"
+
     @patch("metabeeai.cli.handle_prep_benchmark_command")
     def test_prep_benchmark_with_all_args(self, mock_handler):
         """Test 'prep-benchmark' command with all arguments."""
@@ -441,10 +628,16 @@ class TestBenchmarkCommand:
         assert args.limit is None
         assert args.batch_size == 25
         assert args.max_retries == 5
+        assert args.async_eval is False
+        assert args.concurrency == 8
+        assert args.rate_limit is None
         assert args.model == "gpt-4o"
         assert args.max_context_length == 200000
         assert args.use_retrieval_only is False
+        assert args.context_token_budget is None
         assert args.list_questions is False
+        assert args.output_prefix is None
+        assert args.no_eval_cache is False
 
     @patch("metabeeai.cli.handle_benchmark_command")
     def test_benchmark_with_question(self, mock_handler):
@@ -518,6 +711,56 @@ class TestBenchmarkCommand:
         args = mock_handler.call_args[0][0]
         assert args.max_retries == 3
 
+    @patch("metabeeai.cli.handle_benchmark_command")
+    def test_benchmark_with_async_eval(self, mock_handler):
+        """Test 'benchmark' command with --async-eval, --concurrency and --rate-limit arguments."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "benchmark", "--async-eval", "--concurrency", "16", "--rate-limit", "300"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.async_eval is True
+        assert args.concurrency == 16
+        assert args.rate_limit == 300
+
+    @patch("metabeeai.cli.handle_benchmark_command")
+    def test_benchmark_with_output_prefix(self, mock_handler):
+        """Test 'benchmark' command with --output-prefix argument."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "benchmark", "--output-prefix", "combined_results_all_questions_run1"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.output_prefix == "combined_results_all_questions_run1"
+
+    @patch("metabeeai.cli.handle_benchmark_command")
+    def test_benchmark_with_context_token_budget(self, mock_handler):
+        """Test 'benchmark' command with --context-token-budget argument."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "benchmark", "--context-token-budget", "8000"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.context_token_budget == 8000
+
+    @patch("metabeeai.cli.handle_benchmark_command")
+    def test_benchmark_with_no_eval_cache(self, mock_handler):
+        """Test 'benchmark' command with --no-eval-cache flag."""
+        mock_handler.side_effect = SystemExit(0)
+
+        with patch("sys.argv", ["metabee", "benchmark", "--no-eval-cache"]):
+            with pytest.raises(SystemExit):
+                cli.main()
+
+        args = mock_handler.call_args[0][0]
+        assert args.no_eval_cache is True
+
     @pytest.mark.parametrize("model", ["gpt-4o-mini", "gpt-4o", "gpt-4-turbo", "gpt-3.5-turbo"])
     @patch("metabeeai.cli.handle_benchmark_command")
     def test_benchmark_with_model_choices(self, mock_handler, model):
@@ -941,6 +1184,11 @@ class TestInstalledCLI:
         assert "--relevance-model" in result.stdout
         assert "--answer-model" in result.stdout
         assert "--config" in result.stdout
+        assert "--question-concurrency" in result.stdout
+        assert "--paper-workers" in result.stdout
+        assert "--no-cache" in result.stdout
+        assert "--incremental" in result.stdout
+        assert "--metrics-file" in result.stdout
 
     def test_installed_cli_process_pdfs_help(self):
         """Test that the installed CLI 'process-pdfs' subcommand shows help."""
@@ -958,6 +1206,16 @@ class TestInstalledCLI:
         assert "--merge-only" in result.stdout
         assert "--filter-chunk-type" in result.stdout
         assert "--pages" in result.stdout
+        assert "--in-memory-split" in result.stdout
+        assert "--split-backend" in result.stdout
+        assert "--workers" in result.stdout
+        assert "--upload-concurrency" in result.stdout
+        assert "--retry-failed" in result.stdout
+        assert "--page-dedup" in result.stdout
+        assert "--compact-json" in result.stdout
+        assert "--dedup-mode" in result.stdout
+        assert "--dedup-threshold" in result.stdout
+        assert "--stats" in result.stdout
 
     def test_installed_cli_review_help(self):
         """Test that the installed CLI 'review' subcommand shows help."""
@@ -976,6 +1234,7 @@ class TestInstalledCLI:
         assert "--papers-dir" in result.stdout
         assert "--questions-yml" in result.stdout
         assert "--output" in result.stdout
+        assert "--format" in result.stdout
 
     def test_installed_cli_benchmark_help(self):
         """Test that the installed CLI 'benchmark' subcommand shows help."""
@@ -988,9 +1247,14 @@ class TestInstalledCLI:
         assert "--limit" in result.stdout
         assert "--batch-size" in result.stdout
         assert "--max-retries" in result.stdout
+        assert "--async-eval" in result.stdout
+        assert "--concurrency" in result.stdout
+        assert "--output-prefix" in result.stdout
+        assert "--no-eval-cache" in result.stdout
         assert "--model" in result.stdout
         assert "--max-context-length" in result.stdout
         assert "--use-retrieval-only" in result.stdout
+        assert "--context-token-budget" in result.stdout
         assert "--list-questions" in result.stdout
 
     def test_installed_cli_edge_cases_help(self):
@@ -0,0 +1,63 @@
+"""
+Tests for the token-aware packing of benchmark test case contexts.
+"""
+
+import pytest
+
+from metabeeai.llm_benchmarking.context_budget import ContextBudget, make_token_counter
+
+
+def words(text):
+    return len(text.split())
+
+
+# Eight chunks of 10 "tokens" each, and a long chunk of 30
+CHUNK_MAP = {f"c{i}": " ".join([f"w{i}"] * 10) for i in range(8)}
+CHUNK_MAP["long"] = " ".join(["w"] * 30)
+
+
+def test_retrieval_chunks_come_first_then_their_nearest_neighbours():
+    budget = ContextBudget("gpt-4o", 40, token_counter=words)
+
+    packed = budget.pack("001", CHUNK_MAP, ["c5", "c2", "missing"])
+
+    # c5 and c2, then their neighbours at distance 1 in paper order until the budget is used
+    assert packed["retrieval_context"] == [CHUNK_MAP["c5"], CHUNK_MAP["c2"]]
+    assert packed["context"] == [CHUNK_MAP[chunk_id] for chunk_id in ["c1", "c2", "c3", "c5"]]
+    assert packed["tokens"] == 40
+    assert packed["trimmed_tokens"] == 70
+    assert packed["retrieval_tokens"] == 20
+    assert packed["retrieval_trimmed_tokens"] == 0
+
+
+def test_chunks_that_do_not_fit_are_skipped_for_smaller_ones():
+    budget = ContextBudget("gpt-4o", 25, token_counter=words)
+
+    packed = budget.pack("001", CHUNK_MAP, ["long", "c7"])
+
+    assert packed["retrieval_context"] == [CHUNK_MAP["c7"]]
+    assert packed["retrieval_trimmed_tokens"] == 30
+    assert packed["context"] == [CHUNK_MAP["c6"], CHUNK_MAP["c7"]]
+
+    # Without retrieval chunks the paper is packed from its start
+    assert budget.pack("001", CHUNK_MAP, [])["context"] == [CHUNK_MAP["c0"], CHUNK_MAP["c1"]]
+
+
+def test_tokens_are_counted_once_per_chunk_of_a_paper():
+    calls = []
+    budget = ContextBudget("gpt-4o", 1000, token_counter=lambda text: calls.append(text) or words(text))
+
+    budget.pack("001", CHUNK_MAP, ["c1"])
+    budget.pack("001", CHUNK_MAP, ["c2"])
+    assert len(calls) == len(CHUNK_MAP)
+
+    assert budget.pack("002", {"a": "one two"}, ["a"])["trimmed_tokens"] == 0
+    assert len(calls) == len(CHUNK_MAP) + 1
+
+    with pytest.raises(ValueError):
+        ContextBudget("gpt-4o", 0)
+
+
+def test_model_tokenizer_counts_tokens():
+    count = make_token_counter("gpt-4o")
+    assert 0 < count("Apis mellifera foraging on treated oilseed rape") < 20
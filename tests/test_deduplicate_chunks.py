@@ -0,0 +1,93 @@
+"""
+Tests for exact and near-duplicate chunk deduplication.
+"""
+
+from metabeeai.process_pdfs.deduplicate_chunks import analyze_chunk_uniqueness, deduplicate_chunks
+
+BASE_TEXT = (
+    "Honey bee colonies exposed to imidacloprid at field-realistic concentrations showed reduced "
+    "foraging activity and lower brood production over the eight week study period."
+)
+OTHER_TEXT = "Bumblebee queens were reared in the laboratory under controlled temperature and humidity conditions."
+
+
+def make_chunks(*texts):
+    return [{"chunk_id": f"c{i}", "text": text} for i, text in enumerate(texts)]
+
+
+def test_exact_mode_merges_identical_text_only():
+    chunks = make_chunks(BASE_TEXT, OTHER_TEXT, f"  {BASE_TEXT}\n", BASE_TEXT.replace(" ", "  "))
+    chunks[2]["grounding"] = [{"page": 1}]
+
+    deduplicated = deduplicate_chunks(chunks)
+
+    assert [c["chunk_ids"] for c in deduplicated] == [["c0", "c2"], ["c1"], ["c3"]]
+    # The copy with the most metadata is kept, under the first chunk id
+    assert deduplicated[0]["chunk_id"] == "c0"
+    assert deduplicated[0]["original_chunk_id"] == "c2"
+    assert deduplicated[0]["grounding"] == [{"page": 1}]
+
+
+def test_near_mode_merges_whitespace_hyphenation_and_trailing_sentence_variants():
+    chunks = make_chunks(
+        BASE_TEXT,
+        OTHER_TEXT,
+        BASE_TEXT.replace(" ", "  ").replace("foraging", "forag-\ning"),
+        BASE_TEXT + " Effects persisted after exposure ended.",
+    )
+
+    deduplicated = deduplicate_chunks(chunks, mode="near", threshold=0.8)
+
+    assert [c["chunk_ids"] for c in deduplicated] == [["c0", "c2", "c3"], ["c1"]]
+    # Among near copies the longest text is kept
+    assert deduplicated[0]["text"].endswith("Effects persisted after exposure ended.")
+    assert deduplicated[0]["chunk_id"] == "c0"
+
+    analysis = analyze_chunk_uniqueness(chunks, mode="near", threshold=0.8)
+    assert analysis["unique_chunks"] == 2
+    assert analysis["duplicate_chunks"] == 2
+    assert analysis["near_duplicate_groups"] == 1
+    assert analysis["duplicate_details"][0]["chunk_ids"] == ["c0", "c2", "c3"]
+    assert 0.8 <= analysis["duplicate_details"][0]["similarity"] < 1.0
+
+
+def test_near_mode_respects_threshold():
+    chunks = make_chunks(BASE_TEXT, BASE_TEXT + " Effects persisted after exposure ended.")
+
+    assert len(deduplicate_chunks(chunks, mode="near", threshold=0.95)) == 2
+    assert len(deduplicate_chunks(chunks, mode="near", threshold=0.7)) == 1
+
+
+def grounded(chunk_id, text, page, top, chunk_type="text"):
+    box = {"l": 0.1, "t": top, "r": 0.9, "b": top + 0.1}
+    return {"chunk_id": chunk_id, "chunk_type": chunk_type, "text": text, "grounding": [{"page": page, "box": box}]}
+
+
+def test_overlap_mode_merges_chunks_at_the_same_position_of_a_shared_page():
+    chunks = [
+        grounded("w0-a", "Methods", 1, 0.10),
+        grounded("w0-b", "Colonies were fed sucrose.", 1, 0.30),
+        grounded("w1-a", "Methods.", 1, 0.11),  # same box, slightly different extraction
+        grounded("w1-b", "Colonies were fed sucrose solution.", 1, 0.30),
+        grounded("w1-c", "A figure at the same place", 1, 0.30, chunk_type="figure"),
+        grounded("w1-d", "Colonies were fed sucrose.", 2, 0.30),  # same box on the next page
+    ]
+
+    deduplicated = deduplicate_chunks(chunks, mode="overlap")
+
+    assert [c["chunk_ids"] for c in deduplicated] == [["w0-a", "w1-a"], ["w0-b", "w1-b", "w1-d"], ["w1-c"]]
+
+    analysis = analyze_chunk_uniqueness(chunks, mode="overlap", threshold=0.95)
+    assert analysis["iou_threshold"] == 0.95
+    # Only the identical text on page 2 and the identical box on page 1 remain matches at IoU 0.95
+    assert [d["chunk_ids"] for d in analysis["duplicate_details"]] == [["w0-b", "w1-b", "w1-d"]]
+
+
+def test_deduplicating_again_keeps_previously_merged_ids():
+    chunks = make_chunks(BASE_TEXT, BASE_TEXT, OTHER_TEXT)
+    merged_once = deduplicate_chunks(chunks)
+    merged_once.append({"chunk_id": "c9", "text": BASE_TEXT})
+
+    merged_twice = deduplicate_chunks(merged_once)
+
+    assert [c["chunk_ids"] for c in merged_twice] == [["c0", "c1", "c9"], ["c2"]]
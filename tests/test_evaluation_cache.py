@@ -0,0 +1,98 @@
+"""
+Tests for the persistent cache of DeepEval metric results.
+"""
+
+from types import SimpleNamespace
+
+from metabeeai.llm_benchmarking.async_evaluation import evaluate_concurrently, make_batch_results
+from metabeeai.llm_benchmarking.evaluation_cache import EvaluationCache, make_evaluation_key
+
+
+class CountingMetric:
+    """Metric stand-in scoring the length of the actual output and counting its measurements."""
+
+    __name__ = "Length"
+    calls = []
+
+    def __init__(self, threshold=0.5):
+        self.threshold = threshold
+        self.strict_mode = False
+        self.evaluation_cost = 0.001
+
+    async def a_measure(self, test_case, _show_indicator=True):
+        type(self).calls.append(test_case.name)
+        if test_case.actual_output == "timeout":
+            raise TimeoutError("judge timed out")
+        self.score = min(1.0, len(test_case.actual_output) / 10)
+        self.success = self.score >= self.threshold
+        self.reason = "scored"
+        return self.score
+
+
+def make_case(i, actual_output, retrieval_context=("chunk",)):
+    return SimpleNamespace(
+        name=f"paper_{i}_case_{i}",
+        input="Which bees?",
+        actual_output=actual_output,
+        expected_output="Apis mellifera",
+        context=["full paper text"],
+        retrieval_context=list(retrieval_context),
+        additional_metadata={"paper_id": str(i), "question_key": "bee_species"},
+    )
+
+
+def test_key_covers_the_test_case_the_metric_config_and_the_model():
+    key = make_evaluation_key(make_case(0, "abc"), CountingMetric(), "gpt-4o")
+
+    assert key == make_evaluation_key(make_case(0, "abc"), CountingMetric(), "gpt-4o")
+    assert key != make_evaluation_key(make_case(0, "abcd"), CountingMetric(), "gpt-4o")
+    assert key != make_evaluation_key(make_case(0, "abc", retrieval_context=["other"]), CountingMetric(), "gpt-4o")
+    assert key != make_evaluation_key(make_case(0, "abc"), CountingMetric(threshold=0.7), "gpt-4o")
+    assert key != make_evaluation_key(make_case(0, "abc"), CountingMetric(), "gpt-4o-mini")
+
+
+def test_second_run_only_measures_new_and_failed_cases(tmp_path):
+    path = str(tmp_path / "cache" / "evaluation_cache.sqlite")
+    CountingMetric.calls = []
+    first = EvaluationCache(path, "gpt-4o")
+    evaluate_concurrently(
+        [make_case(0, "abc"), make_case(1, "timeout")], [CountingMetric], "gpt-4o", max_retries=0, cache=first
+    )
+    first.close()
+    assert CountingMetric.calls == ["paper_0_case_0", "paper_1_case_1"]
+
+    CountingMetric.calls = []
+    cache = EvaluationCache(path, "gpt-4o")
+    cases = [make_case(0, "abc"), make_case(1, "timeout"), make_case(2, "abcdefghij")]
+    cached_results, pending_cases, pending_indices = cache.split_cached(cases, [0, 1, 2], [CountingMetric()])
+
+    assert [result["test_case_index"] for result in cached_results] == [0]
+    assert cached_results[0]["metrics_data"][0]["score"] == 0.3
+    assert cached_results[0]["metrics_data"][0]["cached"] is True
+    assert pending_indices == [1, 2]
+
+    results = evaluate_concurrently(
+        pending_cases, [CountingMetric], "gpt-4o", max_retries=0, indices=pending_indices, cache=cache
+    )
+    assert CountingMetric.calls == ["paper_1_case_1", "paper_2_case_2"]
+    assert results[1]["success"] is True
+    assert "cached" not in results[1]["metrics_data"][0]
+    assert cache.stats()["entries"] == 2
+
+
+def test_batch_results_are_cached_under_their_own_test_case(tmp_path):
+    from deepeval.evaluate.types import TestResult
+    from deepeval.test_run.api import MetricData
+
+    cache = EvaluationCache(str(tmp_path / "evaluation_cache.sqlite"), "gpt-4o")
+    cases = [make_case(i, "x" * i) for i in range(3)]
+
+    def test_result(i):
+        metric = MetricData(name="Length", threshold=0.5, success=True, score=i / 10, evaluation_model="gpt-4o")
+        return TestResult(name=cases[i].name, success=True, metrics_data=[metric], conversational=False, index=i)
+
+    # evaluate() returned the results in completion order
+    make_batch_results(cases, [0, 1, 2], [test_result(2), test_result(0), test_result(1)], "gpt-4o", cache, [CountingMetric()])
+
+    for i, case in enumerate(cases):
+        assert cache.get(case, CountingMetric())["score"] == i / 10
@@ -0,0 +1,63 @@
+"""
+Tests for the persistent LLM response cache.
+"""
+
+import time
+
+from pydantic import BaseModel
+
+from metabeeai.metabeeai_llm.llm_cache import LLMCache, make_cache_key
+
+
+class Answer(BaseModel):
+    answer: str
+
+
+MESSAGES = [{"role": "user", "content": "Which bee species were studied?"}]
+
+
+def test_cache_key_depends_only_on_what_determines_the_output():
+    key = make_cache_key("openai/gpt-4o-mini", MESSAGES, Answer, temperature=0)
+
+    assert key == make_cache_key("openai/gpt-4o-mini", [dict(reversed(MESSAGES[0].items()))], Answer, temperature=0)
+    assert key == make_cache_key("openai/gpt-4o-mini", MESSAGES, Answer.model_json_schema(), temperature=0)
+    assert key != make_cache_key("openai/gpt-4o", MESSAGES, Answer, temperature=0)
+    assert key != make_cache_key("openai/gpt-4o-mini", MESSAGES, Answer, temperature=0.7)
+    assert key != make_cache_key("openai/gpt-4o-mini", MESSAGES, None, temperature=0)
+
+
+def test_hits_misses_and_replaced_entries_are_counted(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache" / "llm_cache.sqlite"))
+
+    assert cache.get("k") is None
+    cache.set("k", "first")
+    cache.set("k", "second answer")
+    assert cache.get("k") == "second answer"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["entries"]) == (1, 1, 2, 1)
+    assert stats["hit_rate"] == 0.5
+    assert stats["size_bytes"] == cache._size == len("second answer")
+
+    cache.delete("k")
+    assert cache._size == 0 and cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_beyond_the_maximum_size(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+    cache = LLMCache(path, max_size_mb=300 / (1024 * 1024))  # 300 bytes
+    for key in ["a", "b", "c"]:
+        cache.set(key, "x" * 80)
+        time.sleep(0.01)
+    cache.get("a")  # "b" is now the least recently used entry
+
+    cache.set("d", "x" * 80)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ["a", "c", "d"])
+    assert cache.stats()["evictions"] == 1
+    assert cache._size == 240
+    cache.close()
+
+    # The running size is restored when the cache is reopened
+    assert LLMCache(path)._size == 240
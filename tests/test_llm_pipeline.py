@@ -0,0 +1,232 @@
+"""
+Tests for the LLM pipeline: question tree traversal and incremental runs.
+"""
+
+import asyncio
+import json
+import random
+
+import pytest
+
+from metabeeai.metabeeai_llm import llm_pipeline
+
+SPECIES = ["Apis mellifera", "Bombus terrestris", "Osmia bicornis"]
+
+TREE = {
+    "QUESTIONS": {
+        "design": {"question": "What was the study design?"},
+        "exposure": {
+            "pesticide": {"question": "Which pesticide was tested?"},
+            "dose": "Which doses were used?",
+        },
+        "outcomes": ["Which endpoints were measured?", {"question": "Which effects were found?"}],
+        "species": {
+            "list": {
+                "question": "Which bee species were studied?",
+                "endpoint_name": "species",
+                "for_each": {
+                    "sample_size": {"question": "How many {species} were tested?"},
+                    "effect": {"question": "What was the effect on {species}?"},
+                },
+            }
+        },
+    }
+}
+
+
+class StubAnswers:
+    """get_answer stand-in answering with the question after a random delay, tracking concurrent calls."""
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.running = 0
+        self.max_running = 0
+        self.started = []
+        self.finished = []
+
+    async def get_answer(self, question_text, json_path, relevance_model=None, answer_model=None):
+        self.started.append(question_text)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.random.uniform(0, 0.02))
+        finally:
+            self.running -= 1
+        self.finished.append(question_text)
+        return {"answer": f"answer to {question_text}", "reason": "stub", "chunk_ids": []}
+
+
+async def format_to_list(question, text, model="gpt-4o-mini"):
+    return {"answer": list(SPECIES)}
+
+
+def traverse(monkeypatch, seed, semaphore_size=None):
+    stub = StubAnswers(seed)
+    monkeypatch.setattr(llm_pipeline, "get_answer", stub.get_answer)
+    monkeypatch.setattr(llm_pipeline, "format_to_list_async", format_to_list)
+
+    async def run():
+        semaphore = asyncio.Semaphore(semaphore_size) if semaphore_size else None
+        return await llm_pipeline.process_question_tree(TREE, "merged_v2.json", semaphore=semaphore)
+
+    return asyncio.run(run()), stub
+
+
+def test_concurrent_traversal_keeps_the_tree_order_of_the_serial_path(monkeypatch):
+    serial, serial_stub = traverse(monkeypatch, seed=0)
+    assert serial_stub.max_running == 1
+    assert serial_stub.finished == serial_stub.started
+
+    for seed in range(3):
+        answers, stub = traverse(monkeypatch, seed, semaphore_size=4)
+        # Answers completed out of order, yet the output matches the serial one key by key
+        assert stub.finished != stub.started
+        assert json.dumps(answers) == json.dumps(serial)
+
+    questions = serial["QUESTIONS"]
+    assert list(questions) == ["design", "exposure", "outcomes", "species"]
+    assert questions["exposure"]["dose"]["answer"] == "answer to Which doses were used?"
+    assert [answer["answer"] for answer in questions["outcomes"]] == [
+        "answer to Which endpoints were measured?",
+        "answer to Which effects were found?",
+    ]
+    # for_each expands the subtree once per list item, in list order
+    per_species = questions["species"]["list"]
+    assert list(per_species) == SPECIES
+    assert per_species["Osmia bicornis"]["effect"]["answer"] == "answer to What was the effect on Osmia bicornis?"
+
+
+def test_question_concurrency_bounds_the_get_answer_calls_in_flight(monkeypatch):
+    for limit in (2, 3):
+        _, stub = traverse(monkeypatch, seed=limit, semaphore_size=limit)
+        assert stub.max_running == limit
+        # 5 questions, the species list question and 2 per species
+        assert len(stub.started) == 12
+
+
+def test_literature_answers_use_the_question_concurrency(monkeypatch, tmp_path):
+    json_path = tmp_path / "merged_v2.json"
+    json_path.write_text(json.dumps({"data": {"chunks": [{"chunk_id": "a", "text": "Apis mellifera"}]}}))
+    stub = StubAnswers(seed=0)
+    monkeypatch.setattr(llm_pipeline, "_QUESTIONS", TREE)
+    monkeypatch.setattr(llm_pipeline, "get_answer", stub.get_answer)
+    monkeypatch.setattr(llm_pipeline, "format_to_list_async", format_to_list)
+
+    answers = asyncio.run(
+        llm_pipeline.get_literature_answers(str(json_path), question_concurrency=3, question_keys=["exposure", "species"])
+    )
+
+    assert list(answers["QUESTIONS"]) == ["exposure", "species"]
+    assert stub.max_running == 3
+
+
+INCREMENTAL_QUESTIONS = {
+    "QUESTIONS": {
+        "bee_species": {"question": "Which bee species were studied?"},
+        "pesticides": {"question": "Which pesticides were tested?"},
+    }
+}
+
+
+def write_paper(base_dir, text="Apis mellifera was exposed to imidacloprid."):
+    pages = base_dir / "P1" / "pages"
+    pages.mkdir(parents=True, exist_ok=True)
+    (pages / "merged_v2.json").write_text(json.dumps({"data": {"chunks": [{"chunk_id": "a", "text": text}]}}))
+    return llm_pipeline.PaperContext.from_json_file(str(pages / "merged_v2.json"))
+
+
+def test_fingerprints_change_only_with_the_question_the_models_or_the_paper(monkeypatch, tmp_path):
+    questions = json.loads(json.dumps(INCREMENTAL_QUESTIONS))
+    monkeypatch.setattr(llm_pipeline, "_QUESTIONS", questions)
+    paper = write_paper(tmp_path)
+
+    fingerprints = llm_pipeline.question_fingerprints(paper)
+    assert list(fingerprints) == ["bee_species", "pesticides"]
+    assert llm_pipeline.question_fingerprints(llm_pipeline.PaperContext.from_json_file(paper.json_path)) == fingerprints
+
+    questions["QUESTIONS"]["pesticides"]["question"] = "Which pesticides and doses were tested?"
+    changed = llm_pipeline.question_fingerprints(paper)
+    assert changed["bee_species"] == fingerprints["bee_species"]
+    assert changed["pesticides"] != fingerprints["pesticides"]
+
+    questions["QUESTIONS"]["pesticides"]["question"] = "Which pesticides were tested?"
+    assert llm_pipeline.question_fingerprints(paper) == fingerprints
+    other_model = llm_pipeline.question_fingerprints(paper, answer_model="openai/gpt-4.1")
+    other_paper = llm_pipeline.question_fingerprints(write_paper(tmp_path, "Bombus terrestris."))
+    for other in (other_model, other_paper):
+        assert all(other[key] != fingerprints[key] for key in fingerprints)
+
+
+@pytest.fixture
+def incremental_run(monkeypatch, tmp_path):
+    """Run process_papers(incremental=True) on one paper with a stubbed get_answer, returning the questions asked."""
+    questions = json.loads(json.dumps(INCREMENTAL_QUESTIONS))
+    monkeypatch.setattr(llm_pipeline, "_QUESTIONS", questions)
+    monkeypatch.setattr(llm_pipeline, "get_llm_cache", lambda: None)
+    write_paper(tmp_path)
+    asked = []
+    failing = set()
+
+    async def get_answer(question_text, json_path, relevance_model=None, answer_model=None):
+        asked.append(question_text)
+        if question_text in failing:
+            raise RuntimeError("judge unavailable")
+        return {"answer": f"answer to {question_text}", "reason": "stub", "chunk_ids": []}
+
+    monkeypatch.setattr(llm_pipeline, "get_answer", get_answer)
+
+    def run():
+        asked.clear()
+        asyncio.run(llm_pipeline.process_papers(str(tmp_path), incremental=True, metrics_path=str(tmp_path / "usage.jsonl")))
+        return list(asked)
+
+    run.questions = questions["QUESTIONS"]
+    run.failing = failing
+    run.answers_path = tmp_path / "P1" / "answers.json"
+    run.answers = lambda: json.loads(run.answers_path.read_text())["QUESTIONS"]["QUESTIONS"]
+    run.manifest = lambda: llm_pipeline.load_manifest(str(tmp_path / "P1"))
+    return run
+
+
+def test_incremental_run_only_answers_changed_questions_and_merges_them(incremental_run):
+    assert incremental_run() == ["Which bee species were studied?", "Which pesticides were tested?"]
+    first_manifest = incremental_run.manifest()
+    assert list(first_manifest) == ["bee_species", "pesticides"]
+
+    # Nothing changed: every question is skipped
+    assert incremental_run() == []
+
+    # A question key that is not in questions.yml (any more) is kept when another question is answered again
+    data = json.loads(incremental_run.answers_path.read_text())
+    data["QUESTIONS"]["QUESTIONS"]["retired_question"] = {"answer": "kept"}
+    incremental_run.answers_path.write_text(json.dumps(data))
+
+    incremental_run.questions["pesticides"]["question"] = "Which pesticides and doses were tested?"
+    assert incremental_run() == ["Which pesticides and doses were tested?"]
+
+    answers = incremental_run.answers()
+    assert answers["bee_species"]["answer"] == "answer to Which bee species were studied?"
+    assert answers["pesticides"]["answer"] == "answer to Which pesticides and doses were tested?"
+    assert answers["retired_question"] == {"answer": "kept"}
+    manifest = incremental_run.manifest()
+    assert manifest["bee_species"] == first_manifest["bee_species"]
+    assert manifest["pesticides"] != first_manifest["pesticides"]
+
+
+def test_questions_that_failed_are_not_recorded_and_are_asked_again(incremental_run):
+    incremental_run()
+    first_manifest = incremental_run.manifest()
+    first_answers = incremental_run.answers()
+
+    incremental_run.questions["bee_species"]["question"] = "Which bee species and castes were studied?"
+    incremental_run.failing.add("Which bee species and castes were studied?")
+    assert incremental_run() == ["Which bee species and castes were studied?"]
+
+    # The failed run changed neither the answers nor the manifest
+    assert incremental_run.answers() == first_answers
+    assert incremental_run.manifest() == first_manifest
+
+    incremental_run.failing.clear()
+    assert incremental_run() == ["Which bee species and castes were studied?"]
+    assert incremental_run.manifest()["bee_species"] != first_manifest["bee_species"]
+    assert incremental_run.manifest()["pesticides"] == first_manifest["pesticides"]
@@ -0,0 +1,104 @@
+"""
+Tests for the streaming page JSON merger.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from metabeeai.process_pdfs.deduplicate_chunks import process_merged_json_file
+from metabeeai.process_pdfs.merger import adjust_and_merge_json, merge_and_deduplicate_papers
+
+
+def write_page(path, chunks):
+    path.write_text(json.dumps({"data": {"markdown": "", "chunks": chunks}}))
+    return str(path)
+
+
+def chunk(chunk_id, pages, chunk_type="text", text=None):
+    return {
+        "chunk_id": chunk_id,
+        "chunk_type": chunk_type,
+        "text": text or f"Bees ü\n{chunk_id}",
+        "grounding": [{"page": page, "box": {"l": 0.1, "t": 0.2, "r": 0.3, "b": 0.4}} for page in pages],
+    }
+
+
+@pytest.fixture
+def single_page_files(tmp_path):
+    return [
+        write_page(tmp_path / "main_p01.pdf.json", [chunk("a", [0]), chunk("m", [0], chunk_type="marginalia")]),
+        write_page(tmp_path / "main_p02.pdf.json", []),
+        write_page(tmp_path / "main_p03.pdf.json", [chunk("b", [0]), chunk("c", [0])]),
+    ]
+
+
+def test_streamed_output_matches_indented_dump(single_page_files, tmp_path):
+    output = tmp_path / "merged_v2.json"
+
+    stats = adjust_and_merge_json(single_page_files, str(output), ["marginalia"])
+
+    expected_chunks = [chunk("a", [0]), chunk("b", [2]), chunk("c", [2])]
+    assert output.read_text() == json.dumps({"data": {"chunks": expected_chunks}}, indent=2)
+    assert stats == {"chunks": 3, "pages": 3}
+    assert not (tmp_path / "merged_v2.json.tmp").exists()
+
+
+def test_compact_and_empty_output(tmp_path):
+    overlap = [
+        write_page(tmp_path / "main_p01-02.pdf.json", [chunk("a", [0, 1])]),
+        write_page(tmp_path / "main_p02-03.pdf.json", [chunk("b", [0]), chunk("c", [1])]),
+    ]
+    output = tmp_path / "merged_v2.json"
+
+    stats = adjust_and_merge_json(overlap, str(output), compact=True)
+
+    merged = json.loads(output.read_text())
+    assert [[g["page"] for g in c["grounding"]] for c in merged["data"]["chunks"]] == [[0, 1], [1], [2]]
+    assert "\n" not in output.read_text().replace("\\n", "")
+    assert stats == {"chunks": 3, "pages": 3}
+
+    empty = [write_page(tmp_path / "main_p09.pdf.json", [])]
+    assert adjust_and_merge_json(empty, str(output)) == {"chunks": 0, "pages": 0}
+    assert output.read_text() == json.dumps({"data": {"chunks": []}}, indent=2)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_fused_merge_and_deduplicate_matches_separate_passes(tmp_path, workers):
+    fused_dir, separate_dir = tmp_path / "fused", tmp_path / "separate"
+    for base in (fused_dir, separate_dir):
+        for paper in ("P1", "P2"):
+            pages = base / paper / "pages"
+            pages.mkdir(parents=True)
+            write_page(pages / "main_p01.pdf.json", [chunk("a", [0], text="Header"), chunk("b", [0])])
+            write_page(pages / "main_p02.pdf.json", [chunk("a2", [0], text="Header"), chunk("c", [0])])
+        (base / "P3" / "pages").mkdir(parents=True)
+
+    summary = merge_and_deduplicate_papers(str(fused_dir), workers=workers)
+
+    for paper in ("P1", "P2"):
+        merged = separate_dir / paper / "pages" / "merged_v2.json"
+        adjust_and_merge_json(sorted(str(p) for p in merged.parent.glob("main_*.json")), str(merged))
+        process_merged_json_file(Path(merged))
+        assert (fused_dir / paper / "pages" / "merged_v2.json").read_text() == merged.read_text()
+
+    assert summary["merged"] == 2
+    assert summary["failed"] == 0
+    assert summary["duplicates_removed"] == 2
+    assert [r["status"] for r in summary["results"]] == ["ok", "ok", "no_pages"]
+
+
+def test_fused_stage_deduplicates_overlapping_windows_by_position(tmp_path):
+    pages = tmp_path / "P1" / "pages"
+    pages.mkdir(parents=True)
+    # Windows p1-2 and p2-3 both extract page 2, with slightly different text
+    write_page(pages / "main_p01-02.pdf.json", [chunk("a", [0]), chunk("b", [1], text="Shared page")])
+    write_page(pages / "main_p02-03.pdf.json", [chunk("b2", [0], text="Shared page."), chunk("c", [1])])
+
+    summary = merge_and_deduplicate_papers(str(tmp_path))
+
+    merged = json.loads((pages / "merged_v2.json").read_text())
+    assert [c["chunk_ids"] for c in merged["data"]["chunks"]] == [["a"], ["b", "b2"], ["c"]]
+    assert merged["deduplication_info"]["mode"] == "overlap"
+    assert summary["results"][0]["pages"] == 3
@@ -0,0 +1,28 @@
+"""
+Tests for the per-paper chunk context shared by all questions of a paper.
+"""
+
+import hashlib
+import json
+
+from metabeeai.metabeeai_llm.json_multistage_qa import PaperContext
+
+CHUNKS = [
+    {"chunk_id": "a", "text": "Journal: Apidologie"},
+    {"chunk_id": "b", "text": "Colonies of Apis mellifera were exposed to imidacloprid."},
+    {"chunk_id": "c", "text": "Bombus terrestris foraging declined after exposure."},
+]
+
+
+def test_paper_is_parsed_and_filtered_once(tmp_path):
+    path = tmp_path / "merged_v2.json"
+    path.write_text(json.dumps({"data": {"chunks": CHUNKS}}))
+
+    paper = PaperContext.from_json_file(str(path))
+
+    assert len(paper) == 3
+    assert [chunk["chunk_id"] for chunk in paper.filtered_chunks] == ["b", "c"]
+    assert paper.content_hash == hashlib.sha256(path.read_bytes()).hexdigest()
+    # Questions receive the loaded context instead of a path and share it
+    assert PaperContext.ensure(paper) is paper
+    assert PaperContext.ensure(str(path)).filtered_chunks == paper.filtered_chunks
@@ -0,0 +1,78 @@
+"""
+Tests for the token-bucket rate limiter shared by LLM calls.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from metabeeai.metabeeai_llm.rate_limiter import RateLimiter, TokenBucket
+
+
+def test_bucket_refills_over_time_up_to_its_capacity():
+    bucket = TokenBucket(rate_per_minute=60, capacity=10)
+    assert asyncio.run(bucket.acquire(10)) == 0
+    assert bucket.tokens == pytest.approx(0, abs=0.01)
+
+    # 5 seconds at 1 token per second
+    bucket.updated -= 5
+    bucket._refill()
+    assert bucket.tokens == pytest.approx(5, abs=0.01)
+
+    bucket.updated -= 60
+    bucket._refill()
+    assert bucket.tokens == 10
+
+
+def test_acquire_waits_for_missing_tokens_and_clamps_to_capacity():
+    bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10 tokens per second
+    bucket.tokens = 0
+    start = time.monotonic()
+
+    waited = asyncio.run(bucket.acquire(100))  # more than the capacity: waits for a full bucket only
+
+    assert waited == pytest.approx(0.2, abs=0.05)
+    assert time.monotonic() - start < 1
+
+
+def test_usage_reconciles_the_estimate_and_failed_calls_release_it():
+    limiter = RateLimiter({"default": {"requests_per_minute": 10, "tokens_per_minute": 10000, "completion_token_reserve": 100}})
+    messages = [{"role": "user", "content": "Which bee species were studied?"}]
+
+    estimated = asyncio.run(limiter.acquire("gpt-4o-mini", messages))
+    _, tokens = limiter._get_buckets("gpt-4o-mini")
+    assert estimated > 100
+    assert tokens.tokens == pytest.approx(10000 - estimated, abs=1)
+
+    # The call used fewer tokens than reserved: the difference is returned
+    limiter.record_usage("gpt-4o-mini", estimated, {"total_tokens": 50})
+    assert tokens.tokens == pytest.approx(9950, abs=1)
+
+    estimated = asyncio.run(limiter.acquire("gpt-4o-mini", messages))
+    limiter.release("gpt-4o-mini", estimated)
+    assert tokens.tokens == pytest.approx(9950, abs=1)
+
+    # Without reported usage the estimate is kept
+    limiter.record_usage("gpt-4o-mini", estimated, None)
+    assert tokens.tokens == pytest.approx(9950, abs=1)
+
+
+def test_failed_completion_returns_its_token_reservation(monkeypatch):
+    from metabeeai.metabeeai_llm import json_multistage_qa
+
+    limiter = RateLimiter({"default": {"tokens_per_minute": 10000}})
+
+    async def rate_limited(**kwargs):
+        raise RuntimeError("429 Too Many Requests")
+
+    monkeypatch.setattr(json_multistage_qa, "get_llm_cache", lambda: None)
+    monkeypatch.setattr(json_multistage_qa, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(json_multistage_qa, "acompletion", rate_limited)
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            asyncio.run(json_multistage_qa._acompletion("gpt-4o-mini", [{"role": "user", "content": "Hi"}]))
+
+    _, tokens = limiter._get_buckets("gpt-4o-mini")
+    assert tokens.tokens == pytest.approx(10000, abs=1)
@@ -0,0 +1,108 @@
+"""
+Tests for the append-only benchmarking results writer.
+"""
+
+import json
+
+from metabeeai.llm_benchmarking.async_evaluation import make_batch_results
+from metabeeai.llm_benchmarking.async_evaluation import make_result as build_result
+from metabeeai.llm_benchmarking.results_writer import ResultsWriter
+
+
+def make_result(index, paper_id, score=0.5):
+    return {
+        "test_case_index": index,
+        "name": f"paper_{paper_id}_case_{index}",
+        "paper_id": paper_id,
+        "question_key": "bee_species",
+        "context": ["full paper text"],
+        "retrieval_context": ["chunk"],
+        "metrics_data": [{"name": "Faithfulness", "score": score}],
+    }
+
+
+def test_results_are_appended_once_and_consolidated_at_the_end(tmp_path):
+    writer = ResultsWriter(str(tmp_path / "results" / "combined_results_all_questions_run"))
+    writer.append(make_result(1, "002"))
+    writer.append(make_result(0, "001"))
+
+    lines = [json.loads(line) for line in open(writer.jsonl_path)]
+    assert [line["paper_id"] for line in lines] == ["002", "001"]
+    assert "context" not in lines[0] and "retrieval_context" not in lines[0]
+    assert not (tmp_path / "results" / "combined_results_all_questions_run.json").exists()
+
+    consolidated = writer.consolidate()
+    assert [result["test_case_index"] for result in consolidated] == [0, 1]
+    assert json.load(open(writer.json_path)) == consolidated
+
+
+def test_same_prefix_resumes_and_ignores_a_partial_line(tmp_path):
+    prefix = str(tmp_path / "run")
+    first = ResultsWriter(prefix)
+    first.append(make_result(0, "001"))
+    first.close()
+    with open(first.jsonl_path, "a") as f:
+        f.write('{"test_case_index": 1, "paper_id": "00')  # interrupted mid-write
+
+    resumed = ResultsWriter(prefix)
+    assert resumed.completed_keys() == {("001", "bee_species")}
+
+    resumed.append(make_result(1, "002"))
+    resumed.append(make_result(0, "001", score=0.9))  # re-scored case replaces the earlier result
+    consolidated = resumed.consolidate()
+
+    assert [(result["paper_id"], result["metrics_data"][0]["score"]) for result in consolidated] == [
+        ("001", 0.9),
+        ("002", 0.5),
+    ]
+
+
+def make_test_result(name, index, error=None):
+    """A deepeval TestResult as returned by evaluate(): metadata instead of additional_metadata."""
+    from deepeval.evaluate.types import TestResult
+    from deepeval.test_run.api import MetricData
+
+    metric = MetricData(name="Faithfulness", threshold=0.5, success=error is None, score=None if error else 0.8, error=error)
+    return TestResult(name=name, success=error is None, metrics_data=[metric], conversational=False, index=index)
+
+
+def test_batch_results_keep_one_result_per_test_case(tmp_path):
+    from deepeval.test_case import LLMTestCase
+
+    cases = [
+        LLMTestCase(
+            input="Which bees?",
+            actual_output="Apis mellifera",
+            expected_output="Apis mellifera",
+            name=f"paper_00{i}_case_{i}",
+            additional_metadata={"paper_id": f"00{i}", "question_key": "bee_species"},
+        )
+        for i in range(5)
+    ]
+    test_results = [make_test_result(case.name, i) for i, case in reversed(list(enumerate(cases)))]
+    writer = ResultsWriter(str(tmp_path / "run"))
+    for _, result in make_batch_results(cases, list(range(5)), test_results, "gpt-4o"):
+        writer.append(result)
+
+    assert len(writer.completed_keys()) == 5
+    assert [result["paper_id"] for result in writer.consolidate()] == ["000", "001", "002", "003", "004"]
+
+    # Results built from bare TestResults are identified by their name and never collide
+    writer = ResultsWriter(str(tmp_path / "bare"))
+    for i in range(3):
+        writer.append(build_result(i, make_test_result(f"case_{i}", i), []))
+    assert len(writer.consolidate()) == 3
+
+
+def test_results_with_a_failed_metric_are_evaluated_again_on_resume(tmp_path):
+    writer = ResultsWriter(str(tmp_path / "run"))
+    failed = make_result(1, "002")
+    failed["metrics_data"] = [{"name": "Faithfulness", "score": None, "error": "TimeoutError: judge timed out"}]
+    writer.append(make_result(0, "001"))
+    writer.append(failed)
+
+    assert writer.completed_keys() == {("001", "bee_species")}
+
+    writer.append(make_result(1, "002", score=0.7))  # re-evaluated on resume
+    assert writer.completed_keys() == {("001", "bee_species"), ("002", "bee_species")}
+    assert writer.consolidate()[1]["metrics_data"][0]["score"] == 0.7
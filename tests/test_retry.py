@@ -0,0 +1,110 @@
+"""
+Tests for the shared LLM retry policy.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+from metabeeai.metabeeai_llm.retry import MalformedOutputError, RetryPolicy, current_attempt, get_retry_after, is_retryable
+
+
+class APIError(Exception):
+    def __init__(self, status_code=None, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers) if headers is not None else None
+
+
+class AuthenticationError(Exception):
+    pass
+
+
+class ContextWindowExceededError(APIError):
+    pass
+
+
+class RateLimitError(APIError):
+    pass
+
+
+def test_transient_errors_are_retried_and_client_errors_are_fatal():
+    assert is_retryable(APIError(429))
+    assert is_retryable(APIError(408))
+    assert is_retryable(APIError(503))
+    assert is_retryable(RateLimitError())
+    assert is_retryable(TimeoutError("read timed out"))
+    assert is_retryable(ConnectionResetError("connection reset by peer"))
+    assert is_retryable(MalformedOutputError("unparseable model output"))
+    assert not is_retryable(APIError(401))
+    assert not is_retryable(APIError(400))
+    assert not is_retryable(AuthenticationError("invalid api key"))
+    assert not is_retryable(ContextWindowExceededError())
+
+
+def test_unrecognised_errors_fail_fast():
+    for error in (TypeError("unsupported operand"), KeyError("answer"), AttributeError("x"), ValueError("bad argument")):
+        assert not is_retryable(error)
+
+    policy = RetryPolicy(max_retries=10, retry_delay=0, jitter=False)
+    attempts = []
+
+    async def buggy():
+        attempts.append(current_attempt())
+        return None + 1
+
+    with pytest.raises(TypeError):
+        asyncio.run(policy.run(buggy))
+    assert attempts == [1]
+    assert policy.stats.as_dict()["failed_calls"] == 1
+
+
+def test_retry_after_headers_are_parsed():
+    assert get_retry_after(APIError(429, {"retry-after": "7"})) == 7
+    assert get_retry_after(APIError(429, {"retry-after-ms": "1500", "retry-after": "7"})) == 1.5
+    in_one_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 < get_retry_after(APIError(429, {"retry-after": in_one_minute})) <= 60
+    assert get_retry_after(APIError(429, {"retry-after": "soon"})) is None
+    assert get_retry_after(APIError(429)) is None
+
+
+def test_delay_backs_off_exponentially_and_honours_retry_after():
+    policy = RetryPolicy(retry_delay=1, max_delay=5, jitter=False)
+
+    assert [policy.compute_delay(attempt) for attempt in range(1, 5)] == [1, 2, 4, 5]
+    assert policy.compute_delay(1, APIError(429, {"retry-after": "30"})) == 30
+    assert 0.5 <= RetryPolicy(retry_delay=1).compute_delay(1) <= 1
+
+
+def test_run_retries_until_success_and_stops_on_fatal_errors():
+    policy = RetryPolicy(max_retries=3, retry_delay=0, jitter=False)
+    attempts = []
+
+    async def flaky():
+        attempts.append(current_attempt())
+        if len(attempts) < 3:
+            raise APIError(429)
+        return "ok"
+
+    assert asyncio.run(policy.run(flaky)) == "ok"
+    assert attempts == [1, 2, 3]
+
+    async def unauthorized():
+        attempts.append(current_attempt())
+        raise APIError(401)
+
+    with pytest.raises(APIError):
+        asyncio.run(policy.run(unauthorized))
+    assert attempts[-1] == 1
+
+    assert policy.stats.as_dict() == {
+        "calls": 2,
+        "attempts": 4,
+        "retries": 2,
+        "retried_calls": 1,
+        "failed_calls": 1,
+        "max_attempts": 3,
+    }
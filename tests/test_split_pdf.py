@@ -0,0 +1,87 @@
+"""
+Tests for splitting papers into single-page and overlapping 2-page PDFs.
+"""
+
+import io
+import os
+
+import PyPDF2
+import pytest
+
+from metabeeai.process_pdfs.split_pdf import SPLIT_BACKENDS, iter_page_splits, split_pdfs
+
+
+def write_pdf(path, pages):
+    """Write a PDF of blank pages whose widths (101, 102, ...) identify them."""
+    writer = PyPDF2.PdfWriter()
+    for i in range(pages):
+        writer.add_blank_page(width=101 + i, height=200)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+
+def page_widths(pdf_bytes):
+    return [round(float(page.mediabox.width)) for page in PyPDF2.PdfReader(io.BytesIO(pdf_bytes)).pages]
+
+
+@pytest.mark.parametrize("backend", SPLIT_BACKENDS)
+def test_single_page_splits(tmp_path, backend):
+    pdf_path = write_pdf(tmp_path / "P1_main.pdf", 3)
+
+    splits = list(iter_page_splits(pdf_path, 1, backend))
+
+    assert [filename for filename, _ in splits] == ["main_p01.pdf", "main_p02.pdf", "main_p03.pdf"]
+    assert [page_widths(pdf_bytes) for _, pdf_bytes in splits] == [[101], [102], [103]]
+
+
+@pytest.mark.parametrize("backend", SPLIT_BACKENDS)
+def test_overlapping_splits_end_with_the_last_page(tmp_path, backend):
+    # An odd number of pages: the last window still holds the last two pages
+    pdf_path = write_pdf(tmp_path / "P1_main.pdf", 5)
+
+    splits = list(iter_page_splits(pdf_path, 2, backend))
+
+    assert [filename for filename, _ in splits] == ["main_p01-02.pdf", "main_p02-03.pdf", "main_p03-04.pdf", "main_p04-05.pdf"]
+    assert [page_widths(pdf_bytes) for _, pdf_bytes in splits] == [[101, 102], [102, 103], [103, 104], [104, 105]]
+
+    # A single-page paper has no 2-page window
+    assert list(iter_page_splits(write_pdf(tmp_path / "P2_main.pdf", 1), 2, backend)) == []
+
+
+def test_splits_are_reproducible_and_arguments_are_checked(tmp_path):
+    pdf_path = write_pdf(tmp_path / "P1_main.pdf", 2)
+
+    # Identical bytes for identical pages, so that the page store can reuse responses
+    assert list(iter_page_splits(pdf_path, 1, "pymupdf")) == list(iter_page_splits(pdf_path, 1, "pymupdf"))
+
+    with pytest.raises(ValueError):
+        list(iter_page_splits(pdf_path, 3))
+    with pytest.raises(ValueError):
+        list(iter_page_splits(pdf_path, 1, "pdfium"))
+
+
+def make_papers(papers_dir):
+    for paper, pages in (("P1", 3), ("P3", 2)):
+        os.makedirs(papers_dir / paper)
+        write_pdf(papers_dir / paper / f"{paper}_main.pdf", pages)
+    os.makedirs(papers_dir / "P2")
+    (papers_dir / "P2" / "P2_main.pdf").write_bytes(b"%PDF-1.4 truncated")
+    os.makedirs(papers_dir / "P4")  # no main PDF
+
+
+def test_worker_processes_give_the_same_summary_as_the_serial_path(tmp_path):
+    summaries = {}
+    for workers in (1, 2):
+        papers_dir = tmp_path / f"workers_{workers}"
+        make_papers(papers_dir)
+        summaries[workers] = split_pdfs(str(papers_dir), pages_per_split=2, workers=workers)
+        assert sorted(os.listdir(papers_dir / "P1" / "pages")) == ["main_p01-02.pdf", "main_p02-03.pdf"]
+        assert os.listdir(papers_dir / "P2" / "pages") == []
+
+    assert summaries[2] == summaries[1]
+    summary = summaries[2]
+    assert [result["paper"] for result in summary["results"]] == ["P1", "P2", "P3", "P4"]
+    assert (summary["processed"], summary["missing"], summary["failed"], summary["splits"]) == (2, 1, 1, 3)
+    assert list(summary["errors"]) == ["P2"]
+    assert summary["results"][0]["pages"] == 3
@@ -0,0 +1,65 @@
+"""
+Tests for the per-call LLM usage tracker.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from metabeeai.metabeeai_llm.usage import UsageTracker, current_labels, usage_scope
+
+
+def response(prompt_tokens, completion_tokens):
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+    return SimpleNamespace(usage=usage)
+
+
+def test_scopes_nest_and_follow_concurrent_tasks():
+    async def question(key):
+        with usage_scope(question=key):
+            await asyncio.sleep(0.01)
+            with usage_scope(stage="answer"):
+                return current_labels()
+
+    async def paper():
+        with usage_scope(paper="001", stage="relevance"):
+            return await asyncio.gather(question("bee_species"), question("pesticides"))
+
+    labels = asyncio.run(paper())
+
+    assert labels == [
+        {"paper": "001", "question": "bee_species", "stage": "answer"},
+        {"paper": "001", "question": "pesticides", "stage": "answer"},
+    ]
+    assert current_labels() == {"paper": None, "question": None, "stage": None}
+
+
+def test_calls_are_aggregated_per_dimension_and_written_as_jsonl(tmp_path):
+    tracker = UsageTracker()
+    tracker.open(str(tmp_path / "logs" / "usage.jsonl"))
+
+    with usage_scope(paper="001", question="bee_species", stage="answer"):
+        tracker.record("gpt-4o-mini", response(100, 20), latency=0.5)
+        tracker.record("gpt-4o-mini", response(100, 20), cached=True)
+        tracker.record("gpt-4o-mini", latency=0.2, attempt=2, error=TimeoutError("timed out"))
+    with usage_scope(paper="002", stage="relevance"):
+        tracker.record("gpt-4o", response(50, 5), latency=0.3)
+    tracker.close()
+
+    summary = tracker.summary()
+    totals = summary["totals"]
+    assert (totals["calls"], totals["cached_calls"], totals["failed_calls"], totals["retries"]) == (4, 1, 1, 1)
+    assert (totals["prompt_tokens"], totals["completion_tokens"], totals["total_tokens"]) == (150, 25, 175)
+    assert summary["by_paper"]["001"]["calls"] == 3
+    assert summary["by_question"]["unknown"]["total_tokens"] == 55
+    assert set(summary["by_stage"]) == {"answer", "relevance"}
+    assert summary["by_model"]["gpt-4o"]["prompt_tokens"] == 50
+
+    records = [json.loads(line) for line in open(tracker.metrics_path)]
+    assert [record["cached"] for record in records] == [False, True, False, False]
+    assert records[2]["error"] == "TimeoutError: timed out"
+    assert tracker.format_table("stage").splitlines()[-1].startswith("TOTAL")
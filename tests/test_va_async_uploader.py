@@ -0,0 +1,154 @@
+"""
+Tests for the concurrent Vision API uploader against a local stand-in HTTP server.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from metabeeai.process_pdfs.va_async_uploader import upload_pages
+
+FAST_RETRY = {"retry_delay": 0.01, "max_delay": 0.05, "jitter": False}
+
+
+class StandInAPI:
+    """Records requests and answers them with a scripted status code per upload file name."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+        self.failures = {}  # file name -> list of status codes to return before succeeding
+        self.headers = {}  # status code -> extra response headers
+
+    def handle(self, handler):
+        length = int(handler.headers["Content-Length"])
+        body = handler.rfile.read(length)
+        page_file = body.split(b'filename="', 1)[1].split(b'"', 1)[0].decode()
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.requests.append(page_file)
+            scripted = self.failures.get(page_file) or []
+            status = scripted.pop(0) if scripted else 200
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+
+        payload = json.dumps({"data": {"chunks": [{"chunk_id": page_file, "text": "ok"}]}}).encode()
+        handler.send_response(status)
+        for key, value in self.headers.get(status, {}).items():
+            handler.send_header(key, value)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+
+@pytest.fixture
+def stand_in_api():
+    """Run a StandInAPI on a free local port for the duration of a test."""
+    api = StandInAPI()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            api.handle(self)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    api.url = f"http://127.0.0.1:{server.server_address[1]}/v1/tools/agentic-document-analysis"
+    yield api
+    server.shutdown()
+    server.server_close()
+
+
+def make_jobs(tmp_path, count):
+    page_files = [f"main_p{i:02d}.pdf" for i in range(1, count + 1)]
+    return [(page_file, b"%PDF-1.4 stand-in", str(tmp_path / f"{page_file}.json")) for page_file in page_files]
+
+
+def test_uploads_are_written_and_bounded_by_max_in_flight(stand_in_api, tmp_path):
+    stand_in_api.delay = 0.1
+    jobs = make_jobs(tmp_path, 12)
+
+    results = upload_pages(jobs, url=stand_in_api.url, api_key="test", max_in_flight=4, requests_per_minute=None)
+
+    assert len(results) == 12
+    assert all(result["success"] for result in results)
+    assert stand_in_api.max_in_flight == 4
+    for page_file, _, json_path in jobs:
+        with open(json_path) as f:
+            assert json.load(f)["data"]["chunks"][0]["chunk_id"] == page_file
+
+
+def test_retryable_errors_are_retried(stand_in_api, tmp_path):
+    stand_in_api.failures = {"main_p01.pdf": [429, 503]}
+    stand_in_api.headers = {429: {"Retry-After": "0"}}
+
+    results = upload_pages(
+        make_jobs(tmp_path, 2), url=stand_in_api.url, api_key="test", requests_per_minute=None, retry_config=FAST_RETRY
+    )
+
+    by_file = {result["page_file"]: result for result in results}
+    assert by_file["main_p01.pdf"]["success"]
+    assert by_file["main_p01.pdf"]["attempts"] == 3
+    assert by_file["main_p02.pdf"]["attempts"] == 1
+    assert stand_in_api.requests.count("main_p01.pdf") == 3
+
+
+def test_fatal_errors_are_not_retried(stand_in_api, tmp_path):
+    stand_in_api.failures = {"main_p01.pdf": [401]}
+    jobs = make_jobs(tmp_path, 1)
+
+    results = upload_pages(jobs, url=stand_in_api.url, api_key="bad", requests_per_minute=None, retry_config=FAST_RETRY)
+
+    assert not results[0]["success"]
+    assert "HTTP 401" in results[0]["error"]
+    assert stand_in_api.requests == ["main_p01.pdf"]
+    assert not (tmp_path / "main_p01.pdf.json").exists()
+
+
+def test_requests_are_rate_limited_per_host(stand_in_api, tmp_path):
+    start = time.monotonic()
+
+    upload_pages(make_jobs(tmp_path, 4), url=stand_in_api.url, api_key="test", max_in_flight=4, requests_per_minute=600)
+
+    # 600 requests/minute with a bucket of one request: 4 uploads take at least 3 * 0.1s
+    assert time.monotonic() - start >= 0.3
+
+
+def test_jobs_and_results_are_handled_off_the_event_loop_thread(stand_in_api, tmp_path):
+    loop_thread = threading.current_thread()  # asyncio.run runs the loop in the calling thread
+    threads = []
+
+    def jobs():
+        for job in make_jobs(tmp_path, 3):
+            threads.append(threading.current_thread())
+            yield job
+
+    def on_result(result):
+        threads.append(threading.current_thread())
+        if result["page_file"] == "main_p02.pdf":
+            raise OSError("manifest is read-only")
+
+    results = upload_pages(jobs(), url=stand_in_api.url, api_key="test", requests_per_minute=None, on_result=on_result)
+
+    assert len(threads) == 6
+    assert loop_thread not in threads
+    by_file = {result["page_file"]: result for result in results}
+    # A failing callback is reported as a failed job instead of being swallowed
+    assert by_file["main_p01.pdf"]["success"]
+    assert not by_file["main_p02.pdf"]["success"]
+    assert by_file["main_p02.pdf"]["error_class"] == "OSError"
+    assert "manifest is read-only" in by_file["main_p02.pdf"]["error"]
@@ -0,0 +1,86 @@
+"""
+Tests for the buffered Vision API event log and its statistics.
+"""
+
+import json
+
+import pytest
+
+from metabeeai.process_pdfs.va_event_log import EventLog, load_events, new_event_log_path, print_stats, summarize_events
+
+
+def test_events_are_buffered_until_flush_or_close(tmp_path):
+    path = tmp_path / "va_events_test.jsonl"
+    log = EventLog(str(path), capacity=10)
+
+    log.event("upload", paper="P1", page="main_p01.pdf", duration_s=1.5, bytes=100, status=200, success=True, error=None)
+    assert not path.exists()
+
+    log.close()
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(events) == 1
+    assert events[0]["event"] == "upload"
+    assert events[0]["status"] == 200
+    assert "error" not in events[0]
+    assert "timestamp" in events[0]
+
+
+def test_errors_and_old_events_are_flushed_without_waiting_for_a_full_buffer(tmp_path):
+    path = tmp_path / "va_events_test.jsonl"
+    log = EventLog(str(path), capacity=100, flush_interval=3600)
+
+    log.event("upload", paper="P1", page="main_p01.pdf", success=True)
+    log.event("upload", paper="P1", page="main_p02.pdf", success=False, error_class="ReadTimeout", error="timed out")
+    # The error flushed the whole buffer, in order
+    assert [json.loads(line)["page"] for line in path.read_text().splitlines()] == ["main_p01.pdf", "main_p02.pdf"]
+
+    log._handler.flush_interval = 0
+    log.event("upload", paper="P1", page="main_p03.pdf", success=True)
+    assert len(path.read_text().splitlines()) == 3
+    log.close()
+
+
+def test_console_messages_go_through_the_event_logger(tmp_path, capsys):
+    path = tmp_path / "va_events_test.jsonl"
+    log = EventLog(str(path), console=True)
+
+    log.event("skipped", message="JSON file already exists for main_p01.pdf, skipping...", paper="P1")
+    log.close()
+
+    assert capsys.readouterr().out == "JSON file already exists for main_p01.pdf, skipping...\n"
+    assert json.loads(path.read_text())["paper"] == "P1"
+
+
+def test_summary_reports_latency_percentiles_and_failure_rate(tmp_path):
+    path = new_event_log_path(str(tmp_path), timestamp="20250101_000000")
+    log = EventLog(path)
+    for i in range(1, 21):
+        log.event(
+            "upload",
+            paper="P1",
+            page=f"main_p{i:02d}.pdf",
+            duration_s=float(i),
+            bytes=10,
+            success=i != 20,
+            error_class="HTTPStatusError" if i == 20 else None,
+        )
+    log.event("reused", paper="P2", page="main_p01.pdf")
+    log.event("skipped", paper="P3", page="main_p01.pdf")
+    log.close()
+
+    summary = summarize_events(load_events([path]))
+
+    assert summary["uploads"] == 20
+    assert summary["failed"] == 1
+    assert summary["failure_rate"] == pytest.approx(0.05)
+    assert summary["reused"] == 1
+    assert summary["skipped"] == 1
+    assert summary["bytes"] == 200
+    assert summary["latency_p50_s"] == 10.0
+    assert summary["latency_p95_s"] == 19.0
+    assert summary["errors"] == {"HTTPStatusError": 1}
+
+
+def test_print_stats_without_logs(tmp_path, capsys):
+    assert print_stats(str(tmp_path)) is False
+    assert "No Vision API event logs" in capsys.readouterr().out
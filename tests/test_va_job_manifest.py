@@ -0,0 +1,91 @@
+"""
+Tests for the Vision API job manifest and atomic response writes.
+"""
+
+import os
+
+from metabeeai.process_pdfs.va_job_manifest import DONE, FAILED, PENDING, JobManifest, atomic_write_text
+
+
+def test_atomic_write_replaces_file_without_leftovers(tmp_path):
+    path = tmp_path / "main_p01.pdf.json"
+    atomic_write_text(str(path), '{"old": true}')
+    atomic_write_text(str(path), '{"new": true}')
+
+    assert path.read_text() == '{"new": true}'
+    assert os.listdir(tmp_path) == ["main_p01.pdf.json"]
+
+
+def test_interrupted_upload_with_truncated_json_is_reprocessed(tmp_path):
+    manifest = JobManifest(str(tmp_path / "va_jobs.sqlite"))
+    json_path = str(tmp_path / "main_p01.pdf.json")
+
+    assert manifest.needs_upload("P1", "main_p01.pdf", json_path)
+    manifest.mark_in_flight("P1", "main_p01.pdf", json_path, "hash")
+    # Crash mid-write: the run never marks the job done and leaves a truncated file behind
+    with open(json_path, "w") as f:
+        f.write('{"data": {"chunks": [')
+
+    assert manifest.reset_in_flight() == 1
+    assert manifest.get("P1", "main_p01.pdf")["state"] == PENDING
+    assert manifest.needs_upload("P1", "main_p01.pdf", json_path)
+
+    manifest.mark_in_flight("P1", "main_p01.pdf", json_path, "hash")
+    atomic_write_text(json_path, '{"data": {"chunks": []}}')
+    manifest.mark_done("P1", "main_p01.pdf", json_path)
+
+    job = manifest.get("P1", "main_p01.pdf")
+    assert job["state"] == DONE
+    assert job["attempts"] == 2
+    assert job["content_hash"] == "hash"
+    assert not manifest.needs_upload("P1", "main_p01.pdf", json_path)
+
+
+def test_existing_complete_json_is_adopted_and_failures_are_listed(tmp_path):
+    manifest = JobManifest(str(tmp_path / "va_jobs.sqlite"))
+    done_path = str(tmp_path / "main_p01.pdf.json")
+    atomic_write_text(done_path, '{"data": {"chunks": []}}')
+
+    assert not manifest.needs_upload("P1", "main_p01.pdf", done_path)
+    manifest.mark_failed("P1", "main_p02.pdf", str(tmp_path / "main_p02.pdf.json"), "HTTP 500")
+
+    assert manifest.counts() == {"pending": 0, "in_flight": 0, "done": 1, "failed": 1}
+    failed = manifest.jobs(states=[FAILED])
+    assert [(job["paper"], job["page_file"], job["error"]) for job in failed] == [("P1", "main_p02.pdf", "HTTP 500")]
+
+
+def test_done_page_is_uploaded_again_when_its_pdf_changes(tmp_path):
+    manifest = JobManifest(str(tmp_path / "va_jobs.sqlite"))
+    json_path = str(tmp_path / "main_p01.pdf.json")
+    atomic_write_text(json_path, '{"data": {"chunks": []}}')
+
+    # A JSON file written before the manifest existed is adopted with the current page hash
+    assert not manifest.needs_upload("P1", "main_p01.pdf", json_path, "hash-v1")
+    assert manifest.get("P1", "main_p01.pdf")["content_hash"] == "hash-v1"
+    assert not manifest.needs_upload("P1", "main_p01.pdf", json_path, "hash-v1")
+
+    # The page PDF was replaced (e.g. a corrected paper split again)
+    assert manifest.needs_upload("P1", "main_p01.pdf", json_path, "hash-v2")
+    manifest.mark_in_flight("P1", "main_p01.pdf", json_path, "hash-v2")
+    atomic_write_text(json_path, '{"data": {"chunks": [{"chunk_id": "new"}]}}')
+    manifest.mark_done("P1", "main_p01.pdf", json_path)
+    assert not manifest.needs_upload("P1", "main_p01.pdf", json_path, "hash-v2")
+
+
+def test_changed_page_whose_upload_failed_is_not_adopted_again(tmp_path):
+    manifest = JobManifest(str(tmp_path / "va_jobs.sqlite"))
+    json_path = str(tmp_path / "main_p01.pdf.json")
+    manifest.mark_in_flight("P1", "main_p01.pdf", json_path, "hash-v1")
+    atomic_write_text(json_path, '{"data": {"chunks": []}}')
+    manifest.mark_done("P1", "main_p01.pdf", json_path)
+
+    # The page changed: its old response is stale and removed, then the upload fails
+    assert manifest.needs_upload("P1", "main_p01.pdf", json_path, "hash-v2")
+    assert not os.path.exists(json_path)
+    manifest.mark_in_flight("P1", "main_p01.pdf", json_path, "hash-v2")
+    manifest.mark_failed("P1", "main_p01.pdf", json_path, "HTTP 500")
+
+    # A complete JSON file does not make a known, unfinished page done
+    atomic_write_text(json_path, '{"data": {"chunks": []}}')
+    assert manifest.needs_upload("P1", "main_p01.pdf", json_path, "hash-v2")
+    assert manifest.get("P1", "main_p01.pdf")["state"] == FAILED
@@ -0,0 +1,43 @@
+"""
+Tests for the content-addressed Vision API page store.
+"""
+
+import io
+import json
+
+import PyPDF2
+
+from metabeeai.process_pdfs.va_page_store import PageStore, page_key, rewrite_response
+
+
+def make_pdf(width=200):
+    writer = PyPDF2.PdfWriter()
+    writer.add_blank_page(width, 300)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_page_keys():
+    assert page_key(make_pdf()) == page_key(make_pdf())
+    assert page_key(make_pdf(), "pixels") == page_key(make_pdf(), "pixels")
+    assert page_key(make_pdf(200), "pixels") != page_key(make_pdf(400), "pixels")
+
+
+def test_reused_response_gets_deterministic_chunk_ids(tmp_path):
+    store = PageStore(str(tmp_path / "pages.sqlite"))
+    response = json.dumps(
+        {"markdown": "<a id='abc-1'></a>text", "data": {"chunks": [{"chunk_id": "abc-1", "grounding": [{"page": 0}]}]}}
+    )
+    store.set("bytes:key", response, "PAPER_A", "main_p03.pdf")
+    stored = store.get("bytes:key")
+    assert (stored["paper"], stored["page_file"]) == ("PAPER_A", "main_p03.pdf")
+    assert store.get("bytes:other") is None
+
+    rewritten = rewrite_response(stored["response"], "PAPER_B", "main_p01.pdf")
+    data = json.loads(rewritten)
+    new_id = data["data"]["chunks"][0]["chunk_id"]
+    assert new_id != "abc-1"
+    assert new_id in data["markdown"]
+    assert data["data"]["chunks"][0]["grounding"] == [{"page": 0}]
+    assert rewritten == rewrite_response(stored["response"], "PAPER_B", "main_p01.pdf")